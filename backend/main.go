@@ -9,6 +9,7 @@ import (
 	"encoding/base64"
 	"encoding/hex"
 	"encoding/json"
+	"errors"
 	"fmt"
 	"image"
 	_ "image/gif"
@@ -33,6 +34,7 @@ import (
 	"google.golang.org/grpc/codes"
 	"google.golang.org/grpc/credentials"
 	"google.golang.org/grpc/credentials/insecure"
+	"google.golang.org/grpc/metadata"
 	"google.golang.org/grpc/status"
 )
 
@@ -359,11 +361,16 @@ func startHTTPServer(grpcClient pb.FaceRecognitionServiceClient, store *attendan
 
 		type candidateScore struct {
 			Votes         int
+			ClearVotes    int
 			ConfidenceSum float64
 			BestConfidence float64
 		}
 
 		candidates := make(map[string]*candidateScore)
+		burstProfile := resolveBurstRecognizeProfile()
+		burstTopK := resolveBurstRecognizeTopK()
+		earlyStopMargin := resolveBurstRecognizeEarlyStopMargin()
+		earlyStop := false
 		errors := make([]string, 0)
 		recognizedFrames := 0
 		framesProcessed := 0
@@ -375,12 +382,18 @@ func startHTTPServer(grpcClient pb.FaceRecognitionServiceClient, store *attendan
 				continue
 			}
 
+			var trailer metadata.MD
 			ctx, cancel := context.WithTimeout(r.Context(), resolveBurstRecognizeRPCTimeout())
-			resp, grpcErr := grpcClient.RecognizeFace(ctx, &pb.RecognizeFaceRequest{Image: imageData})
+			resp, grpcErr := grpcClient.RecognizeFace(
+				ctx,
+				&pb.RecognizeFaceRequest{Image: imageData, Profile: burstProfile, TopK: burstTopK},
+				grpc.Trailer(&trailer),
+			)
 			cancel()
 			framesProcessed++
 
 			if grpcErr != nil {
+				grpcErr = classifyFaceRPCError(grpcErr, trailer)
 				errors = append(errors, fmt.Sprintf("frame_%d: %s", index+1, describeRegisterGRPCError(grpcErr)))
 				continue
 			}
@@ -405,6 +418,16 @@ func startHTTPServer(grpcClient pb.FaceRecognitionServiceClient, store *attendan
 			if confidence > entry.BestConfidence {
 				entry.BestConfidence = confidence
 			}
+
+			// Frame claro: sin runner-up o con margen suficiente. Si todos los votos son claros y
+			// para un solo empleado, no hace falta procesar el resto del burst.
+			if burstTopK > 0 && (len(resp.GetAlternatives()) < 2 || float64(resp.GetMargin()) >= earlyStopMargin) {
+				entry.ClearVotes++
+			}
+			if burstTopK > 0 && len(candidates) == 1 && entry.ClearVotes >= minVotes {
+				earlyStop = true
+				break
+			}
 		}
 
 		bestEmployeeID := ""
@@ -436,6 +459,7 @@ func startHTTPServer(grpcClient pb.FaceRecognitionServiceClient, store *attendan
 				"minVotes":         minVotes,
 				"framesProcessed":  framesProcessed,
 				"recognizedFrames": recognizedFrames,
+				"earlyStop":        earlyStop,
 				"errors":           errors,
 			})
 			return
@@ -482,6 +506,7 @@ func startHTTPServer(grpcClient pb.FaceRecognitionServiceClient, store *attendan
 			"minVotes":          minVotes,
 			"framesProcessed":   framesProcessed,
 			"recognizedFrames":  recognizedFrames,
+			"earlyStop":         earlyStop,
 			"attendanceLogged":  attendanceLogged,
 			"attendanceMessage": attendanceMessage,
 			"errors":            errors,
@@ -1443,6 +1468,46 @@ func resolveBurstRecognizeRPCTimeout() time.Duration {
 	return time.Duration(parsed) * time.Millisecond
 }
 
+func resolveBurstRecognizeProfile() pb.RecognitionProfile {
+	switch strings.ToLower(strings.TrimSpace(os.Getenv("BMPI_RECOGNIZE_BURST_PROFILE"))) {
+	case "fast":
+		return pb.RecognitionProfile_RECOGNITION_PROFILE_FAST
+	case "balanced":
+		return pb.RecognitionProfile_RECOGNITION_PROFILE_BALANCED
+	case "accurate":
+		return pb.RecognitionProfile_RECOGNITION_PROFILE_ACCURATE
+	default:
+		return pb.RecognitionProfile_RECOGNITION_PROFILE_DEFAULT
+	}
+}
+
+func resolveBurstRecognizeTopK() int32 {
+	raw := strings.TrimSpace(os.Getenv("BMPI_RECOGNIZE_BURST_TOP_K"))
+	if raw == "" {
+		return 3
+	}
+	parsed, err := strconv.Atoi(raw)
+	if err != nil || parsed < 0 {
+		return 3
+	}
+	if parsed > 10 {
+		return 10
+	}
+	return int32(parsed)
+}
+
+func resolveBurstRecognizeEarlyStopMargin() float64 {
+	raw := strings.TrimSpace(os.Getenv("BMPI_RECOGNIZE_BURST_EARLY_STOP_MARGIN"))
+	if raw == "" {
+		return 0.1
+	}
+	parsed, err := strconv.ParseFloat(raw, 64)
+	if err != nil || parsed < 0 {
+		return 0.1
+	}
+	return parsed
+}
+
 func resolveRegisterPhotoRetryCount() int {
 	defaultRetries := 1
 	raw := strings.TrimSpace(os.Getenv("BMPI_REGISTER_PHOTO_RETRIES"))
@@ -1486,11 +1551,55 @@ func isRegisterRetryable(err error) bool {
 	switch st.Code() {
 	case codes.Unavailable, codes.DeadlineExceeded:
 		return true
+	case codes.ResourceExhausted:
+		_, overloaded := faceServiceOverload(err)
+		return overloaded
 	default:
 		return false
 	}
 }
 
+// faceOverloadedError es el rechazo del control de admision del servicio IA: ResourceExhausted
+// acompanado del trailer grpc-retry-pushback-ms con la espera sugerida.
+type faceOverloadedError struct {
+	st       *status.Status
+	pushback time.Duration
+}
+
+func (e *faceOverloadedError) Error() string {
+	return e.st.Err().Error()
+}
+
+func (e *faceOverloadedError) GRPCStatus() *status.Status {
+	return e.st
+}
+
+// classifyFaceRPCError distingue la saturacion del servicio IA de un ResourceExhausted por mensaje
+// demasiado grande (que lo genera gRPC sin trailer) usando el codigo y el trailer, no el texto.
+func classifyFaceRPCError(err error, trailer metadata.MD) error {
+	st, ok := status.FromError(err)
+	if !ok || st.Code() != codes.ResourceExhausted {
+		return err
+	}
+	values := trailer.Get("grpc-retry-pushback-ms")
+	if len(values) == 0 {
+		return err
+	}
+	pushbackMs, parseErr := strconv.Atoi(strings.TrimSpace(values[0]))
+	if parseErr != nil || pushbackMs < 0 {
+		return err
+	}
+	return &faceOverloadedError{st: st, pushback: time.Duration(pushbackMs) * time.Millisecond}
+}
+
+func faceServiceOverload(err error) (time.Duration, bool) {
+	var overloaded *faceOverloadedError
+	if errors.As(err, &overloaded) {
+		return overloaded.pushback, true
+	}
+	return 0, false
+}
+
 func registerEmployeeWithRetry(
 	ctx context.Context,
 	client pb.FaceRecognitionServiceClient,
@@ -1502,21 +1611,32 @@ func registerEmployeeWithRetry(
 	attempts := retries + 1
 	var lastErr error
 
+	// Misma clave en todos los intentos: si el primero sigue en curso o ya terminÃ³,
+	// el servicio devuelve ese resultado en lugar de volver a codificar la foto.
+	if request.GetIdempotencyKey() == "" {
+		request.IdempotencyKey = newIdempotencyKey()
+	}
+
 	for attempt := 0; attempt < attempts; attempt++ {
+		var trailer metadata.MD
 		rpcCtx, cancel := context.WithTimeout(ctx, rpcTimeout)
-		response, err := client.RegisterEmployee(rpcCtx, request)
+		response, err := client.RegisterEmployee(rpcCtx, request, grpc.Trailer(&trailer))
 		cancel()
 
 		if err == nil {
 			return response, nil
 		}
 
+		err = classifyFaceRPCError(err, trailer)
 		lastErr = err
 		if !isRegisterRetryable(err) || attempt == attempts-1 {
 			break
 		}
 
 		backoff := retryBackoff * time.Duration(attempt+1)
+		if pushback, overloaded := faceServiceOverload(err); overloaded && pushback > backoff {
+			backoff = pushback
+		}
 		select {
 		case <-time.After(backoff):
 		case <-ctx.Done():
@@ -1527,15 +1647,26 @@ func registerEmployeeWithRetry(
 	return nil, lastErr
 }
 
+func newIdempotencyKey() string {
+	nonce := make([]byte, 16)
+	if _, err := rand.Read(nonce); err != nil {
+		return ""
+	}
+	return hex.EncodeToString(nonce)
+}
+
 func describeRegisterGRPCError(grpcErr error) string {
 	errText := "error gRPC al registrar empleado"
+	_, overloaded := faceServiceOverload(grpcErr)
 	if st, ok := status.FromError(grpcErr); ok {
-		switch st.Code() {
-		case codes.ResourceExhausted:
+		switch {
+		case overloaded:
+			errText = "servicio IA saturado; intenta de nuevo en unos segundos"
+		case st.Code() == codes.ResourceExhausted:
 			errText = "imagen demasiado pesada; reduce resoluciÃ³n/tamaÃ±o de foto"
-		case codes.DeadlineExceeded:
+		case st.Code() == codes.DeadlineExceeded:
 			errText = "tiempo agotado al procesar foto; intenta con fotos mÃ¡s ligeras"
-		case codes.Unavailable:
+		case st.Code() == codes.Unavailable:
 			errText = "servicio IA no disponible temporalmente"
 		default:
 			errText = fmt.Sprintf("error IA (%s)", st.Code().String())
@@ -20,14 +20,122 @@ const (
 	_ = protoimpl.EnforceVersion(protoimpl.MaxVersion - 20)
 )
 
+type RecognitionProfile int32
+
+const (
+	RecognitionProfile_RECOGNITION_PROFILE_DEFAULT  RecognitionProfile = 0
+	RecognitionProfile_RECOGNITION_PROFILE_FAST     RecognitionProfile = 1
+	RecognitionProfile_RECOGNITION_PROFILE_BALANCED RecognitionProfile = 2
+	RecognitionProfile_RECOGNITION_PROFILE_ACCURATE RecognitionProfile = 3
+)
+
+// Enum value maps for RecognitionProfile.
+var (
+	RecognitionProfile_name = map[int32]string{
+		0: "RECOGNITION_PROFILE_DEFAULT",
+		1: "RECOGNITION_PROFILE_FAST",
+		2: "RECOGNITION_PROFILE_BALANCED",
+		3: "RECOGNITION_PROFILE_ACCURATE",
+	}
+	RecognitionProfile_value = map[string]int32{
+		"RECOGNITION_PROFILE_DEFAULT":  0,
+		"RECOGNITION_PROFILE_FAST":     1,
+		"RECOGNITION_PROFILE_BALANCED": 2,
+		"RECOGNITION_PROFILE_ACCURATE": 3,
+	}
+)
+
+func (x RecognitionProfile) Enum() *RecognitionProfile {
+	p := new(RecognitionProfile)
+	*p = x
+	return p
+}
+
+func (x RecognitionProfile) String() string {
+	return protoimpl.X.EnumStringOf(x.Descriptor(), protoreflect.EnumNumber(x))
+}
+
+func (RecognitionProfile) Descriptor() protoreflect.EnumDescriptor {
+	return file_proto_face_recognition_proto_enumTypes[0].Descriptor()
+}
+
+func (RecognitionProfile) Type() protoreflect.EnumType {
+	return &file_proto_face_recognition_proto_enumTypes[0]
+}
+
+func (x RecognitionProfile) Number() protoreflect.EnumNumber {
+	return protoreflect.EnumNumber(x)
+}
+
+// Deprecated: Use RecognitionProfile.Descriptor instead.
+func (RecognitionProfile) EnumDescriptor() ([]byte, []int) {
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{0}
+}
+
+type EnrollmentState int32
+
+const (
+	EnrollmentState_ENROLLMENT_STATE_UNSPECIFIED EnrollmentState = 0
+	EnrollmentState_ENROLLMENT_STATE_QUEUED      EnrollmentState = 1
+	EnrollmentState_ENROLLMENT_STATE_RUNNING     EnrollmentState = 2
+	EnrollmentState_ENROLLMENT_STATE_SUCCEEDED   EnrollmentState = 3
+	EnrollmentState_ENROLLMENT_STATE_FAILED      EnrollmentState = 4
+)
+
+// Enum value maps for EnrollmentState.
+var (
+	EnrollmentState_name = map[int32]string{
+		0: "ENROLLMENT_STATE_UNSPECIFIED",
+		1: "ENROLLMENT_STATE_QUEUED",
+		2: "ENROLLMENT_STATE_RUNNING",
+		3: "ENROLLMENT_STATE_SUCCEEDED",
+		4: "ENROLLMENT_STATE_FAILED",
+	}
+	EnrollmentState_value = map[string]int32{
+		"ENROLLMENT_STATE_UNSPECIFIED": 0,
+		"ENROLLMENT_STATE_QUEUED":      1,
+		"ENROLLMENT_STATE_RUNNING":     2,
+		"ENROLLMENT_STATE_SUCCEEDED":   3,
+		"ENROLLMENT_STATE_FAILED":      4,
+	}
+)
+
+func (x EnrollmentState) Enum() *EnrollmentState {
+	p := new(EnrollmentState)
+	*p = x
+	return p
+}
+
+func (x EnrollmentState) String() string {
+	return protoimpl.X.EnumStringOf(x.Descriptor(), protoreflect.EnumNumber(x))
+}
+
+func (EnrollmentState) Descriptor() protoreflect.EnumDescriptor {
+	return file_proto_face_recognition_proto_enumTypes[1].Descriptor()
+}
+
+func (EnrollmentState) Type() protoreflect.EnumType {
+	return &file_proto_face_recognition_proto_enumTypes[1]
+}
+
+func (x EnrollmentState) Number() protoreflect.EnumNumber {
+	return protoreflect.EnumNumber(x)
+}
+
+// Deprecated: Use EnrollmentState.Descriptor instead.
+func (EnrollmentState) EnumDescriptor() ([]byte, []int) {
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{1}
+}
+
 type RegisterEmployeeRequest struct {
 	state         protoimpl.MessageState
 	sizeCache     protoimpl.SizeCache
 	unknownFields protoimpl.UnknownFields
 
-	Name       string `protobuf:"bytes,1,opt,name=name,proto3" json:"name,omitempty"`
-	EmployeeId string `protobuf:"bytes,2,opt,name=employee_id,json=employeeId,proto3" json:"employee_id,omitempty"`
-	Image      []byte `protobuf:"bytes,3,opt,name=image,proto3" json:"image,omitempty"`
+	Name           string `protobuf:"bytes,1,opt,name=name,proto3" json:"name,omitempty"`
+	EmployeeId     string `protobuf:"bytes,2,opt,name=employee_id,json=employeeId,proto3" json:"employee_id,omitempty"`
+	Image          []byte `protobuf:"bytes,3,opt,name=image,proto3" json:"image,omitempty"`
+	IdempotencyKey string `protobuf:"bytes,4,opt,name=idempotency_key,json=idempotencyKey,proto3" json:"idempotency_key,omitempty"`
 }
 
 func (x *RegisterEmployeeRequest) Reset() {
@@ -83,6 +191,13 @@ func (x *RegisterEmployeeRequest) GetImage() []byte {
 	return nil
 }
 
+func (x *RegisterEmployeeRequest) GetIdempotencyKey() string {
+	if x != nil {
+		return x.IdempotencyKey
+	}
+	return ""
+}
+
 type RegisterEmployeeResponse struct {
 	state         protoimpl.MessageState
 	sizeCache     protoimpl.SizeCache
@@ -138,18 +253,94 @@ func (x *RegisterEmployeeResponse) GetMessage() string {
 	return ""
 }
 
+type FaceBox struct {
+	state         protoimpl.MessageState
+	sizeCache     protoimpl.SizeCache
+	unknownFields protoimpl.UnknownFields
+
+	Top    int32 `protobuf:"varint,1,opt,name=top,proto3" json:"top,omitempty"`
+	Right  int32 `protobuf:"varint,2,opt,name=right,proto3" json:"right,omitempty"`
+	Bottom int32 `protobuf:"varint,3,opt,name=bottom,proto3" json:"bottom,omitempty"`
+	Left   int32 `protobuf:"varint,4,opt,name=left,proto3" json:"left,omitempty"`
+}
+
+func (x *FaceBox) Reset() {
+	*x = FaceBox{}
+	if protoimpl.UnsafeEnabled {
+		mi := &file_proto_face_recognition_proto_msgTypes[2]
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		ms.StoreMessageInfo(mi)
+	}
+}
+
+func (x *FaceBox) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*FaceBox) ProtoMessage() {}
+
+func (x *FaceBox) ProtoReflect() protoreflect.Message {
+	mi := &file_proto_face_recognition_proto_msgTypes[2]
+	if protoimpl.UnsafeEnabled && x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use FaceBox.ProtoReflect.Descriptor instead.
+func (*FaceBox) Descriptor() ([]byte, []int) {
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{2}
+}
+
+func (x *FaceBox) GetTop() int32 {
+	if x != nil {
+		return x.Top
+	}
+	return 0
+}
+
+func (x *FaceBox) GetRight() int32 {
+	if x != nil {
+		return x.Right
+	}
+	return 0
+}
+
+func (x *FaceBox) GetBottom() int32 {
+	if x != nil {
+		return x.Bottom
+	}
+	return 0
+}
+
+func (x *FaceBox) GetLeft() int32 {
+	if x != nil {
+		return x.Left
+	}
+	return 0
+}
+
 type RecognizeFaceRequest struct {
 	state         protoimpl.MessageState
 	sizeCache     protoimpl.SizeCache
 	unknownFields protoimpl.UnknownFields
 
-	Image []byte `protobuf:"bytes,1,opt,name=image,proto3" json:"image,omitempty"`
+	Image     []byte             `protobuf:"bytes,1,opt,name=image,proto3" json:"image,omitempty"`
+	Profile   RecognitionProfile `protobuf:"varint,2,opt,name=profile,proto3,enum=face_recognition.RecognitionProfile" json:"profile,omitempty"`
+	FaceBox   *FaceBox           `protobuf:"bytes,3,opt,name=face_box,json=faceBox,proto3" json:"face_box,omitempty"`
+	Embedding []float32          `protobuf:"fixed32,4,rep,packed,name=embedding,proto3" json:"embedding,omitempty"`
+	MultiFace bool               `protobuf:"varint,5,opt,name=multi_face,json=multiFace,proto3" json:"multi_face,omitempty"`
+	TopK      int32              `protobuf:"varint,6,opt,name=top_k,json=topK,proto3" json:"top_k,omitempty"`
 }
 
 func (x *RecognizeFaceRequest) Reset() {
 	*x = RecognizeFaceRequest{}
 	if protoimpl.UnsafeEnabled {
-		mi := &file_proto_face_recognition_proto_msgTypes[2]
+		mi := &file_proto_face_recognition_proto_msgTypes[3]
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		ms.StoreMessageInfo(mi)
 	}
@@ -162,7 +353,7 @@ func (x *RecognizeFaceRequest) String() string {
 func (*RecognizeFaceRequest) ProtoMessage() {}
 
 func (x *RecognizeFaceRequest) ProtoReflect() protoreflect.Message {
-	mi := &file_proto_face_recognition_proto_msgTypes[2]
+	mi := &file_proto_face_recognition_proto_msgTypes[3]
 	if protoimpl.UnsafeEnabled && x != nil {
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		if ms.LoadMessageInfo() == nil {
@@ -175,7 +366,7 @@ func (x *RecognizeFaceRequest) ProtoReflect() protoreflect.Message {
 
 // Deprecated: Use RecognizeFaceRequest.ProtoReflect.Descriptor instead.
 func (*RecognizeFaceRequest) Descriptor() ([]byte, []int) {
-	return file_proto_face_recognition_proto_rawDescGZIP(), []int{2}
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{3}
 }
 
 func (x *RecognizeFaceRequest) GetImage() []byte {
@@ -185,20 +376,184 @@ func (x *RecognizeFaceRequest) GetImage() []byte {
 	return nil
 }
 
+func (x *RecognizeFaceRequest) GetProfile() RecognitionProfile {
+	if x != nil {
+		return x.Profile
+	}
+	return RecognitionProfile_RECOGNITION_PROFILE_DEFAULT
+}
+
+func (x *RecognizeFaceRequest) GetFaceBox() *FaceBox {
+	if x != nil {
+		return x.FaceBox
+	}
+	return nil
+}
+
+func (x *RecognizeFaceRequest) GetEmbedding() []float32 {
+	if x != nil {
+		return x.Embedding
+	}
+	return nil
+}
+
+func (x *RecognizeFaceRequest) GetMultiFace() bool {
+	if x != nil {
+		return x.MultiFace
+	}
+	return false
+}
+
+func (x *RecognizeFaceRequest) GetTopK() int32 {
+	if x != nil {
+		return x.TopK
+	}
+	return 0
+}
+
+type MatchCandidate struct {
+	state         protoimpl.MessageState
+	sizeCache     protoimpl.SizeCache
+	unknownFields protoimpl.UnknownFields
+
+	EmployeeId string  `protobuf:"bytes,1,opt,name=employee_id,json=employeeId,proto3" json:"employee_id,omitempty"`
+	Distance   float32 `protobuf:"fixed32,2,opt,name=distance,proto3" json:"distance,omitempty"`
+}
+
+func (x *MatchCandidate) Reset() {
+	*x = MatchCandidate{}
+	if protoimpl.UnsafeEnabled {
+		mi := &file_proto_face_recognition_proto_msgTypes[4]
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		ms.StoreMessageInfo(mi)
+	}
+}
+
+func (x *MatchCandidate) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*MatchCandidate) ProtoMessage() {}
+
+func (x *MatchCandidate) ProtoReflect() protoreflect.Message {
+	mi := &file_proto_face_recognition_proto_msgTypes[4]
+	if protoimpl.UnsafeEnabled && x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use MatchCandidate.ProtoReflect.Descriptor instead.
+func (*MatchCandidate) Descriptor() ([]byte, []int) {
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{4}
+}
+
+func (x *MatchCandidate) GetEmployeeId() string {
+	if x != nil {
+		return x.EmployeeId
+	}
+	return ""
+}
+
+func (x *MatchCandidate) GetDistance() float32 {
+	if x != nil {
+		return x.Distance
+	}
+	return 0
+}
+
+type FaceMatch struct {
+	state         protoimpl.MessageState
+	sizeCache     protoimpl.SizeCache
+	unknownFields protoimpl.UnknownFields
+
+	Box        *FaceBox `protobuf:"bytes,1,opt,name=box,proto3" json:"box,omitempty"`
+	Recognized bool     `protobuf:"varint,2,opt,name=recognized,proto3" json:"recognized,omitempty"`
+	EmployeeId string   `protobuf:"bytes,3,opt,name=employee_id,json=employeeId,proto3" json:"employee_id,omitempty"`
+	Confidence float32  `protobuf:"fixed32,4,opt,name=confidence,proto3" json:"confidence,omitempty"`
+}
+
+func (x *FaceMatch) Reset() {
+	*x = FaceMatch{}
+	if protoimpl.UnsafeEnabled {
+		mi := &file_proto_face_recognition_proto_msgTypes[5]
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		ms.StoreMessageInfo(mi)
+	}
+}
+
+func (x *FaceMatch) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*FaceMatch) ProtoMessage() {}
+
+func (x *FaceMatch) ProtoReflect() protoreflect.Message {
+	mi := &file_proto_face_recognition_proto_msgTypes[5]
+	if protoimpl.UnsafeEnabled && x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use FaceMatch.ProtoReflect.Descriptor instead.
+func (*FaceMatch) Descriptor() ([]byte, []int) {
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{5}
+}
+
+func (x *FaceMatch) GetBox() *FaceBox {
+	if x != nil {
+		return x.Box
+	}
+	return nil
+}
+
+func (x *FaceMatch) GetRecognized() bool {
+	if x != nil {
+		return x.Recognized
+	}
+	return false
+}
+
+func (x *FaceMatch) GetEmployeeId() string {
+	if x != nil {
+		return x.EmployeeId
+	}
+	return ""
+}
+
+func (x *FaceMatch) GetConfidence() float32 {
+	if x != nil {
+		return x.Confidence
+	}
+	return 0
+}
+
 type RecognizeFaceResponse struct {
 	state         protoimpl.MessageState
 	sizeCache     protoimpl.SizeCache
 	unknownFields protoimpl.UnknownFields
 
-	Recognized bool    `protobuf:"varint,1,opt,name=recognized,proto3" json:"recognized,omitempty"`
-	EmployeeId string  `protobuf:"bytes,2,opt,name=employee_id,json=employeeId,proto3" json:"employee_id,omitempty"`
-	Confidence float32 `protobuf:"fixed32,3,opt,name=confidence,proto3" json:"confidence,omitempty"`
+	Recognized   bool              `protobuf:"varint,1,opt,name=recognized,proto3" json:"recognized,omitempty"`
+	EmployeeId   string            `protobuf:"bytes,2,opt,name=employee_id,json=employeeId,proto3" json:"employee_id,omitempty"`
+	Confidence   float32           `protobuf:"fixed32,3,opt,name=confidence,proto3" json:"confidence,omitempty"`
+	Faces        []*FaceMatch      `protobuf:"bytes,4,rep,name=faces,proto3" json:"faces,omitempty"`
+	Alternatives []*MatchCandidate `protobuf:"bytes,5,rep,name=alternatives,proto3" json:"alternatives,omitempty"`
+	Margin       float32           `protobuf:"fixed32,6,opt,name=margin,proto3" json:"margin,omitempty"`
 }
 
 func (x *RecognizeFaceResponse) Reset() {
 	*x = RecognizeFaceResponse{}
 	if protoimpl.UnsafeEnabled {
-		mi := &file_proto_face_recognition_proto_msgTypes[3]
+		mi := &file_proto_face_recognition_proto_msgTypes[6]
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		ms.StoreMessageInfo(mi)
 	}
@@ -211,7 +566,7 @@ func (x *RecognizeFaceResponse) String() string {
 func (*RecognizeFaceResponse) ProtoMessage() {}
 
 func (x *RecognizeFaceResponse) ProtoReflect() protoreflect.Message {
-	mi := &file_proto_face_recognition_proto_msgTypes[3]
+	mi := &file_proto_face_recognition_proto_msgTypes[6]
 	if protoimpl.UnsafeEnabled && x != nil {
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		if ms.LoadMessageInfo() == nil {
@@ -224,7 +579,7 @@ func (x *RecognizeFaceResponse) ProtoReflect() protoreflect.Message {
 
 // Deprecated: Use RecognizeFaceResponse.ProtoReflect.Descriptor instead.
 func (*RecognizeFaceResponse) Descriptor() ([]byte, []int) {
-	return file_proto_face_recognition_proto_rawDescGZIP(), []int{3}
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{6}
 }
 
 func (x *RecognizeFaceResponse) GetRecognized() bool {
@@ -248,6 +603,145 @@ func (x *RecognizeFaceResponse) GetConfidence() float32 {
 	return 0
 }
 
+func (x *RecognizeFaceResponse) GetFaces() []*FaceMatch {
+	if x != nil {
+		return x.Faces
+	}
+	return nil
+}
+
+func (x *RecognizeFaceResponse) GetAlternatives() []*MatchCandidate {
+	if x != nil {
+		return x.Alternatives
+	}
+	return nil
+}
+
+func (x *RecognizeFaceResponse) GetMargin() float32 {
+	if x != nil {
+		return x.Margin
+	}
+	return 0
+}
+
+type EnrollmentJob struct {
+	state         protoimpl.MessageState
+	sizeCache     protoimpl.SizeCache
+	unknownFields protoimpl.UnknownFields
+
+	JobId         string          `protobuf:"bytes,1,opt,name=job_id,json=jobId,proto3" json:"job_id,omitempty"`
+	State         EnrollmentState `protobuf:"varint,2,opt,name=state,proto3,enum=face_recognition.EnrollmentState" json:"state,omitempty"`
+	Message       string          `protobuf:"bytes,3,opt,name=message,proto3" json:"message,omitempty"`
+	QueuePosition int32           `protobuf:"varint,4,opt,name=queue_position,json=queuePosition,proto3" json:"queue_position,omitempty"`
+}
+
+func (x *EnrollmentJob) Reset() {
+	*x = EnrollmentJob{}
+	if protoimpl.UnsafeEnabled {
+		mi := &file_proto_face_recognition_proto_msgTypes[7]
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		ms.StoreMessageInfo(mi)
+	}
+}
+
+func (x *EnrollmentJob) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*EnrollmentJob) ProtoMessage() {}
+
+func (x *EnrollmentJob) ProtoReflect() protoreflect.Message {
+	mi := &file_proto_face_recognition_proto_msgTypes[7]
+	if protoimpl.UnsafeEnabled && x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use EnrollmentJob.ProtoReflect.Descriptor instead.
+func (*EnrollmentJob) Descriptor() ([]byte, []int) {
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{7}
+}
+
+func (x *EnrollmentJob) GetJobId() string {
+	if x != nil {
+		return x.JobId
+	}
+	return ""
+}
+
+func (x *EnrollmentJob) GetState() EnrollmentState {
+	if x != nil {
+		return x.State
+	}
+	return EnrollmentState_ENROLLMENT_STATE_UNSPECIFIED
+}
+
+func (x *EnrollmentJob) GetMessage() string {
+	if x != nil {
+		return x.Message
+	}
+	return ""
+}
+
+func (x *EnrollmentJob) GetQueuePosition() int32 {
+	if x != nil {
+		return x.QueuePosition
+	}
+	return 0
+}
+
+type EnrollmentStatusRequest struct {
+	state         protoimpl.MessageState
+	sizeCache     protoimpl.SizeCache
+	unknownFields protoimpl.UnknownFields
+
+	JobId string `protobuf:"bytes,1,opt,name=job_id,json=jobId,proto3" json:"job_id,omitempty"`
+}
+
+func (x *EnrollmentStatusRequest) Reset() {
+	*x = EnrollmentStatusRequest{}
+	if protoimpl.UnsafeEnabled {
+		mi := &file_proto_face_recognition_proto_msgTypes[8]
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		ms.StoreMessageInfo(mi)
+	}
+}
+
+func (x *EnrollmentStatusRequest) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*EnrollmentStatusRequest) ProtoMessage() {}
+
+func (x *EnrollmentStatusRequest) ProtoReflect() protoreflect.Message {
+	mi := &file_proto_face_recognition_proto_msgTypes[8]
+	if protoimpl.UnsafeEnabled && x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use EnrollmentStatusRequest.ProtoReflect.Descriptor instead.
+func (*EnrollmentStatusRequest) Descriptor() ([]byte, []int) {
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{8}
+}
+
+func (x *EnrollmentStatusRequest) GetJobId() string {
+	if x != nil {
+		return x.JobId
+	}
+	return ""
+}
+
 type AttendanceRequest struct {
 	state         protoimpl.MessageState
 	sizeCache     protoimpl.SizeCache
@@ -259,7 +753,7 @@ type AttendanceRequest struct {
 func (x *AttendanceRequest) Reset() {
 	*x = AttendanceRequest{}
 	if protoimpl.UnsafeEnabled {
-		mi := &file_proto_face_recognition_proto_msgTypes[4]
+		mi := &file_proto_face_recognition_proto_msgTypes[9]
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		ms.StoreMessageInfo(mi)
 	}
@@ -272,7 +766,7 @@ func (x *AttendanceRequest) String() string {
 func (*AttendanceRequest) ProtoMessage() {}
 
 func (x *AttendanceRequest) ProtoReflect() protoreflect.Message {
-	mi := &file_proto_face_recognition_proto_msgTypes[4]
+	mi := &file_proto_face_recognition_proto_msgTypes[9]
 	if protoimpl.UnsafeEnabled && x != nil {
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		if ms.LoadMessageInfo() == nil {
@@ -285,7 +779,7 @@ func (x *AttendanceRequest) ProtoReflect() protoreflect.Message {
 
 // Deprecated: Use AttendanceRequest.ProtoReflect.Descriptor instead.
 func (*AttendanceRequest) Descriptor() ([]byte, []int) {
-	return file_proto_face_recognition_proto_rawDescGZIP(), []int{4}
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{9}
 }
 
 func (x *AttendanceRequest) GetEmployeeId() string {
@@ -307,7 +801,7 @@ type AttendanceResponse struct {
 func (x *AttendanceResponse) Reset() {
 	*x = AttendanceResponse{}
 	if protoimpl.UnsafeEnabled {
-		mi := &file_proto_face_recognition_proto_msgTypes[5]
+		mi := &file_proto_face_recognition_proto_msgTypes[10]
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		ms.StoreMessageInfo(mi)
 	}
@@ -320,7 +814,7 @@ func (x *AttendanceResponse) String() string {
 func (*AttendanceResponse) ProtoMessage() {}
 
 func (x *AttendanceResponse) ProtoReflect() protoreflect.Message {
-	mi := &file_proto_face_recognition_proto_msgTypes[5]
+	mi := &file_proto_face_recognition_proto_msgTypes[10]
 	if protoimpl.UnsafeEnabled && x != nil {
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		if ms.LoadMessageInfo() == nil {
@@ -333,7 +827,7 @@ func (x *AttendanceResponse) ProtoReflect() protoreflect.Message {
 
 // Deprecated: Use AttendanceResponse.ProtoReflect.Descriptor instead.
 func (*AttendanceResponse) Descriptor() ([]byte, []int) {
-	return file_proto_face_recognition_proto_rawDescGZIP(), []int{5}
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{10}
 }
 
 func (x *AttendanceResponse) GetSuccess() bool {
@@ -359,7 +853,7 @@ type Empty struct {
 func (x *Empty) Reset() {
 	*x = Empty{}
 	if protoimpl.UnsafeEnabled {
-		mi := &file_proto_face_recognition_proto_msgTypes[6]
+		mi := &file_proto_face_recognition_proto_msgTypes[11]
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		ms.StoreMessageInfo(mi)
 	}
@@ -372,7 +866,7 @@ func (x *Empty) String() string {
 func (*Empty) ProtoMessage() {}
 
 func (x *Empty) ProtoReflect() protoreflect.Message {
-	mi := &file_proto_face_recognition_proto_msgTypes[6]
+	mi := &file_proto_face_recognition_proto_msgTypes[11]
 	if protoimpl.UnsafeEnabled && x != nil {
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		if ms.LoadMessageInfo() == nil {
@@ -385,7 +879,7 @@ func (x *Empty) ProtoReflect() protoreflect.Message {
 
 // Deprecated: Use Empty.ProtoReflect.Descriptor instead.
 func (*Empty) Descriptor() ([]byte, []int) {
-	return file_proto_face_recognition_proto_rawDescGZIP(), []int{6}
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{11}
 }
 
 type Employee struct {
@@ -400,7 +894,7 @@ type Employee struct {
 func (x *Employee) Reset() {
 	*x = Employee{}
 	if protoimpl.UnsafeEnabled {
-		mi := &file_proto_face_recognition_proto_msgTypes[7]
+		mi := &file_proto_face_recognition_proto_msgTypes[12]
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		ms.StoreMessageInfo(mi)
 	}
@@ -413,7 +907,7 @@ func (x *Employee) String() string {
 func (*Employee) ProtoMessage() {}
 
 func (x *Employee) ProtoReflect() protoreflect.Message {
-	mi := &file_proto_face_recognition_proto_msgTypes[7]
+	mi := &file_proto_face_recognition_proto_msgTypes[12]
 	if protoimpl.UnsafeEnabled && x != nil {
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		if ms.LoadMessageInfo() == nil {
@@ -426,7 +920,7 @@ func (x *Employee) ProtoReflect() protoreflect.Message {
 
 // Deprecated: Use Employee.ProtoReflect.Descriptor instead.
 func (*Employee) Descriptor() ([]byte, []int) {
-	return file_proto_face_recognition_proto_rawDescGZIP(), []int{7}
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{12}
 }
 
 func (x *Employee) GetName() string {
@@ -454,7 +948,7 @@ type EmployeeList struct {
 func (x *EmployeeList) Reset() {
 	*x = EmployeeList{}
 	if protoimpl.UnsafeEnabled {
-		mi := &file_proto_face_recognition_proto_msgTypes[8]
+		mi := &file_proto_face_recognition_proto_msgTypes[13]
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		ms.StoreMessageInfo(mi)
 	}
@@ -467,7 +961,7 @@ func (x *EmployeeList) String() string {
 func (*EmployeeList) ProtoMessage() {}
 
 func (x *EmployeeList) ProtoReflect() protoreflect.Message {
-	mi := &file_proto_face_recognition_proto_msgTypes[8]
+	mi := &file_proto_face_recognition_proto_msgTypes[13]
 	if protoimpl.UnsafeEnabled && x != nil {
 		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
 		if ms.LoadMessageInfo() == nil {
@@ -480,7 +974,7 @@ func (x *EmployeeList) ProtoReflect() protoreflect.Message {
 
 // Deprecated: Use EmployeeList.ProtoReflect.Descriptor instead.
 func (*EmployeeList) Descriptor() ([]byte, []int) {
-	return file_proto_face_recognition_proto_rawDescGZIP(), []int{8}
+	return file_proto_face_recognition_proto_rawDescGZIP(), []int{13}
 }
 
 func (x *EmployeeList) GetEmployees() []*Employee {
@@ -496,74 +990,165 @@ var file_proto_face_recognition_proto_rawDesc = []byte{
 	0x0a, 0x1c, 0x70, 0x72, 0x6f, 0x74, 0x6f, 0x2f, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63,
 	0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x70, 0x72, 0x6f, 0x74, 0x6f, 0x12, 0x10,
 	0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e,
-	0x22, 0x64, 0x0a, 0x17, 0x52, 0x65, 0x67, 0x69, 0x73, 0x74, 0x65, 0x72, 0x45, 0x6d, 0x70, 0x6c,
-	0x6f, 0x79, 0x65, 0x65, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x12, 0x12, 0x0a, 0x04, 0x6e,
-	0x61, 0x6d, 0x65, 0x18, 0x01, 0x20, 0x01, 0x28, 0x09, 0x52, 0x04, 0x6e, 0x61, 0x6d, 0x65, 0x12,
-	0x1f, 0x0a, 0x0b, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x5f, 0x69, 0x64, 0x18, 0x02,
-	0x20, 0x01, 0x28, 0x09, 0x52, 0x0a, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x49, 0x64,
-	0x12, 0x14, 0x0a, 0x05, 0x69, 0x6d, 0x61, 0x67, 0x65, 0x18, 0x03, 0x20, 0x01, 0x28, 0x0c, 0x52,
-	0x05, 0x69, 0x6d, 0x61, 0x67, 0x65, 0x22, 0x4e, 0x0a, 0x18, 0x52, 0x65, 0x67, 0x69, 0x73, 0x74,
-	0x65, 0x72, 0x45, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x52, 0x65, 0x73, 0x70, 0x6f, 0x6e,
-	0x73, 0x65, 0x12, 0x18, 0x0a, 0x07, 0x73, 0x75, 0x63, 0x63, 0x65, 0x73, 0x73, 0x18, 0x01, 0x20,
-	0x01, 0x28, 0x08, 0x52, 0x07, 0x73, 0x75, 0x63, 0x63, 0x65, 0x73, 0x73, 0x12, 0x18, 0x0a, 0x07,
-	0x6d, 0x65, 0x73, 0x73, 0x61, 0x67, 0x65, 0x18, 0x02, 0x20, 0x01, 0x28, 0x09, 0x52, 0x07, 0x6d,
-	0x65, 0x73, 0x73, 0x61, 0x67, 0x65, 0x22, 0x2c, 0x0a, 0x14, 0x52, 0x65, 0x63, 0x6f, 0x67, 0x6e,
-	0x69, 0x7a, 0x65, 0x46, 0x61, 0x63, 0x65, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x12, 0x14,
-	0x0a, 0x05, 0x69, 0x6d, 0x61, 0x67, 0x65, 0x18, 0x01, 0x20, 0x01, 0x28, 0x0c, 0x52, 0x05, 0x69,
-	0x6d, 0x61, 0x67, 0x65, 0x22, 0x78, 0x0a, 0x15, 0x52, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a,
-	0x65, 0x46, 0x61, 0x63, 0x65, 0x52, 0x65, 0x73, 0x70, 0x6f, 0x6e, 0x73, 0x65, 0x12, 0x1e, 0x0a,
-	0x0a, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a, 0x65, 0x64, 0x18, 0x01, 0x20, 0x01, 0x28,
-	0x08, 0x52, 0x0a, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a, 0x65, 0x64, 0x12, 0x1f, 0x0a,
-	0x0b, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x5f, 0x69, 0x64, 0x18, 0x02, 0x20, 0x01,
-	0x28, 0x09, 0x52, 0x0a, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x49, 0x64, 0x12, 0x1e,
-	0x0a, 0x0a, 0x63, 0x6f, 0x6e, 0x66, 0x69, 0x64, 0x65, 0x6e, 0x63, 0x65, 0x18, 0x03, 0x20, 0x01,
-	0x28, 0x02, 0x52, 0x0a, 0x63, 0x6f, 0x6e, 0x66, 0x69, 0x64, 0x65, 0x6e, 0x63, 0x65, 0x22, 0x34,
-	0x0a, 0x11, 0x41, 0x74, 0x74, 0x65, 0x6e, 0x64, 0x61, 0x6e, 0x63, 0x65, 0x52, 0x65, 0x71, 0x75,
-	0x65, 0x73, 0x74, 0x12, 0x1f, 0x0a, 0x0b, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x5f,
-	0x69, 0x64, 0x18, 0x01, 0x20, 0x01, 0x28, 0x09, 0x52, 0x0a, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79,
-	0x65, 0x65, 0x49, 0x64, 0x22, 0x48, 0x0a, 0x12, 0x41, 0x74, 0x74, 0x65, 0x6e, 0x64, 0x61, 0x6e,
-	0x63, 0x65, 0x52, 0x65, 0x73, 0x70, 0x6f, 0x6e, 0x73, 0x65, 0x12, 0x18, 0x0a, 0x07, 0x73, 0x75,
-	0x63, 0x63, 0x65, 0x73, 0x73, 0x18, 0x01, 0x20, 0x01, 0x28, 0x08, 0x52, 0x07, 0x73, 0x75, 0x63,
-	0x63, 0x65, 0x73, 0x73, 0x12, 0x18, 0x0a, 0x07, 0x6d, 0x65, 0x73, 0x73, 0x61, 0x67, 0x65, 0x18,
-	0x02, 0x20, 0x01, 0x28, 0x09, 0x52, 0x07, 0x6d, 0x65, 0x73, 0x73, 0x61, 0x67, 0x65, 0x22, 0x07,
-	0x0a, 0x05, 0x45, 0x6d, 0x70, 0x74, 0x79, 0x22, 0x3f, 0x0a, 0x08, 0x45, 0x6d, 0x70, 0x6c, 0x6f,
-	0x79, 0x65, 0x65, 0x12, 0x12, 0x0a, 0x04, 0x6e, 0x61, 0x6d, 0x65, 0x18, 0x01, 0x20, 0x01, 0x28,
-	0x09, 0x52, 0x04, 0x6e, 0x61, 0x6d, 0x65, 0x12, 0x1f, 0x0a, 0x0b, 0x65, 0x6d, 0x70, 0x6c, 0x6f,
-	0x79, 0x65, 0x65, 0x5f, 0x69, 0x64, 0x18, 0x02, 0x20, 0x01, 0x28, 0x09, 0x52, 0x0a, 0x65, 0x6d,
-	0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x49, 0x64, 0x22, 0x48, 0x0a, 0x0c, 0x45, 0x6d, 0x70, 0x6c,
-	0x6f, 0x79, 0x65, 0x65, 0x4c, 0x69, 0x73, 0x74, 0x12, 0x38, 0x0a, 0x09, 0x65, 0x6d, 0x70, 0x6c,
-	0x6f, 0x79, 0x65, 0x65, 0x73, 0x18, 0x01, 0x20, 0x03, 0x28, 0x0b, 0x32, 0x1a, 0x2e, 0x66, 0x61,
-	0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x45,
-	0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x52, 0x09, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65,
-	0x65, 0x73, 0x32, 0x8b, 0x03, 0x0a, 0x16, 0x46, 0x61, 0x63, 0x65, 0x52, 0x65, 0x63, 0x6f, 0x67,
-	0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x53, 0x65, 0x72, 0x76, 0x69, 0x63, 0x65, 0x12, 0x69, 0x0a,
-	0x10, 0x52, 0x65, 0x67, 0x69, 0x73, 0x74, 0x65, 0x72, 0x45, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65,
-	0x65, 0x12, 0x29, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69,
-	0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x52, 0x65, 0x67, 0x69, 0x73, 0x74, 0x65, 0x72, 0x45, 0x6d, 0x70,
-	0x6c, 0x6f, 0x79, 0x65, 0x65, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x1a, 0x2a, 0x2e, 0x66,
+	0x22, 0x8d, 0x01, 0x0a, 0x17, 0x52, 0x65, 0x67, 0x69, 0x73, 0x74, 0x65, 0x72, 0x45, 0x6d, 0x70,
+	0x6c, 0x6f, 0x79, 0x65, 0x65, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x12, 0x12, 0x0a, 0x04,
+	0x6e, 0x61, 0x6d, 0x65, 0x18, 0x01, 0x20, 0x01, 0x28, 0x09, 0x52, 0x04, 0x6e, 0x61, 0x6d, 0x65,
+	0x12, 0x1f, 0x0a, 0x0b, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x5f, 0x69, 0x64, 0x18,
+	0x02, 0x20, 0x01, 0x28, 0x09, 0x52, 0x0a, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x49,
+	0x64, 0x12, 0x14, 0x0a, 0x05, 0x69, 0x6d, 0x61, 0x67, 0x65, 0x18, 0x03, 0x20, 0x01, 0x28, 0x0c,
+	0x52, 0x05, 0x69, 0x6d, 0x61, 0x67, 0x65, 0x12, 0x27, 0x0a, 0x0f, 0x69, 0x64, 0x65, 0x6d, 0x70,
+	0x6f, 0x74, 0x65, 0x6e, 0x63, 0x79, 0x5f, 0x6b, 0x65, 0x79, 0x18, 0x04, 0x20, 0x01, 0x28, 0x09,
+	0x52, 0x0e, 0x69, 0x64, 0x65, 0x6d, 0x70, 0x6f, 0x74, 0x65, 0x6e, 0x63, 0x79, 0x4b, 0x65, 0x79,
+	0x22, 0x4e, 0x0a, 0x18, 0x52, 0x65, 0x67, 0x69, 0x73, 0x74, 0x65, 0x72, 0x45, 0x6d, 0x70, 0x6c,
+	0x6f, 0x79, 0x65, 0x65, 0x52, 0x65, 0x73, 0x70, 0x6f, 0x6e, 0x73, 0x65, 0x12, 0x18, 0x0a, 0x07,
+	0x73, 0x75, 0x63, 0x63, 0x65, 0x73, 0x73, 0x18, 0x01, 0x20, 0x01, 0x28, 0x08, 0x52, 0x07, 0x73,
+	0x75, 0x63, 0x63, 0x65, 0x73, 0x73, 0x12, 0x18, 0x0a, 0x07, 0x6d, 0x65, 0x73, 0x73, 0x61, 0x67,
+	0x65, 0x18, 0x02, 0x20, 0x01, 0x28, 0x09, 0x52, 0x07, 0x6d, 0x65, 0x73, 0x73, 0x61, 0x67, 0x65,
+	0x22, 0x5d, 0x0a, 0x07, 0x46, 0x61, 0x63, 0x65, 0x42, 0x6f, 0x78, 0x12, 0x10, 0x0a, 0x03, 0x74,
+	0x6f, 0x70, 0x18, 0x01, 0x20, 0x01, 0x28, 0x05, 0x52, 0x03, 0x74, 0x6f, 0x70, 0x12, 0x14, 0x0a,
+	0x05, 0x72, 0x69, 0x67, 0x68, 0x74, 0x18, 0x02, 0x20, 0x01, 0x28, 0x05, 0x52, 0x05, 0x72, 0x69,
+	0x67, 0x68, 0x74, 0x12, 0x16, 0x0a, 0x06, 0x62, 0x6f, 0x74, 0x74, 0x6f, 0x6d, 0x18, 0x03, 0x20,
+	0x01, 0x28, 0x05, 0x52, 0x06, 0x62, 0x6f, 0x74, 0x74, 0x6f, 0x6d, 0x12, 0x12, 0x0a, 0x04, 0x6c,
+	0x65, 0x66, 0x74, 0x18, 0x04, 0x20, 0x01, 0x28, 0x05, 0x52, 0x04, 0x6c, 0x65, 0x66, 0x74, 0x22,
+	0xf4, 0x01, 0x0a, 0x14, 0x52, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a, 0x65, 0x46, 0x61, 0x63,
+	0x65, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x12, 0x14, 0x0a, 0x05, 0x69, 0x6d, 0x61, 0x67,
+	0x65, 0x18, 0x01, 0x20, 0x01, 0x28, 0x0c, 0x52, 0x05, 0x69, 0x6d, 0x61, 0x67, 0x65, 0x12, 0x3e,
+	0x0a, 0x07, 0x70, 0x72, 0x6f, 0x66, 0x69, 0x6c, 0x65, 0x18, 0x02, 0x20, 0x01, 0x28, 0x0e, 0x32,
+	0x24, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69,
+	0x6f, 0x6e, 0x2e, 0x52, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x50, 0x72,
+	0x6f, 0x66, 0x69, 0x6c, 0x65, 0x52, 0x07, 0x70, 0x72, 0x6f, 0x66, 0x69, 0x6c, 0x65, 0x12, 0x34,
+	0x0a, 0x08, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x62, 0x6f, 0x78, 0x18, 0x03, 0x20, 0x01, 0x28, 0x0b,
+	0x32, 0x19, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74,
+	0x69, 0x6f, 0x6e, 0x2e, 0x46, 0x61, 0x63, 0x65, 0x42, 0x6f, 0x78, 0x52, 0x07, 0x66, 0x61, 0x63,
+	0x65, 0x42, 0x6f, 0x78, 0x12, 0x1c, 0x0a, 0x09, 0x65, 0x6d, 0x62, 0x65, 0x64, 0x64, 0x69, 0x6e,
+	0x67, 0x18, 0x04, 0x20, 0x03, 0x28, 0x02, 0x52, 0x09, 0x65, 0x6d, 0x62, 0x65, 0x64, 0x64, 0x69,
+	0x6e, 0x67, 0x12, 0x1d, 0x0a, 0x0a, 0x6d, 0x75, 0x6c, 0x74, 0x69, 0x5f, 0x66, 0x61, 0x63, 0x65,
+	0x18, 0x05, 0x20, 0x01, 0x28, 0x08, 0x52, 0x09, 0x6d, 0x75, 0x6c, 0x74, 0x69, 0x46, 0x61, 0x63,
+	0x65, 0x12, 0x13, 0x0a, 0x05, 0x74, 0x6f, 0x70, 0x5f, 0x6b, 0x18, 0x06, 0x20, 0x01, 0x28, 0x05,
+	0x52, 0x04, 0x74, 0x6f, 0x70, 0x4b, 0x22, 0x4d, 0x0a, 0x0e, 0x4d, 0x61, 0x74, 0x63, 0x68, 0x43,
+	0x61, 0x6e, 0x64, 0x69, 0x64, 0x61, 0x74, 0x65, 0x12, 0x1f, 0x0a, 0x0b, 0x65, 0x6d, 0x70, 0x6c,
+	0x6f, 0x79, 0x65, 0x65, 0x5f, 0x69, 0x64, 0x18, 0x01, 0x20, 0x01, 0x28, 0x09, 0x52, 0x0a, 0x65,
+	0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x49, 0x64, 0x12, 0x1a, 0x0a, 0x08, 0x64, 0x69, 0x73,
+	0x74, 0x61, 0x6e, 0x63, 0x65, 0x18, 0x02, 0x20, 0x01, 0x28, 0x02, 0x52, 0x08, 0x64, 0x69, 0x73,
+	0x74, 0x61, 0x6e, 0x63, 0x65, 0x22, 0x99, 0x01, 0x0a, 0x09, 0x46, 0x61, 0x63, 0x65, 0x4d, 0x61,
+	0x74, 0x63, 0x68, 0x12, 0x2b, 0x0a, 0x03, 0x62, 0x6f, 0x78, 0x18, 0x01, 0x20, 0x01, 0x28, 0x0b,
+	0x32, 0x19, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74,
+	0x69, 0x6f, 0x6e, 0x2e, 0x46, 0x61, 0x63, 0x65, 0x42, 0x6f, 0x78, 0x52, 0x03, 0x62, 0x6f, 0x78,
+	0x12, 0x1e, 0x0a, 0x0a, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a, 0x65, 0x64, 0x18, 0x02,
+	0x20, 0x01, 0x28, 0x08, 0x52, 0x0a, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a, 0x65, 0x64,
+	0x12, 0x1f, 0x0a, 0x0b, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x5f, 0x69, 0x64, 0x18,
+	0x03, 0x20, 0x01, 0x28, 0x09, 0x52, 0x0a, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x49,
+	0x64, 0x12, 0x1e, 0x0a, 0x0a, 0x63, 0x6f, 0x6e, 0x66, 0x69, 0x64, 0x65, 0x6e, 0x63, 0x65, 0x18,
+	0x04, 0x20, 0x01, 0x28, 0x02, 0x52, 0x0a, 0x63, 0x6f, 0x6e, 0x66, 0x69, 0x64, 0x65, 0x6e, 0x63,
+	0x65, 0x22, 0x89, 0x02, 0x0a, 0x15, 0x52, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a, 0x65, 0x46,
+	0x61, 0x63, 0x65, 0x52, 0x65, 0x73, 0x70, 0x6f, 0x6e, 0x73, 0x65, 0x12, 0x1e, 0x0a, 0x0a, 0x72,
+	0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a, 0x65, 0x64, 0x18, 0x01, 0x20, 0x01, 0x28, 0x08, 0x52,
+	0x0a, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a, 0x65, 0x64, 0x12, 0x1f, 0x0a, 0x0b, 0x65,
+	0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x5f, 0x69, 0x64, 0x18, 0x02, 0x20, 0x01, 0x28, 0x09,
+	0x52, 0x0a, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x49, 0x64, 0x12, 0x1e, 0x0a, 0x0a,
+	0x63, 0x6f, 0x6e, 0x66, 0x69, 0x64, 0x65, 0x6e, 0x63, 0x65, 0x18, 0x03, 0x20, 0x01, 0x28, 0x02,
+	0x52, 0x0a, 0x63, 0x6f, 0x6e, 0x66, 0x69, 0x64, 0x65, 0x6e, 0x63, 0x65, 0x12, 0x31, 0x0a, 0x05,
+	0x66, 0x61, 0x63, 0x65, 0x73, 0x18, 0x04, 0x20, 0x03, 0x28, 0x0b, 0x32, 0x1b, 0x2e, 0x66, 0x61,
+	0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x46,
+	0x61, 0x63, 0x65, 0x4d, 0x61, 0x74, 0x63, 0x68, 0x52, 0x05, 0x66, 0x61, 0x63, 0x65, 0x73, 0x12,
+	0x44, 0x0a, 0x0c, 0x61, 0x6c, 0x74, 0x65, 0x72, 0x6e, 0x61, 0x74, 0x69, 0x76, 0x65, 0x73, 0x18,
+	0x05, 0x20, 0x03, 0x28, 0x0b, 0x32, 0x20, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63,
+	0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x4d, 0x61, 0x74, 0x63, 0x68, 0x43, 0x61,
+	0x6e, 0x64, 0x69, 0x64, 0x61, 0x74, 0x65, 0x52, 0x0c, 0x61, 0x6c, 0x74, 0x65, 0x72, 0x6e, 0x61,
+	0x74, 0x69, 0x76, 0x65, 0x73, 0x12, 0x16, 0x0a, 0x06, 0x6d, 0x61, 0x72, 0x67, 0x69, 0x6e, 0x18,
+	0x06, 0x20, 0x01, 0x28, 0x02, 0x52, 0x06, 0x6d, 0x61, 0x72, 0x67, 0x69, 0x6e, 0x22, 0xa0, 0x01,
+	0x0a, 0x0d, 0x45, 0x6e, 0x72, 0x6f, 0x6c, 0x6c, 0x6d, 0x65, 0x6e, 0x74, 0x4a, 0x6f, 0x62, 0x12,
+	0x15, 0x0a, 0x06, 0x6a, 0x6f, 0x62, 0x5f, 0x69, 0x64, 0x18, 0x01, 0x20, 0x01, 0x28, 0x09, 0x52,
+	0x05, 0x6a, 0x6f, 0x62, 0x49, 0x64, 0x12, 0x37, 0x0a, 0x05, 0x73, 0x74, 0x61, 0x74, 0x65, 0x18,
+	0x02, 0x20, 0x01, 0x28, 0x0e, 0x32, 0x21, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63,
+	0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x45, 0x6e, 0x72, 0x6f, 0x6c, 0x6c, 0x6d,
+	0x65, 0x6e, 0x74, 0x53, 0x74, 0x61, 0x74, 0x65, 0x52, 0x05, 0x73, 0x74, 0x61, 0x74, 0x65, 0x12,
+	0x18, 0x0a, 0x07, 0x6d, 0x65, 0x73, 0x73, 0x61, 0x67, 0x65, 0x18, 0x03, 0x20, 0x01, 0x28, 0x09,
+	0x52, 0x07, 0x6d, 0x65, 0x73, 0x73, 0x61, 0x67, 0x65, 0x12, 0x25, 0x0a, 0x0e, 0x71, 0x75, 0x65,
+	0x75, 0x65, 0x5f, 0x70, 0x6f, 0x73, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x18, 0x04, 0x20, 0x01, 0x28,
+	0x05, 0x52, 0x0d, 0x71, 0x75, 0x65, 0x75, 0x65, 0x50, 0x6f, 0x73, 0x69, 0x74, 0x69, 0x6f, 0x6e,
+	0x22, 0x30, 0x0a, 0x17, 0x45, 0x6e, 0x72, 0x6f, 0x6c, 0x6c, 0x6d, 0x65, 0x6e, 0x74, 0x53, 0x74,
+	0x61, 0x74, 0x75, 0x73, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x12, 0x15, 0x0a, 0x06, 0x6a,
+	0x6f, 0x62, 0x5f, 0x69, 0x64, 0x18, 0x01, 0x20, 0x01, 0x28, 0x09, 0x52, 0x05, 0x6a, 0x6f, 0x62,
+	0x49, 0x64, 0x22, 0x34, 0x0a, 0x11, 0x41, 0x74, 0x74, 0x65, 0x6e, 0x64, 0x61, 0x6e, 0x63, 0x65,
+	0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x12, 0x1f, 0x0a, 0x0b, 0x65, 0x6d, 0x70, 0x6c, 0x6f,
+	0x79, 0x65, 0x65, 0x5f, 0x69, 0x64, 0x18, 0x01, 0x20, 0x01, 0x28, 0x09, 0x52, 0x0a, 0x65, 0x6d,
+	0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x49, 0x64, 0x22, 0x48, 0x0a, 0x12, 0x41, 0x74, 0x74, 0x65,
+	0x6e, 0x64, 0x61, 0x6e, 0x63, 0x65, 0x52, 0x65, 0x73, 0x70, 0x6f, 0x6e, 0x73, 0x65, 0x12, 0x18,
+	0x0a, 0x07, 0x73, 0x75, 0x63, 0x63, 0x65, 0x73, 0x73, 0x18, 0x01, 0x20, 0x01, 0x28, 0x08, 0x52,
+	0x07, 0x73, 0x75, 0x63, 0x63, 0x65, 0x73, 0x73, 0x12, 0x18, 0x0a, 0x07, 0x6d, 0x65, 0x73, 0x73,
+	0x61, 0x67, 0x65, 0x18, 0x02, 0x20, 0x01, 0x28, 0x09, 0x52, 0x07, 0x6d, 0x65, 0x73, 0x73, 0x61,
+	0x67, 0x65, 0x22, 0x07, 0x0a, 0x05, 0x45, 0x6d, 0x70, 0x74, 0x79, 0x22, 0x3f, 0x0a, 0x08, 0x45,
+	0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x12, 0x12, 0x0a, 0x04, 0x6e, 0x61, 0x6d, 0x65, 0x18,
+	0x01, 0x20, 0x01, 0x28, 0x09, 0x52, 0x04, 0x6e, 0x61, 0x6d, 0x65, 0x12, 0x1f, 0x0a, 0x0b, 0x65,
+	0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x5f, 0x69, 0x64, 0x18, 0x02, 0x20, 0x01, 0x28, 0x09,
+	0x52, 0x0a, 0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x49, 0x64, 0x22, 0x48, 0x0a, 0x0c,
+	0x45, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x4c, 0x69, 0x73, 0x74, 0x12, 0x38, 0x0a, 0x09,
+	0x65, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x73, 0x18, 0x01, 0x20, 0x03, 0x28, 0x0b, 0x32,
+	0x1a, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69,
+	0x6f, 0x6e, 0x2e, 0x45, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x52, 0x09, 0x65, 0x6d, 0x70,
+	0x6c, 0x6f, 0x79, 0x65, 0x65, 0x73, 0x2a, 0x97, 0x01, 0x0a, 0x12, 0x52, 0x65, 0x63, 0x6f, 0x67,
+	0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x50, 0x72, 0x6f, 0x66, 0x69, 0x6c, 0x65, 0x12, 0x1f, 0x0a,
+	0x1b, 0x52, 0x45, 0x43, 0x4f, 0x47, 0x4e, 0x49, 0x54, 0x49, 0x4f, 0x4e, 0x5f, 0x50, 0x52, 0x4f,
+	0x46, 0x49, 0x4c, 0x45, 0x5f, 0x44, 0x45, 0x46, 0x41, 0x55, 0x4c, 0x54, 0x10, 0x00, 0x12, 0x1c,
+	0x0a, 0x18, 0x52, 0x45, 0x43, 0x4f, 0x47, 0x4e, 0x49, 0x54, 0x49, 0x4f, 0x4e, 0x5f, 0x50, 0x52,
+	0x4f, 0x46, 0x49, 0x4c, 0x45, 0x5f, 0x46, 0x41, 0x53, 0x54, 0x10, 0x01, 0x12, 0x20, 0x0a, 0x1c,
+	0x52, 0x45, 0x43, 0x4f, 0x47, 0x4e, 0x49, 0x54, 0x49, 0x4f, 0x4e, 0x5f, 0x50, 0x52, 0x4f, 0x46,
+	0x49, 0x4c, 0x45, 0x5f, 0x42, 0x41, 0x4c, 0x41, 0x4e, 0x43, 0x45, 0x44, 0x10, 0x02, 0x12, 0x20,
+	0x0a, 0x1c, 0x52, 0x45, 0x43, 0x4f, 0x47, 0x4e, 0x49, 0x54, 0x49, 0x4f, 0x4e, 0x5f, 0x50, 0x52,
+	0x4f, 0x46, 0x49, 0x4c, 0x45, 0x5f, 0x41, 0x43, 0x43, 0x55, 0x52, 0x41, 0x54, 0x45, 0x10, 0x03,
+	0x2a, 0xab, 0x01, 0x0a, 0x0f, 0x45, 0x6e, 0x72, 0x6f, 0x6c, 0x6c, 0x6d, 0x65, 0x6e, 0x74, 0x53,
+	0x74, 0x61, 0x74, 0x65, 0x12, 0x20, 0x0a, 0x1c, 0x45, 0x4e, 0x52, 0x4f, 0x4c, 0x4c, 0x4d, 0x45,
+	0x4e, 0x54, 0x5f, 0x53, 0x54, 0x41, 0x54, 0x45, 0x5f, 0x55, 0x4e, 0x53, 0x50, 0x45, 0x43, 0x49,
+	0x46, 0x49, 0x45, 0x44, 0x10, 0x00, 0x12, 0x1b, 0x0a, 0x17, 0x45, 0x4e, 0x52, 0x4f, 0x4c, 0x4c,
+	0x4d, 0x45, 0x4e, 0x54, 0x5f, 0x53, 0x54, 0x41, 0x54, 0x45, 0x5f, 0x51, 0x55, 0x45, 0x55, 0x45,
+	0x44, 0x10, 0x01, 0x12, 0x1c, 0x0a, 0x18, 0x45, 0x4e, 0x52, 0x4f, 0x4c, 0x4c, 0x4d, 0x45, 0x4e,
+	0x54, 0x5f, 0x53, 0x54, 0x41, 0x54, 0x45, 0x5f, 0x52, 0x55, 0x4e, 0x4e, 0x49, 0x4e, 0x47, 0x10,
+	0x02, 0x12, 0x1e, 0x0a, 0x1a, 0x45, 0x4e, 0x52, 0x4f, 0x4c, 0x4c, 0x4d, 0x45, 0x4e, 0x54, 0x5f,
+	0x53, 0x54, 0x41, 0x54, 0x45, 0x5f, 0x53, 0x55, 0x43, 0x43, 0x45, 0x45, 0x44, 0x45, 0x44, 0x10,
+	0x03, 0x12, 0x1b, 0x0a, 0x17, 0x45, 0x4e, 0x52, 0x4f, 0x4c, 0x4c, 0x4d, 0x45, 0x4e, 0x54, 0x5f,
+	0x53, 0x54, 0x41, 0x54, 0x45, 0x5f, 0x46, 0x41, 0x49, 0x4c, 0x45, 0x44, 0x10, 0x04, 0x32, 0xce,
+	0x04, 0x0a, 0x16, 0x46, 0x61, 0x63, 0x65, 0x52, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69,
+	0x6f, 0x6e, 0x53, 0x65, 0x72, 0x76, 0x69, 0x63, 0x65, 0x12, 0x69, 0x0a, 0x10, 0x52, 0x65, 0x67,
+	0x69, 0x73, 0x74, 0x65, 0x72, 0x45, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x12, 0x29, 0x2e,
+	0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e,
+	0x2e, 0x52, 0x65, 0x67, 0x69, 0x73, 0x74, 0x65, 0x72, 0x45, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65,
+	0x65, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x1a, 0x2a, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f,
+	0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x52, 0x65, 0x67, 0x69,
+	0x73, 0x74, 0x65, 0x72, 0x45, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x52, 0x65, 0x73, 0x70,
+	0x6f, 0x6e, 0x73, 0x65, 0x12, 0x60, 0x0a, 0x0d, 0x52, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a,
+	0x65, 0x46, 0x61, 0x63, 0x65, 0x12, 0x26, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63,
+	0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x52, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69,
+	0x7a, 0x65, 0x46, 0x61, 0x63, 0x65, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x1a, 0x27, 0x2e,
+	0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e,
+	0x2e, 0x52, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a, 0x65, 0x46, 0x61, 0x63, 0x65, 0x52, 0x65,
+	0x73, 0x70, 0x6f, 0x6e, 0x73, 0x65, 0x12, 0x5a, 0x0a, 0x0d, 0x4c, 0x6f, 0x67, 0x41, 0x74, 0x74,
+	0x65, 0x6e, 0x64, 0x61, 0x6e, 0x63, 0x65, 0x12, 0x23, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72,
+	0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x41, 0x74, 0x74, 0x65, 0x6e,
+	0x64, 0x61, 0x6e, 0x63, 0x65, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x1a, 0x24, 0x2e, 0x66,
+	0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e,
+	0x41, 0x74, 0x74, 0x65, 0x6e, 0x64, 0x61, 0x6e, 0x63, 0x65, 0x52, 0x65, 0x73, 0x70, 0x6f, 0x6e,
+	0x73, 0x65, 0x12, 0x48, 0x0a, 0x0d, 0x4c, 0x69, 0x73, 0x74, 0x45, 0x6d, 0x70, 0x6c, 0x6f, 0x79,
+	0x65, 0x65, 0x73, 0x12, 0x17, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67,
+	0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x45, 0x6d, 0x70, 0x74, 0x79, 0x1a, 0x1e, 0x2e, 0x66,
 	0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e,
-	0x52, 0x65, 0x67, 0x69, 0x73, 0x74, 0x65, 0x72, 0x45, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65,
-	0x52, 0x65, 0x73, 0x70, 0x6f, 0x6e, 0x73, 0x65, 0x12, 0x60, 0x0a, 0x0d, 0x52, 0x65, 0x63, 0x6f,
-	0x67, 0x6e, 0x69, 0x7a, 0x65, 0x46, 0x61, 0x63, 0x65, 0x12, 0x26, 0x2e, 0x66, 0x61, 0x63, 0x65,
-	0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x52, 0x65, 0x63,
-	0x6f, 0x67, 0x6e, 0x69, 0x7a, 0x65, 0x46, 0x61, 0x63, 0x65, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73,
-	0x74, 0x1a, 0x27, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69,
-	0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x52, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x7a, 0x65, 0x46, 0x61,
-	0x63, 0x65, 0x52, 0x65, 0x73, 0x70, 0x6f, 0x6e, 0x73, 0x65, 0x12, 0x5a, 0x0a, 0x0d, 0x4c, 0x6f,
-	0x67, 0x41, 0x74, 0x74, 0x65, 0x6e, 0x64, 0x61, 0x6e, 0x63, 0x65, 0x12, 0x23, 0x2e, 0x66, 0x61,
-	0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x41,
-	0x74, 0x74, 0x65, 0x6e, 0x64, 0x61, 0x6e, 0x63, 0x65, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74,
-	0x1a, 0x24, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74,
-	0x69, 0x6f, 0x6e, 0x2e, 0x41, 0x74, 0x74, 0x65, 0x6e, 0x64, 0x61, 0x6e, 0x63, 0x65, 0x52, 0x65,
-	0x73, 0x70, 0x6f, 0x6e, 0x73, 0x65, 0x12, 0x48, 0x0a, 0x0d, 0x4c, 0x69, 0x73, 0x74, 0x45, 0x6d,
-	0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x73, 0x12, 0x17, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72,
-	0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x45, 0x6d, 0x70, 0x74, 0x79,
-	0x1a, 0x1e, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74,
-	0x69, 0x6f, 0x6e, 0x2e, 0x45, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x4c, 0x69, 0x73, 0x74,
-	0x42, 0x32, 0x5a, 0x30, 0x67, 0x69, 0x74, 0x68, 0x75, 0x62, 0x2e, 0x63, 0x6f, 0x6d, 0x2f, 0x65,
-	0x78, 0x61, 0x6d, 0x70, 0x6c, 0x65, 0x2f, 0x66, 0x61, 0x63, 0x65, 0x2d, 0x61, 0x74, 0x74, 0x65,
-	0x6e, 0x64, 0x61, 0x6e, 0x63, 0x65, 0x2f, 0x62, 0x61, 0x63, 0x6b, 0x65, 0x6e, 0x64, 0x2f, 0x70,
-	0x62, 0x3b, 0x70, 0x62, 0x62, 0x06, 0x70, 0x72, 0x6f, 0x74, 0x6f, 0x33,
+	0x45, 0x6d, 0x70, 0x6c, 0x6f, 0x79, 0x65, 0x65, 0x4c, 0x69, 0x73, 0x74, 0x12, 0x5e, 0x0a, 0x10,
+	0x53, 0x75, 0x62, 0x6d, 0x69, 0x74, 0x45, 0x6e, 0x72, 0x6f, 0x6c, 0x6c, 0x6d, 0x65, 0x6e, 0x74,
+	0x12, 0x29, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74,
+	0x69, 0x6f, 0x6e, 0x2e, 0x52, 0x65, 0x67, 0x69, 0x73, 0x74, 0x65, 0x72, 0x45, 0x6d, 0x70, 0x6c,
+	0x6f, 0x79, 0x65, 0x65, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x1a, 0x1f, 0x2e, 0x66, 0x61,
+	0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x45,
+	0x6e, 0x72, 0x6f, 0x6c, 0x6c, 0x6d, 0x65, 0x6e, 0x74, 0x4a, 0x6f, 0x62, 0x12, 0x61, 0x0a, 0x13,
+	0x47, 0x65, 0x74, 0x45, 0x6e, 0x72, 0x6f, 0x6c, 0x6c, 0x6d, 0x65, 0x6e, 0x74, 0x53, 0x74, 0x61,
+	0x74, 0x75, 0x73, 0x12, 0x29, 0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67,
+	0x6e, 0x69, 0x74, 0x69, 0x6f, 0x6e, 0x2e, 0x45, 0x6e, 0x72, 0x6f, 0x6c, 0x6c, 0x6d, 0x65, 0x6e,
+	0x74, 0x53, 0x74, 0x61, 0x74, 0x75, 0x73, 0x52, 0x65, 0x71, 0x75, 0x65, 0x73, 0x74, 0x1a, 0x1f,
+	0x2e, 0x66, 0x61, 0x63, 0x65, 0x5f, 0x72, 0x65, 0x63, 0x6f, 0x67, 0x6e, 0x69, 0x74, 0x69, 0x6f,
+	0x6e, 0x2e, 0x45, 0x6e, 0x72, 0x6f, 0x6c, 0x6c, 0x6d, 0x65, 0x6e, 0x74, 0x4a, 0x6f, 0x62, 0x42,
+	0x32, 0x5a, 0x30, 0x67, 0x69, 0x74, 0x68, 0x75, 0x62, 0x2e, 0x63, 0x6f, 0x6d, 0x2f, 0x65, 0x78,
+	0x61, 0x6d, 0x70, 0x6c, 0x65, 0x2f, 0x66, 0x61, 0x63, 0x65, 0x2d, 0x61, 0x74, 0x74, 0x65, 0x6e,
+	0x64, 0x61, 0x6e, 0x63, 0x65, 0x2f, 0x62, 0x61, 0x63, 0x6b, 0x65, 0x6e, 0x64, 0x2f, 0x70, 0x62,
+	0x3b, 0x70, 0x62, 0x62, 0x06, 0x70, 0x72, 0x6f, 0x74, 0x6f, 0x33,
 }
 
 var (
@@ -578,33 +1163,51 @@ func file_proto_face_recognition_proto_rawDescGZIP() []byte {
 	return file_proto_face_recognition_proto_rawDescData
 }
 
-var file_proto_face_recognition_proto_msgTypes = make([]protoimpl.MessageInfo, 9)
+var file_proto_face_recognition_proto_enumTypes = make([]protoimpl.EnumInfo, 2)
+var file_proto_face_recognition_proto_msgTypes = make([]protoimpl.MessageInfo, 14)
 var file_proto_face_recognition_proto_goTypes = []interface{}{
-	(*RegisterEmployeeRequest)(nil),  // 0: face_recognition.RegisterEmployeeRequest
-	(*RegisterEmployeeResponse)(nil), // 1: face_recognition.RegisterEmployeeResponse
-	(*RecognizeFaceRequest)(nil),     // 2: face_recognition.RecognizeFaceRequest
-	(*RecognizeFaceResponse)(nil),    // 3: face_recognition.RecognizeFaceResponse
-	(*AttendanceRequest)(nil),        // 4: face_recognition.AttendanceRequest
-	(*AttendanceResponse)(nil),       // 5: face_recognition.AttendanceResponse
-	(*Empty)(nil),                    // 6: face_recognition.Empty
-	(*Employee)(nil),                 // 7: face_recognition.Employee
-	(*EmployeeList)(nil),             // 8: face_recognition.EmployeeList
+	(RecognitionProfile)(0),          // 0: face_recognition.RecognitionProfile
+	(EnrollmentState)(0),             // 1: face_recognition.EnrollmentState
+	(*RegisterEmployeeRequest)(nil),  // 2: face_recognition.RegisterEmployeeRequest
+	(*RegisterEmployeeResponse)(nil), // 3: face_recognition.RegisterEmployeeResponse
+	(*FaceBox)(nil),                  // 4: face_recognition.FaceBox
+	(*RecognizeFaceRequest)(nil),     // 5: face_recognition.RecognizeFaceRequest
+	(*MatchCandidate)(nil),           // 6: face_recognition.MatchCandidate
+	(*FaceMatch)(nil),                // 7: face_recognition.FaceMatch
+	(*RecognizeFaceResponse)(nil),    // 8: face_recognition.RecognizeFaceResponse
+	(*EnrollmentJob)(nil),            // 9: face_recognition.EnrollmentJob
+	(*EnrollmentStatusRequest)(nil),  // 10: face_recognition.EnrollmentStatusRequest
+	(*AttendanceRequest)(nil),        // 11: face_recognition.AttendanceRequest
+	(*AttendanceResponse)(nil),       // 12: face_recognition.AttendanceResponse
+	(*Empty)(nil),                    // 13: face_recognition.Empty
+	(*Employee)(nil),                 // 14: face_recognition.Employee
+	(*EmployeeList)(nil),             // 15: face_recognition.EmployeeList
 }
 var file_proto_face_recognition_proto_depIdxs = []int32{
-	7, // 0: face_recognition.EmployeeList.employees:type_name -> face_recognition.Employee
-	0, // 1: face_recognition.FaceRecognitionService.RegisterEmployee:input_type -> face_recognition.RegisterEmployeeRequest
-	2, // 2: face_recognition.FaceRecognitionService.RecognizeFace:input_type -> face_recognition.RecognizeFaceRequest
-	4, // 3: face_recognition.FaceRecognitionService.LogAttendance:input_type -> face_recognition.AttendanceRequest
-	6, // 4: face_recognition.FaceRecognitionService.ListEmployees:input_type -> face_recognition.Empty
-	1, // 5: face_recognition.FaceRecognitionService.RegisterEmployee:output_type -> face_recognition.RegisterEmployeeResponse
-	3, // 6: face_recognition.FaceRecognitionService.RecognizeFace:output_type -> face_recognition.RecognizeFaceResponse
-	5, // 7: face_recognition.FaceRecognitionService.LogAttendance:output_type -> face_recognition.AttendanceResponse
-	8, // 8: face_recognition.FaceRecognitionService.ListEmployees:output_type -> face_recognition.EmployeeList
-	5, // [5:9] is the sub-list for method output_type
-	1, // [1:5] is the sub-list for method input_type
-	1, // [1:1] is the sub-list for extension type_name
-	1, // [1:1] is the sub-list for extension extendee
-	0, // [0:1] is the sub-list for field type_name
+	0,  // 0: face_recognition.RecognizeFaceRequest.profile:type_name -> face_recognition.RecognitionProfile
+	4,  // 1: face_recognition.RecognizeFaceRequest.face_box:type_name -> face_recognition.FaceBox
+	4,  // 2: face_recognition.FaceMatch.box:type_name -> face_recognition.FaceBox
+	7,  // 3: face_recognition.RecognizeFaceResponse.faces:type_name -> face_recognition.FaceMatch
+	6,  // 4: face_recognition.RecognizeFaceResponse.alternatives:type_name -> face_recognition.MatchCandidate
+	1,  // 5: face_recognition.EnrollmentJob.state:type_name -> face_recognition.EnrollmentState
+	14, // 6: face_recognition.EmployeeList.employees:type_name -> face_recognition.Employee
+	2,  // 7: face_recognition.FaceRecognitionService.RegisterEmployee:input_type -> face_recognition.RegisterEmployeeRequest
+	5,  // 8: face_recognition.FaceRecognitionService.RecognizeFace:input_type -> face_recognition.RecognizeFaceRequest
+	11, // 9: face_recognition.FaceRecognitionService.LogAttendance:input_type -> face_recognition.AttendanceRequest
+	13, // 10: face_recognition.FaceRecognitionService.ListEmployees:input_type -> face_recognition.Empty
+	2,  // 11: face_recognition.FaceRecognitionService.SubmitEnrollment:input_type -> face_recognition.RegisterEmployeeRequest
+	10, // 12: face_recognition.FaceRecognitionService.GetEnrollmentStatus:input_type -> face_recognition.EnrollmentStatusRequest
+	3,  // 13: face_recognition.FaceRecognitionService.RegisterEmployee:output_type -> face_recognition.RegisterEmployeeResponse
+	8,  // 14: face_recognition.FaceRecognitionService.RecognizeFace:output_type -> face_recognition.RecognizeFaceResponse
+	12, // 15: face_recognition.FaceRecognitionService.LogAttendance:output_type -> face_recognition.AttendanceResponse
+	15, // 16: face_recognition.FaceRecognitionService.ListEmployees:output_type -> face_recognition.EmployeeList
+	9,  // 17: face_recognition.FaceRecognitionService.SubmitEnrollment:output_type -> face_recognition.EnrollmentJob
+	9,  // 18: face_recognition.FaceRecognitionService.GetEnrollmentStatus:output_type -> face_recognition.EnrollmentJob
+	13, // [13:19] is the sub-list for method output_type
+	7,  // [7:13] is the sub-list for method input_type
+	7,  // [7:7] is the sub-list for extension type_name
+	7,  // [7:7] is the sub-list for extension extendee
+	0,  // [0:7] is the sub-list for field type_name
 }
 
 func init() { file_proto_face_recognition_proto_init() }
@@ -638,7 +1241,7 @@ func file_proto_face_recognition_proto_init() {
 			}
 		}
 		file_proto_face_recognition_proto_msgTypes[2].Exporter = func(v interface{}, i int) interface{} {
-			switch v := v.(*RecognizeFaceRequest); i {
+			switch v := v.(*FaceBox); i {
 			case 0:
 				return &v.state
 			case 1:
@@ -650,7 +1253,7 @@ func file_proto_face_recognition_proto_init() {
 			}
 		}
 		file_proto_face_recognition_proto_msgTypes[3].Exporter = func(v interface{}, i int) interface{} {
-			switch v := v.(*RecognizeFaceResponse); i {
+			switch v := v.(*RecognizeFaceRequest); i {
 			case 0:
 				return &v.state
 			case 1:
@@ -662,7 +1265,7 @@ func file_proto_face_recognition_proto_init() {
 			}
 		}
 		file_proto_face_recognition_proto_msgTypes[4].Exporter = func(v interface{}, i int) interface{} {
-			switch v := v.(*AttendanceRequest); i {
+			switch v := v.(*MatchCandidate); i {
 			case 0:
 				return &v.state
 			case 1:
@@ -674,7 +1277,7 @@ func file_proto_face_recognition_proto_init() {
 			}
 		}
 		file_proto_face_recognition_proto_msgTypes[5].Exporter = func(v interface{}, i int) interface{} {
-			switch v := v.(*AttendanceResponse); i {
+			switch v := v.(*FaceMatch); i {
 			case 0:
 				return &v.state
 			case 1:
@@ -686,7 +1289,7 @@ func file_proto_face_recognition_proto_init() {
 			}
 		}
 		file_proto_face_recognition_proto_msgTypes[6].Exporter = func(v interface{}, i int) interface{} {
-			switch v := v.(*Empty); i {
+			switch v := v.(*RecognizeFaceResponse); i {
 			case 0:
 				return &v.state
 			case 1:
@@ -698,7 +1301,7 @@ func file_proto_face_recognition_proto_init() {
 			}
 		}
 		file_proto_face_recognition_proto_msgTypes[7].Exporter = func(v interface{}, i int) interface{} {
-			switch v := v.(*Employee); i {
+			switch v := v.(*EnrollmentJob); i {
 			case 0:
 				return &v.state
 			case 1:
@@ -710,6 +1313,66 @@ func file_proto_face_recognition_proto_init() {
 			}
 		}
 		file_proto_face_recognition_proto_msgTypes[8].Exporter = func(v interface{}, i int) interface{} {
+			switch v := v.(*EnrollmentStatusRequest); i {
+			case 0:
+				return &v.state
+			case 1:
+				return &v.sizeCache
+			case 2:
+				return &v.unknownFields
+			default:
+				return nil
+			}
+		}
+		file_proto_face_recognition_proto_msgTypes[9].Exporter = func(v interface{}, i int) interface{} {
+			switch v := v.(*AttendanceRequest); i {
+			case 0:
+				return &v.state
+			case 1:
+				return &v.sizeCache
+			case 2:
+				return &v.unknownFields
+			default:
+				return nil
+			}
+		}
+		file_proto_face_recognition_proto_msgTypes[10].Exporter = func(v interface{}, i int) interface{} {
+			switch v := v.(*AttendanceResponse); i {
+			case 0:
+				return &v.state
+			case 1:
+				return &v.sizeCache
+			case 2:
+				return &v.unknownFields
+			default:
+				return nil
+			}
+		}
+		file_proto_face_recognition_proto_msgTypes[11].Exporter = func(v interface{}, i int) interface{} {
+			switch v := v.(*Empty); i {
+			case 0:
+				return &v.state
+			case 1:
+				return &v.sizeCache
+			case 2:
+				return &v.unknownFields
+			default:
+				return nil
+			}
+		}
+		file_proto_face_recognition_proto_msgTypes[12].Exporter = func(v interface{}, i int) interface{} {
+			switch v := v.(*Employee); i {
+			case 0:
+				return &v.state
+			case 1:
+				return &v.sizeCache
+			case 2:
+				return &v.unknownFields
+			default:
+				return nil
+			}
+		}
+		file_proto_face_recognition_proto_msgTypes[13].Exporter = func(v interface{}, i int) interface{} {
 			switch v := v.(*EmployeeList); i {
 			case 0:
 				return &v.state
@@ -727,13 +1390,14 @@ func file_proto_face_recognition_proto_init() {
 		File: protoimpl.DescBuilder{
 			GoPackagePath: reflect.TypeOf(x{}).PkgPath(),
 			RawDescriptor: file_proto_face_recognition_proto_rawDesc,
-			NumEnums:      0,
-			NumMessages:   9,
+			NumEnums:      2,
+			NumMessages:   14,
 			NumExtensions: 0,
 			NumServices:   1,
 		},
 		GoTypes:           file_proto_face_recognition_proto_goTypes,
 		DependencyIndexes: file_proto_face_recognition_proto_depIdxs,
+		EnumInfos:         file_proto_face_recognition_proto_enumTypes,
 		MessageInfos:      file_proto_face_recognition_proto_msgTypes,
 	}.Build()
 	File_proto_face_recognition_proto = out.File
@@ -19,10 +19,12 @@ import (
 const _ = grpc.SupportPackageIsVersion7
 
 const (
-	FaceRecognitionService_RegisterEmployee_FullMethodName = "/face_recognition.FaceRecognitionService/RegisterEmployee"
-	FaceRecognitionService_RecognizeFace_FullMethodName    = "/face_recognition.FaceRecognitionService/RecognizeFace"
-	FaceRecognitionService_LogAttendance_FullMethodName    = "/face_recognition.FaceRecognitionService/LogAttendance"
-	FaceRecognitionService_ListEmployees_FullMethodName    = "/face_recognition.FaceRecognitionService/ListEmployees"
+	FaceRecognitionService_RegisterEmployee_FullMethodName    = "/face_recognition.FaceRecognitionService/RegisterEmployee"
+	FaceRecognitionService_RecognizeFace_FullMethodName       = "/face_recognition.FaceRecognitionService/RecognizeFace"
+	FaceRecognitionService_LogAttendance_FullMethodName       = "/face_recognition.FaceRecognitionService/LogAttendance"
+	FaceRecognitionService_ListEmployees_FullMethodName       = "/face_recognition.FaceRecognitionService/ListEmployees"
+	FaceRecognitionService_SubmitEnrollment_FullMethodName    = "/face_recognition.FaceRecognitionService/SubmitEnrollment"
+	FaceRecognitionService_GetEnrollmentStatus_FullMethodName = "/face_recognition.FaceRecognitionService/GetEnrollmentStatus"
 )
 
 // FaceRecognitionServiceClient is the client API for FaceRecognitionService service.
@@ -37,6 +39,10 @@ type FaceRecognitionServiceClient interface {
 	LogAttendance(ctx context.Context, in *AttendanceRequest, opts ...grpc.CallOption) (*AttendanceResponse, error)
 	// Obtener empleados registrados
 	ListEmployees(ctx context.Context, in *Empty, opts ...grpc.CallOption) (*EmployeeList, error)
+	// Encolar alta de empleado (procesada en segundo plano)
+	SubmitEnrollment(ctx context.Context, in *RegisterEmployeeRequest, opts ...grpc.CallOption) (*EnrollmentJob, error)
+	// Consultar estado de un alta encolada
+	GetEnrollmentStatus(ctx context.Context, in *EnrollmentStatusRequest, opts ...grpc.CallOption) (*EnrollmentJob, error)
 }
 
 type faceRecognitionServiceClient struct {
@@ -83,6 +89,24 @@ func (c *faceRecognitionServiceClient) ListEmployees(ctx context.Context, in *Em
 	return out, nil
 }
 
+func (c *faceRecognitionServiceClient) SubmitEnrollment(ctx context.Context, in *RegisterEmployeeRequest, opts ...grpc.CallOption) (*EnrollmentJob, error) {
+	out := new(EnrollmentJob)
+	err := c.cc.Invoke(ctx, FaceRecognitionService_SubmitEnrollment_FullMethodName, in, out, opts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
+func (c *faceRecognitionServiceClient) GetEnrollmentStatus(ctx context.Context, in *EnrollmentStatusRequest, opts ...grpc.CallOption) (*EnrollmentJob, error) {
+	out := new(EnrollmentJob)
+	err := c.cc.Invoke(ctx, FaceRecognitionService_GetEnrollmentStatus_FullMethodName, in, out, opts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
 // FaceRecognitionServiceServer is the server API for FaceRecognitionService service.
 // All implementations must embed UnimplementedFaceRecognitionServiceServer
 // for forward compatibility
@@ -95,6 +119,10 @@ type FaceRecognitionServiceServer interface {
 	LogAttendance(context.Context, *AttendanceRequest) (*AttendanceResponse, error)
 	// Obtener empleados registrados
 	ListEmployees(context.Context, *Empty) (*EmployeeList, error)
+	// Encolar alta de empleado (procesada en segundo plano)
+	SubmitEnrollment(context.Context, *RegisterEmployeeRequest) (*EnrollmentJob, error)
+	// Consultar estado de un alta encolada
+	GetEnrollmentStatus(context.Context, *EnrollmentStatusRequest) (*EnrollmentJob, error)
 	mustEmbedUnimplementedFaceRecognitionServiceServer()
 }
 
@@ -114,6 +142,12 @@ func (UnimplementedFaceRecognitionServiceServer) LogAttendance(context.Context,
 func (UnimplementedFaceRecognitionServiceServer) ListEmployees(context.Context, *Empty) (*EmployeeList, error) {
 	return nil, status.Errorf(codes.Unimplemented, "method ListEmployees not implemented")
 }
+func (UnimplementedFaceRecognitionServiceServer) SubmitEnrollment(context.Context, *RegisterEmployeeRequest) (*EnrollmentJob, error) {
+	return nil, status.Errorf(codes.Unimplemented, "method SubmitEnrollment not implemented")
+}
+func (UnimplementedFaceRecognitionServiceServer) GetEnrollmentStatus(context.Context, *EnrollmentStatusRequest) (*EnrollmentJob, error) {
+	return nil, status.Errorf(codes.Unimplemented, "method GetEnrollmentStatus not implemented")
+}
 func (UnimplementedFaceRecognitionServiceServer) mustEmbedUnimplementedFaceRecognitionServiceServer() {
 }
 
@@ -200,6 +234,42 @@ func _FaceRecognitionService_ListEmployees_Handler(srv interface{}, ctx context.
 	return interceptor(ctx, in, info, handler)
 }
 
+func _FaceRecognitionService_SubmitEnrollment_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(RegisterEmployeeRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(FaceRecognitionServiceServer).SubmitEnrollment(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: FaceRecognitionService_SubmitEnrollment_FullMethodName,
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(FaceRecognitionServiceServer).SubmitEnrollment(ctx, req.(*RegisterEmployeeRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
+func _FaceRecognitionService_GetEnrollmentStatus_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(EnrollmentStatusRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(FaceRecognitionServiceServer).GetEnrollmentStatus(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: FaceRecognitionService_GetEnrollmentStatus_FullMethodName,
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(FaceRecognitionServiceServer).GetEnrollmentStatus(ctx, req.(*EnrollmentStatusRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
 // FaceRecognitionService_ServiceDesc is the grpc.ServiceDesc for FaceRecognitionService service.
 // It's only intended for direct use with grpc.RegisterService,
 // and not to be introspected or modified (even as a copy)
@@ -223,6 +293,14 @@ var FaceRecognitionService_ServiceDesc = grpc.ServiceDesc{
 			MethodName: "ListEmployees",
 			Handler:    _FaceRecognitionService_ListEmployees_Handler,
 		},
+		{
+			MethodName: "SubmitEnrollment",
+			Handler:    _FaceRecognitionService_SubmitEnrollment_Handler,
+		},
+		{
+			MethodName: "GetEnrollmentStatus",
+			Handler:    _FaceRecognitionService_GetEnrollmentStatus_Handler,
+		},
 	},
 	Streams:  []grpc.StreamDesc{},
 	Metadata: "proto/face_recognition.proto",
@@ -0,0 +1,16 @@
+"""Cliente Python de face_server.py sobre los stubs generados en `pb`.
+
+Requiere `ml-model` en sys.path (igual que los scripts de `scripts/`):
+
+    sys.path.insert(0, "ml-model")
+    from bmpi_client import FaceClient
+
+    with FaceClient() as client:
+        response = client.recognize(image_bytes)
+        results = client.recognize_many(images)
+        print(client.stats())
+"""
+
+from .client import ClientConfig, FaceClient, LatencyStats
+
+__all__ = ["ClientConfig", "FaceClient", "LatencyStats"]
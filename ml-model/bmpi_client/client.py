@@ -0,0 +1,334 @@
+"""Cliente gRPC de face_server.py: canales reutilizados, deadlines, llamadas en vuelo con back-pressure y latencias."""
+
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import CancelledError, Future
+from dataclasses import dataclass, replace
+from typing import Iterable, Iterator, Sequence
+
+import grpc
+
+from pb import face_recognition_pb2 as pb2
+from pb import face_recognition_pb2_grpc as pb2_grpc
+
+# RESOURCE_EXHAUSTED solo se reintenta con el trailer grpc-retry-pushback-ms, que el servidor pone al rechazar
+# antes de procesar (admision o cola de altas llena). Sin trailer lo genera gRPC, p. ej. por un mensaje demasiado
+# grande, y reintentar no sirve: misma regla que classifyFaceRPCError en el backend Go.
+# UNAVAILABLE solo se reintenta en RPC sin efectos o en altas con idempotency_key (LogAttendance podria duplicarse).
+IDEMPOTENT_METHODS = ("RecognizeFace", "ListEmployees", "GetEnrollmentStatus")
+RETRY_BACKOFF_SECONDS = 0.1
+LATENCY_WINDOW = 10000
+ENROLLMENT_DONE_STATES = (pb2.ENROLLMENT_STATE_SUCCEEDED, pb2.ENROLLMENT_STATE_FAILED)
+
+
+def new_idempotency_key() -> str:
+    # Una por alta logica: todos los reintentos de esa alta la repiten y el servidor devuelve el resultado original.
+    return uuid.uuid4().hex
+
+
+def bool_from_env(name: str) -> bool:
+    value = os.getenv(name, "").strip().lower()
+    return value in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class ClientConfig:
+    target: str = "localhost:50051"
+    tls: bool = False
+    ca_cert: str = ""
+    server_name: str = ""
+    channels: int = 1
+    timeout: float = 10.0
+    max_in_flight: int = 8
+    max_retries: int = 2
+    max_message_mb: int = 20
+
+    @classmethod
+    def from_env(cls) -> ClientConfig:
+        """Mismas variables que usa el backend Go para conectarse al servicio, mas las propias del cliente."""
+        return cls(
+            target=os.getenv("BMPI_FACE_GRPC_ADDR", "").strip() or "localhost:50051",
+            tls=bool_from_env("BMPI_FACE_GRPC_TLS"),
+            ca_cert=os.getenv("BMPI_FACE_GRPC_CA_CERT", "").strip(),
+            server_name=os.getenv("BMPI_FACE_GRPC_SERVER_NAME", "").strip(),
+            channels=max(1, int(os.getenv("BMPI_FACE_CLIENT_CHANNELS", "1"))),
+            timeout=max(0.1, float(os.getenv("BMPI_FACE_CLIENT_TIMEOUT_SECONDS", "10"))),
+            max_in_flight=max(1, int(os.getenv("BMPI_FACE_CLIENT_MAX_IN_FLIGHT", "8"))),
+            max_retries=max(0, int(os.getenv("BMPI_FACE_CLIENT_MAX_RETRIES", "2"))),
+            max_message_mb=max(1, int(os.getenv("BMPI_GRPC_MAX_MSG_MB", "20"))),
+        )
+
+
+def latency_percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class LatencyStats:
+    """Latencia por RPC (ventana de las ultimas LATENCY_WINDOW llamadas), codigos de resultado y reintentos."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._window = window
+        self._latencies: dict[str, deque] = {}
+        self._codes: dict[str, dict[str, int]] = {}
+        self._retries: dict[str, int] = {}
+
+    def record(self, method: str, seconds: float, code: str) -> None:
+        with self._lock:
+            self._latencies.setdefault(method, deque(maxlen=self._window)).append(seconds)
+            codes = self._codes.setdefault(method, {})
+            codes[code] = codes.get(code, 0) + 1
+
+    def record_retry(self, method: str) -> None:
+        with self._lock:
+            self._retries[method] = self._retries.get(method, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latencies.clear()
+            self._codes.clear()
+            self._retries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies = {method: sorted(values) for method, values in self._latencies.items()}
+            codes = {method: dict(values) for method, values in self._codes.items()}
+            retries = dict(self._retries)
+
+        report = {}
+        for method, values in latencies.items():
+            report[method] = {
+                "calls": sum(codes[method].values()),
+                "codes": codes[method],
+                "retries": retries.get(method, 0),
+                "mean_ms": round(sum(values) * 1000.0 / len(values), 2),
+                "p50_ms": round(latency_percentile(values, 0.50) * 1000.0, 2),
+                "p95_ms": round(latency_percentile(values, 0.95) * 1000.0, 2),
+                "p99_ms": round(latency_percentile(values, 0.99) * 1000.0, 2),
+                "max_ms": round(values[-1] * 1000.0, 2),
+            }
+        return report
+
+
+class ChannelPool:
+    """Canales reutilizados en round-robin; cada uno abre su propia conexion HTTP/2 al servidor."""
+
+    def __init__(self, config: ClientConfig):
+        max_bytes = config.max_message_mb * 1024 * 1024
+        options = [
+            ("grpc.max_send_message_length", max_bytes),
+            ("grpc.max_receive_message_length", max_bytes),
+            # Sin pool de subcanales compartido, N canales al mismo destino no terminan en la misma conexion.
+            ("grpc.use_local_subchannel_pool", 1),
+        ]
+        credentials = None
+        if config.tls:
+            if not config.ca_cert:
+                raise ValueError("BMPI_FACE_GRPC_CA_CERT es obligatorio con BMPI_FACE_GRPC_TLS=true")
+            with open(config.ca_cert, "rb") as handle:
+                credentials = grpc.ssl_channel_credentials(root_certificates=handle.read())
+            if config.server_name:
+                options.append(("grpc.ssl_target_name_override", config.server_name))
+
+        self._channels = [
+            grpc.secure_channel(config.target, credentials, options=options)
+            if credentials is not None
+            else grpc.insecure_channel(config.target, options=options)
+            for _ in range(max(1, config.channels))
+        ]
+        self._stubs = [pb2_grpc.FaceRecognitionServiceStub(channel) for channel in self._channels]
+        self._next = itertools.count()
+
+    def stub(self) -> pb2_grpc.FaceRecognitionServiceStub:
+        return self._stubs[next(self._next) % len(self._stubs)]
+
+    def wait_ready(self, timeout: float) -> None:
+        for channel in self._channels:
+            grpc.channel_ready_future(channel).result(timeout=timeout)
+
+    def close(self) -> None:
+        for channel in self._channels:
+            channel.close()
+
+
+def retry_pushback_seconds(error: grpc.RpcError) -> float | None:
+    """Espera indicada por el servidor en grpc-retry-pushback-ms al rechazar por saturacion; None si no la hay."""
+    for key, value in error.trailing_metadata() or ():
+        if key == "grpc-retry-pushback-ms":
+            try:
+                pushback_ms = int(value.strip())
+            except ValueError:
+                return None
+            return pushback_ms / 1000.0 if pushback_ms >= 0 else None
+    return None
+
+
+class FaceClient:
+    """Cliente del FaceRecognitionService.
+
+    - `submit` no bloquea salvo cuando hay `max_in_flight` llamadas en vuelo (back-pressure) y devuelve un Future.
+    - `pipeline` y los metodos `*_many` mantienen la ventana llena y devuelven los resultados en orden de entrada.
+    - Cada llamada tiene un deadline total (`timeout`) que incluye los reintentos por saturacion.
+    - `stats()` resume latencias, codigos y reintentos por RPC.
+    """
+
+    def __init__(self, config: ClientConfig | None = None, **overrides):
+        self.config = replace(config or ClientConfig.from_env(), **overrides)
+        self._pool = ChannelPool(self.config)
+        self._slots = threading.BoundedSemaphore(self.config.max_in_flight)
+        self.latency = LatencyStats()
+
+    def __enter__(self) -> FaceClient:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def wait_ready(self, timeout: float = 10.0) -> None:
+        self._pool.wait_ready(timeout)
+
+    def stats(self) -> dict:
+        return self.latency.snapshot()
+
+    def submit(self, method: str, request, timeout: float | None = None) -> Future:
+        self._slots.acquire()
+        result: Future = Future()
+        result.add_done_callback(lambda _: self._slots.release())
+        deadline = time.monotonic() + (timeout if timeout is not None else self.config.timeout)
+        self._attempt(method, request, deadline, 0, result)
+        return result
+
+    def call(self, method: str, request, timeout: float | None = None):
+        return self.submit(method, request, timeout).result()
+
+    def _attempt(self, method: str, request, deadline: float, attempt: int, result: Future) -> None:
+        started = time.perf_counter()
+        try:
+            rpc = getattr(self._pool.stub(), method).future(request, timeout=max(0.0, deadline - time.monotonic()))
+        except Exception as exc:
+            result.set_exception(exc)
+            return
+        rpc.add_done_callback(lambda done: self._finish(method, request, deadline, attempt, result, started, done))
+
+    def _finish(self, method, request, deadline, attempt, result, started, done) -> None:
+        seconds = time.perf_counter() - started
+        if done.cancelled():
+            self.latency.record(method, seconds, grpc.StatusCode.CANCELLED.name)
+            result.cancel()
+            return
+        error = done.exception()
+        if error is None:
+            self.latency.record(method, seconds, grpc.StatusCode.OK.name)
+            result.set_result(done.result())
+            return
+
+        code = error.code() if isinstance(error, grpc.RpcError) else None
+        self.latency.record(method, seconds, code.name if code is not None else type(error).__name__)
+        pushback = retry_pushback_seconds(error) if code == grpc.StatusCode.RESOURCE_EXHAUSTED else None
+        retryable = pushback is not None or (
+            code == grpc.StatusCode.UNAVAILABLE
+            and (method in IDEMPOTENT_METHODS or bool(getattr(request, "idempotency_key", "")))
+        )
+        if retryable and attempt < self.config.max_retries:
+            wait = pushback if pushback is not None else RETRY_BACKOFF_SECONDS * (2 ** attempt)
+            if time.monotonic() + wait < deadline:
+                self.latency.record_retry(method)
+                timer = threading.Timer(wait, self._attempt, (method, request, deadline, attempt + 1, result))
+                timer.daemon = True
+                timer.start()
+                return
+        result.set_exception(error)
+
+    def pipeline(self, method: str, requests: Iterable, timeout: float | None = None) -> Iterator[tuple]:
+        """Genera (respuesta, error) en el orden de `requests`; solo uno de los dos es distinto de None."""
+        window: deque[Future] = deque()
+        for request in requests:
+            window.append(self.submit(method, request, timeout))
+            # Los resultados ya listos salen enseguida; la ventana acotada limita la memoria con iterables largos.
+            while window and (window[0].done() or len(window) > 2 * self.config.max_in_flight):
+                yield future_outcome(window.popleft())
+        while window:
+            yield future_outcome(window.popleft())
+
+    def recognize(self, image: bytes, timeout: float | None = None, **fields) -> pb2.RecognizeFaceResponse:
+        return self.call("RecognizeFace", pb2.RecognizeFaceRequest(image=image, **fields), timeout)
+
+    def recognize_embedding(
+        self, embedding: Sequence[float], timeout: float | None = None, **fields
+    ) -> pb2.RecognizeFaceResponse:
+        return self.call("RecognizeFace", pb2.RecognizeFaceRequest(embedding=list(embedding), **fields), timeout)
+
+    def recognize_many(self, images: Iterable[bytes], timeout: float | None = None, **fields) -> list[tuple]:
+        requests = (pb2.RecognizeFaceRequest(image=image, **fields) for image in images)
+        return list(self.pipeline("RecognizeFace", requests, timeout))
+
+    def register(
+        self, employee_id: str, name: str, image: bytes, idempotency_key: str = "", timeout: float | None = None
+    ) -> pb2.RegisterEmployeeResponse:
+        request = pb2.RegisterEmployeeRequest(
+            employee_id=employee_id, name=name, image=image, idempotency_key=idempotency_key or new_idempotency_key()
+        )
+        return self.call("RegisterEmployee", request, timeout)
+
+    def register_many(
+        self,
+        employees: Iterable[tuple[str, str, bytes]],
+        wait: bool = True,
+        poll_interval: float = 0.5,
+        timeout: float | None = None,
+    ) -> list[tuple]:
+        """Altas masivas por la cola del servidor (SubmitEnrollment); el contrato no tiene un RPC de lote.
+
+        `employees` son tuplas (employee_id, name, image). Con `wait` se consulta GetEnrollmentStatus hasta
+        que cada job termina; devuelve (EnrollmentJob, error) en el orden de entrada.
+        """
+        requests = (
+            pb2.RegisterEmployeeRequest(
+                employee_id=employee_id, name=name, image=image, idempotency_key=new_idempotency_key()
+            )
+            for employee_id, name, image in employees
+        )
+        outcomes = list(self.pipeline("SubmitEnrollment", requests, timeout))
+        while wait:
+            pending = [
+                index
+                for index, (job, error) in enumerate(outcomes)
+                if error is None and job.state not in ENROLLMENT_DONE_STATES
+            ]
+            if not pending:
+                break
+            time.sleep(poll_interval)
+            statuses = self.pipeline(
+                "GetEnrollmentStatus",
+                (pb2.EnrollmentStatusRequest(job_id=outcomes[index][0].job_id) for index in pending),
+                timeout,
+            )
+            for index, outcome in zip(pending, statuses):
+                outcomes[index] = outcome
+        return outcomes
+
+    def enrollment_status(self, job_id: str, timeout: float | None = None) -> pb2.EnrollmentJob:
+        return self.call("GetEnrollmentStatus", pb2.EnrollmentStatusRequest(job_id=job_id), timeout)
+
+    def list_employees(self, timeout: float | None = None) -> pb2.EmployeeList:
+        return self.call("ListEmployees", pb2.Empty(), timeout)
+
+    def log_attendance(self, employee_id: str, timeout: float | None = None) -> pb2.AttendanceResponse:
+        return self.call("LogAttendance", pb2.AttendanceRequest(employee_id=employee_id), timeout)
+
+
+def future_outcome(future: Future) -> tuple:
+    try:
+        return future.result(), None
+    except (CancelledError, Exception) as exc:
+        return None, exc
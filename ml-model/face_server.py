@@ -1,35 +1,162 @@
 #!/usr/bin/env python3
 """gRPC server optimizado para reconocimiento facial y registro de asistencia."""
 
+import bisect
+from collections import OrderedDict, deque, namedtuple
+from contextlib import asynccontextmanager, contextmanager
 from concurrent import futures
+import contextvars
 from datetime import datetime, timedelta
+import functools
+import hashlib
+import importlib.util
+import inspect
 import io
 import json
+import multiprocessing
 import os
 import pickle
+import queue
+import random
+import signal
+import stat
+import subprocess
 import sys
 import threading
 import time
 import traceback
+import tracemalloc
+import uuid
+
+
+def resolve_thread_layout():
+    """Reparte el presupuesto de CPU entre quienes ejecutan trabajo de CPU en paralelo.
+
+    En modo sync la deteccion/codificacion corre dentro de los slots del planificador
+    (BMPI_FACE_ENCODE_CONCURRENCY); en asyncio, en los BMPI_ASYNC_CPU_WORKERS del executor. La busqueda
+    (FAISS/numpy) corre fuera de esos slots, en hasta BMPI_GRPC_WORKERS hilos a la vez (handlers gRPC o el pool
+    de I/O en asyncio), asi que tambien cuenta, igual que los BMPI_ENROLLMENT_WORKERS slots propios de las altas
+    en segundo plano. Cada uno recibe budget // (codificacion + altas + busqueda) hilos de OpenCV/BLAS/OpenMP, de
+    modo que el total no supere el presupuesto.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    budget = max(1, int(os.getenv("BMPI_THREAD_BUDGET", "0")) or cpus)
+    async_mode = os.getenv("BMPI_GRPC_ASYNC", "false").strip().lower() in ("1", "true", "yes")
+    encode_slots = max(1, int(os.getenv("BMPI_FACE_ENCODE_CONCURRENCY", "1")))
+    encode_parallel = (
+        max(1, int(os.getenv("BMPI_ASYNC_CPU_WORKERS", str(encode_slots)))) if async_mode else encode_slots
+    )
+    enrollment_parallel = max(1, int(os.getenv("BMPI_ENROLLMENT_WORKERS", "1")))
+    search_parallel = max(1, int(os.getenv("BMPI_GRPC_WORKERS", "10")))
+    parallel = encode_parallel + enrollment_parallel + search_parallel
+    library_threads = int(os.getenv("BMPI_LIBRARY_THREADS", "0")) or max(1, budget // parallel)
+    return {
+        "cpus": cpus,
+        "budget": budget,
+        "parallel": parallel,
+        "encode_parallel": encode_parallel,
+        "enrollment_parallel": enrollment_parallel,
+        "search_parallel": search_parallel,
+        "library_threads": max(1, library_threads),
+    }
+
+
+# Se calcula al servir (configure_thread_layout): el CLI `extract` y sus procesos conservan los hilos por defecto.
+THREAD_LAYOUT = None
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
 
 import cv2
-import face_recognition
-import grpc
+import dlib
 import numpy as np
-import psycopg2
-from PIL import Image, ImageOps
-from psycopg2 import pool
+from PIL import Image, ImageFile, ImageOps
+
+
+class LazyModule:
+    """Modulo que se importa en el primer acceso a un atributo.
+
+    grpc, psycopg2, asyncio y los stubs generados solo hacen falta para servir: el CLI `extract`,
+    que el backend invoca por archivo, no paga su importacion.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        return f"<LazyModule {self._name} loaded={self._module is not None}>"
+
+
+asyncio = LazyModule("asyncio")
+grpc = LazyModule("grpc")
+psycopg2 = LazyModule("psycopg2")
+pool = LazyModule("psycopg2.pool")
+pb2 = LazyModule("pb.face_recognition_pb2")
+pb2_grpc = LazyModule("pb.face_recognition_pb2_grpc")
+threadpoolctl = LazyModule("threadpoolctl")
+
+# Dependencias opcionales del servidor: se importan en load_server_dependencies().
+faiss = None
+FAISS_AVAILABLE = False
+FAISS_IMPORT_ERROR = "no cargado"
+asyncpg = None
+ASYNCPG_AVAILABLE = False
+ASYNCPG_IMPORT_ERROR = "no cargado"
+health = health_pb2 = health_pb2_grpc = None
+GRPC_HEALTH_AVAILABLE = False
+GRPC_HEALTH_IMPORT_ERROR = "no cargado"
+server_dependencies_loaded = False
+server_dependencies_lock = threading.Lock()
+
+
+def load_server_dependencies():
+    global faiss, FAISS_AVAILABLE, FAISS_IMPORT_ERROR
+    global asyncpg, ASYNCPG_AVAILABLE, ASYNCPG_IMPORT_ERROR
+    global health, health_pb2, health_pb2_grpc, GRPC_HEALTH_AVAILABLE, GRPC_HEALTH_IMPORT_ERROR
+    global server_dependencies_loaded
+
+    with server_dependencies_lock:
+        if server_dependencies_loaded:
+            return
+
+        try:
+            import faiss  # type: ignore
+            FAISS_AVAILABLE = True
+            FAISS_IMPORT_ERROR = ""
+        except Exception as exc:
+            FAISS_AVAILABLE = False
+            FAISS_IMPORT_ERROR = str(exc)
+
+        try:
+            import asyncpg  # type: ignore
+            ASYNCPG_AVAILABLE = True
+            ASYNCPG_IMPORT_ERROR = ""
+        except Exception as exc:
+            ASYNCPG_AVAILABLE = False
+            ASYNCPG_IMPORT_ERROR = str(exc)
 
-import pb.face_recognition_pb2 as pb2
-import pb.face_recognition_pb2_grpc as pb2_grpc
+        try:
+            from grpc_health.v1 import health, health_pb2, health_pb2_grpc  # type: ignore
+            GRPC_HEALTH_AVAILABLE = True
+            GRPC_HEALTH_IMPORT_ERROR = ""
+        except Exception as exc:
+            GRPC_HEALTH_AVAILABLE = False
+            GRPC_HEALTH_IMPORT_ERROR = str(exc)
 
-try:
-    import faiss  # type: ignore
-    FAISS_AVAILABLE = True
-    FAISS_IMPORT_ERROR = ""
-except Exception as exc:
-    FAISS_AVAILABLE = False
-    FAISS_IMPORT_ERROR = str(exc)
+        server_dependencies_loaded = True
 
 
 connection_pool = None
@@ -51,7 +178,6 @@ MAX_PROTOTYPES_PER_EMPLOYEE = max(1, int(os.getenv("BMPI_MAX_PROTOTYPES_PER_EMPL
 REFRESH_SECONDS = int(os.getenv("BMPI_EMBEDDINGS_REFRESH_SECONDS", "30"))
 GRPC_WORKERS = int(os.getenv("BMPI_GRPC_WORKERS", "10"))
 FACE_ENCODE_CONCURRENCY = max(1, int(os.getenv("BMPI_FACE_ENCODE_CONCURRENCY", "1")))
-face_encode_semaphore = threading.BoundedSemaphore(FACE_ENCODE_CONCURRENCY)
 GRPC_MAX_MSG_MB = max(1, int(os.getenv("BMPI_GRPC_MAX_MSG_MB", "20")))
 GRPC_MAX_MSG_BYTES = GRPC_MAX_MSG_MB * 1024 * 1024
 FACE_DETECT_UPSAMPLE = max(0, int(os.getenv("BMPI_FACE_DETECT_UPSAMPLE", "1")))
@@ -64,9 +190,242 @@ FAISS_HNSW_EF_SEARCH = max(8, int(os.getenv("BMPI_FAISS_HNSW_EF_SEARCH", "64")))
 FAISS_HNSW_EF_CONSTRUCTION = max(8, int(os.getenv("BMPI_FAISS_HNSW_EF_CONSTRUCTION", "80")))
 FAISS_TOPK = max(1, int(os.getenv("BMPI_FAISS_TOPK", "5")))
 FAISS_FALLBACK_RATIO = float(os.getenv("BMPI_FAISS_FALLBACK_RATIO", "0.95"))
+EXTRACT_BATCH_WORKERS = max(0, int(os.getenv("BMPI_EXTRACT_BATCH_WORKERS", "0")))
+EXTRACT_BATCH_TIMEOUT_SECONDS = max(1.0, float(os.getenv("BMPI_EXTRACT_BATCH_TIMEOUT_SECONDS", "30")))
+GRPC_ASYNC = os.getenv("BMPI_GRPC_ASYNC", "false").strip().lower() in ("1", "true", "yes")
+ASYNC_CPU_EXECUTOR = os.getenv("BMPI_ASYNC_CPU_EXECUTOR", "process").strip().lower()
+ASYNC_CPU_WORKERS = max(1, int(os.getenv("BMPI_ASYNC_CPU_WORKERS", str(FACE_ENCODE_CONCURRENCY))))
+ASYNC_DB_POOL_MAX = max(1, int(os.getenv("BMPI_ASYNC_DB_POOL_MAX", "10")))
+ADMISSION_MAX_PENDING_RECOGNIZE = max(0, int(os.getenv("BMPI_ADMISSION_MAX_PENDING_RECOGNIZE", "16")))
+ADMISSION_MAX_PENDING_REGISTER = max(0, int(os.getenv("BMPI_ADMISSION_MAX_PENDING_REGISTER", "8")))
+ADMISSION_RETRY_AFTER_MS = max(0, int(os.getenv("BMPI_ADMISSION_RETRY_AFTER_MS", "500")))
+ADMISSION_MIN_REMAINING_MS = max(0, int(os.getenv("BMPI_ADMISSION_MIN_REMAINING_MS", "50")))
+ADMISSION_LOG_INTERVAL_SECONDS = 10.0
+DEGRADED_PROFILE_ENABLED = os.getenv("BMPI_DEGRADED_PROFILE", "true").strip().lower() in ("1", "true", "yes")
+DEGRADED_DEADLINE_MS = max(0, int(os.getenv("BMPI_DEGRADED_DEADLINE_MS", "1500")))
+DEGRADED_QUEUE_DEPTH = max(0, int(os.getenv("BMPI_DEGRADED_QUEUE_DEPTH", "8")))
+EMBEDDING_DIMENSIONS = 128
+CLIENT_EMBEDDINGS_ENABLED = os.getenv("BMPI_CLIENT_EMBEDDINGS", "true").strip().lower() in ("1", "true", "yes")
+CLIENT_EMBEDDING_NORM_MIN = float(os.getenv("BMPI_CLIENT_EMBEDDING_NORM_MIN", "0.5"))
+CLIENT_EMBEDDING_NORM_MAX = float(os.getenv("BMPI_CLIENT_EMBEDDING_NORM_MAX", "2.5"))
+CLIENT_FACE_BOX_MIN_SIDE = max(1, int(os.getenv("BMPI_CLIENT_FACE_BOX_MIN_SIDE", "20")))
+MULTI_FACE_MAX_FACES = max(1, int(os.getenv("BMPI_MULTI_FACE_MAX_FACES", "8")))
+MULTI_FACE_IOU_DEDUP = float(os.getenv("BMPI_MULTI_FACE_IOU_DEDUP", "0.4"))
+RECOGNIZE_MAX_TOP_K = max(1, int(os.getenv("BMPI_RECOGNIZE_MAX_TOP_K", "10")))
+RESULT_CACHE_MAX_ENTRIES = max(0, int(os.getenv("BMPI_RESULT_CACHE_MAX_ENTRIES", "128")))
+RESULT_CACHE_LOG_INTERVAL_SECONDS = 60.0
+REGISTER_IDEMPOTENCY_MAX_ENTRIES = max(0, int(os.getenv("BMPI_REGISTER_IDEMPOTENCY_MAX_ENTRIES", "256")))
+ENROLLMENT_WORKERS = max(1, int(os.getenv("BMPI_ENROLLMENT_WORKERS", "1")))
+ENROLLMENT_QUEUE_MAX = max(1, int(os.getenv("BMPI_ENROLLMENT_QUEUE_MAX", "256")))
+ENROLLMENT_JOB_RETENTION = max(1, int(os.getenv("BMPI_ENROLLMENT_JOB_RETENTION", "1024")))
+ENROLLMENT_NICE = max(0, int(os.getenv("BMPI_ENROLLMENT_NICE", "10")))
+ENROLLMENT_YIELD_MAX_MS = max(0, int(os.getenv("BMPI_ENROLLMENT_YIELD_MAX_MS", "2000")))
+SCHED_WEIGHTS_RAW = os.getenv("BMPI_SCHED_WEIGHTS", "recognize=8,register=2,enrollment=1")
+SCHED_CAPS_RAW = os.getenv("BMPI_SCHED_CAPS", "")
+SCHED_STARVATION_MS = max(0, int(os.getenv("BMPI_SCHED_STARVATION_MS", "3000")))
+SCHED_WAIT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+WARMUP_ENABLED = os.getenv("BMPI_WARMUP", "true").strip().lower() in ("1", "true", "yes")
+WARMUP_ROUNDS = max(1, int(os.getenv("BMPI_WARMUP_ROUNDS", "1")))
+METRICS_PORT = max(0, int(os.getenv("BMPI_METRICS_PORT", "0")))
+METRICS_HOST = os.getenv("BMPI_METRICS_HOST", "127.0.0.1").strip() or "127.0.0.1"
+METRICS_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TRACE_PATH = os.getenv("BMPI_TRACE_PATH", "").strip()
+TRACE_SAMPLE_RATE = min(1.0, max(0.0, float(os.getenv("BMPI_TRACE_SAMPLE_RATE", "1.0"))))
+TRACE_SLOW_MS = max(0.0, float(os.getenv("BMPI_TRACE_SLOW_MS", "0")))
+TRACE_MAX_BYTES = max(1024, int(os.getenv("BMPI_TRACE_MAX_BYTES", str(50 * 1024 * 1024))))
+TRACE_BACKUPS = max(0, int(os.getenv("BMPI_TRACE_BACKUPS", "5")))
+TRACE_QUEUE_MAX = max(1, int(os.getenv("BMPI_TRACE_QUEUE_MAX", "1000")))
+CAPTURE_DIR = os.getenv("BMPI_CAPTURE_DIR", "").strip()
+CAPTURE_CONSENT = os.getenv("BMPI_CAPTURE_CONSENT", "").strip()
+CAPTURE_SAMPLE_RATE = min(1.0, max(0.0, float(os.getenv("BMPI_CAPTURE_SAMPLE_RATE", "0.02"))))
+CAPTURE_RETENTION_HOURS = max(1.0, float(os.getenv("BMPI_CAPTURE_RETENTION_HOURS", "72")))
+CAPTURE_MAX_ITEMS = max(1, int(os.getenv("BMPI_CAPTURE_MAX_ITEMS", "5000")))
+CAPTURE_METHODS = tuple(
+    name.strip() for name in os.getenv("BMPI_CAPTURE_METHODS", "RecognizeFace,RegisterEmployee").split(",") if name.strip()
+)
+PROFILE_SIGNAL = os.getenv("BMPI_PROFILE_SIGNAL", "SIGUSR2").strip().upper()
+PROFILE_HTTP = os.getenv("BMPI_PROFILE_HTTP", "0").strip().lower() in ("1", "true", "yes", "on")
+PROFILE_SECONDS = max(1.0, float(os.getenv("BMPI_PROFILE_SECONDS", "30")))
+PROFILE_MAX_SECONDS = max(PROFILE_SECONDS, float(os.getenv("BMPI_PROFILE_MAX_SECONDS", "300")))
+PROFILE_INTERVAL_MS = max(1.0, float(os.getenv("BMPI_PROFILE_INTERVAL_MS", "5")))
+# Carpetas por usuario: en el tmp compartido otro usuario podria dejar un detector preparado para que lo carguemos
+# o un enlace con el nombre del siguiente perfil apuntando a un archivo ajeno.
+USER_CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME", "").strip() or os.path.join(os.path.expanduser("~"), ".cache"), "bmpi"
+)
+PROFILE_DIR = os.getenv("BMPI_PROFILE_DIR", os.path.join(USER_CACHE_DIR, "profiles")).strip()
+PROFILE_TOP = max(1, int(os.getenv("BMPI_PROFILE_TOP", "25")))
+MEMORY_TRACEMALLOC_FRAMES = max(0, int(os.getenv("BMPI_MEMORY_TRACEMALLOC_FRAMES", "0")))
+MEMORY_TOP = max(1, int(os.getenv("BMPI_MEMORY_TOP", "15")))
+FACE_MODEL_CACHE_DIR = os.getenv("BMPI_MODEL_CACHE_DIR", os.path.join(USER_CACHE_DIR, "face-models")).strip()
+
+FACE_MODEL_FILES = {
+    "cnn": "mmod_human_face_detector.dat",
+    "pose_68": "shape_predictor_68_face_landmarks.dat",
+    "pose_5": "shape_predictor_5_face_landmarks.dat",
+    "encoder": "dlib_face_recognition_resnet_model_v1.dat",
+}
+
+# face_recognition activaba esto al importarse; se mantiene para decodificar JPEG truncados igual que antes.
+ImageFile.LOAD_TRUNCATED_IMAGES = True
+
+
+def face_models_dir():
+    # Sin importar face_recognition_models: su __init__ arrastra pkg_resources (~150 ms).
+    spec = importlib.util.find_spec("face_recognition_models")
+    if spec is None or not spec.submodule_search_locations:
+        raise RuntimeError("face_recognition_models no esta instalado")
+    return os.path.join(list(spec.submodule_search_locations)[0], "models")
+
+
+def private_path_owned(path):
+    """True si `path` existe, no es un enlace, es del usuario actual y ni el grupo ni otros pueden escribirlo."""
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    if stat.S_ISLNK(info.st_mode):
+        return False
+    # En Windows no hay uid ni bits de grupo/otros que comprobar.
+    if hasattr(os, "getuid") and (info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+        return False
+    return True
+
+
+def ensure_private_dir(path):
+    """Crea `path` con modo 0700; si ya existia y no es privada del usuario actual lanza PermissionError."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not os.path.isdir(path) or not private_path_owned(path):
+        raise PermissionError(f"{path} no es una carpeta privada del usuario actual")
+
+
+def create_private_file(path, mode="w"):
+    """Abre para escritura un archivo nuevo con modo 0600; si ya existe algo en `path` (tambien un enlace) falla."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    return os.fdopen(fd, mode, encoding=None if "b" in mode else "utf-8")
+
+
+def load_hog_detector():
+    # El detector HOG embebido en dlib tarda ~0.5 s en deserializarse y desde archivo ~2 ms:
+    # se guarda una copia la primera vez para que cada `extract` no lo pague.
+    if not FACE_MODEL_CACHE_DIR:
+        return dlib.get_frontal_face_detector()
+    try:
+        ensure_private_dir(FACE_MODEL_CACHE_DIR)
+    except OSError as exc:
+        print(f"[WARN] Cache del detector HOG desactivada: {exc}", file=sys.stderr)
+        return dlib.get_frontal_face_detector()
+    path = os.path.join(FACE_MODEL_CACHE_DIR, f"frontal_face_detector-{getattr(dlib, '__version__', 'x')}.svm")
+    try:
+        if private_path_owned(path):
+            return dlib.fhog_object_detector(path)
+    except Exception as exc:
+        print(f"[WARN] Cache del detector HOG invalida, se regenera: {exc}", file=sys.stderr)
+
+    detector = dlib.get_frontal_face_detector()
+    try:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        detector.save(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as exc:
+        print(f"[WARN] No se pudo guardar el detector HOG en {FACE_MODEL_CACHE_DIR}: {exc}", file=sys.stderr)
+    return detector
+
+
+class FaceModels:
+    """Subconjunto de face_recognition.api con los modelos dlib construidos en el primer uso.
+
+    face_recognition carga al importarse los cinco modelos (el predictor de 68 puntos solo ya cuesta
+    ~0.8 s) aunque con BMPI_FACE_ENCODING_MODEL=small nunca se use.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._model_bytes = {}
+        self._lock = threading.Lock()
+
+    def _model(self, name):
+        model = self._models.get(name)
+        if model is None:
+            with self._lock:
+                model = self._models.get(name)
+                if model is None:
+                    rss_before = process_rss_bytes()
+                    model = self._build(name)
+                    self._models[name] = model
+                    self._model_bytes[name] = model_memory_bytes(name, rss_before)
+        return model
+
+    @staticmethod
+    def _build(name):
+        if name == "hog":
+            return load_hog_detector()
+        path = os.path.join(face_models_dir(), FACE_MODEL_FILES[name])
+        if name == "cnn":
+            return dlib.cnn_face_detection_model_v1(path)
+        if name == "encoder":
+            return dlib.face_recognition_model_v1(path)
+        return dlib.shape_predictor(path)
+
+    def loaded_models(self):
+        return sorted(self._models)
+
+    def model_bytes(self):
+        return dict(self._model_bytes)
+
+    def face_locations(self, img, number_of_times_to_upsample=1, model="hog"):
+        if model == "cnn":
+            rects = [detection.rect for detection in self._model("cnn")(img, number_of_times_to_upsample)]
+        else:
+            rects = self._model("hog")(img, number_of_times_to_upsample)
+        height, width = img.shape[:2]
+        return [
+            (max(rect.top(), 0), min(rect.right(), width), min(rect.bottom(), height), max(rect.left(), 0))
+            for rect in rects
+        ]
+
+    def face_encodings(self, face_image, known_face_locations=None, num_jitters=1, model="small"):
+        if known_face_locations is None:
+            known_face_locations = self.face_locations(face_image)
+        predictor = self._model("pose_5" if model == "small" else "pose_68")
+        encoder = self._model("encoder")
+        encodings = []
+        for top, right, bottom, left in known_face_locations:
+            landmarks = predictor(face_image, dlib.rectangle(int(left), int(top), int(right), int(bottom)))
+            encodings.append(np.array(encoder.compute_face_descriptor(face_image, landmarks, num_jitters)))
+        return encodings
+
+    @staticmethod
+    def load_image_file(file, mode="RGB"):
+        image = Image.open(file)
+        if mode:
+            image = image.convert(mode)
+        return np.array(image)
+
+
+face_models = FaceModels()
+haar_cascades_cache = None
+
+
+def haar_cascades():
+    global haar_cascades_cache
+    if haar_cascades_cache is None:
+        haar_cascades_cache = (
+            cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml"),
+            cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_profileface.xml"),
+        )
+    return haar_cascades_cache
+
+
+class RequestDeadlineExceeded(Exception):
+    pass
 
-haar_frontal = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-haar_profile = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_profileface.xml")
+
+class InvalidRecognizeInput(ValueError):
+    pass
+
+
+ClientFaceBox = namedtuple("ClientFaceBox", ["top", "right", "bottom", "left"])
 
 
 def parse_rotation_angles(raw):
@@ -92,6 +451,124 @@ def parse_rotation_angles(raw):
 FACE_ROTATION_ANGLES = parse_rotation_angles(FACE_ROTATION_ANGLES_RAW)
 
 
+def parse_class_values(raw, defaults, minimum):
+    values = dict(defaults)
+    for token in (raw or "").split(","):
+        name, sep, value = token.partition("=")
+        name = name.strip().lower()
+        if not sep or name not in values:
+            continue
+        try:
+            values[name] = max(minimum, int(value.strip()))
+        except ValueError:
+            continue
+    return values
+
+
+# Las altas en segundo plano tienen sus propios BMPI_ENROLLMENT_WORKERS slots, fuera de los de RecognizeFace.
+SCHED_DEDICATED_CLASSES = ("enrollment",)
+SCHED_WEIGHTS = parse_class_values(SCHED_WEIGHTS_RAW, {"recognize": 8, "register": 2, "enrollment": 1}, 1)
+SCHED_CAPS = parse_class_values(
+    SCHED_CAPS_RAW,
+    # None = sin tope propio: se resuelve contra los slots del planificador (que en asyncio cambian al arrancar).
+    {"recognize": None, "register": None, "enrollment": ENROLLMENT_WORKERS},
+    1,
+)
+
+PipelineProfile = namedtuple(
+    "PipelineProfile",
+    [
+        "name",
+        "model",
+        "model_fallback",
+        "haar_fallback",
+        "contrast_fallback",
+        "rotation_fallback",
+        "rotation_angles",
+        "detect_upsample",
+        "detect_retry_upsample",
+        "locations_per_variant",
+        "num_jitters",
+        "max_candidates",
+    ],
+)
+
+PROFILE_FULL = PipelineProfile(
+    name="full",
+    model=FACE_MODEL,
+    model_fallback=FACE_MODEL_FALLBACK,
+    haar_fallback=FACE_HAAR_FALLBACK,
+    contrast_fallback=FACE_CONTRAST_FALLBACK,
+    rotation_fallback=FACE_ROTATION_FALLBACK,
+    rotation_angles=tuple(FACE_ROTATION_ANGLES),
+    detect_upsample=FACE_DETECT_UPSAMPLE,
+    detect_retry_upsample=FACE_DETECT_RETRY_UPSAMPLE,
+    locations_per_variant=RECOGNIZE_LOCATIONS_PER_VARIANT,
+    num_jitters=FACE_ENCODING_JITTERS_RECOGNIZE,
+    max_candidates=RECOGNIZE_MAX_CANDIDATES,
+)
+
+# Sin fallback CNN ni rotaciones: son las etapas mas caras y las que menos matches aportan.
+PROFILE_DEGRADED = PROFILE_FULL._replace(
+    name="degraded",
+    model_fallback="",
+    rotation_fallback=False,
+)
+
+
+# Perfiles que el cliente puede pedir en RecognizeFaceRequest.profile. BALANCED es la configuracion de entorno.
+PROFILE_FAST = PROFILE_FULL._replace(
+    name="fast",
+    model_fallback="",
+    contrast_fallback=False,
+    rotation_fallback=False,
+    detect_retry_upsample=FACE_DETECT_UPSAMPLE,
+    locations_per_variant=1,
+    num_jitters=1,
+    max_candidates=min(3, RECOGNIZE_MAX_CANDIDATES),
+)
+
+PROFILE_ACCURATE = PROFILE_FULL._replace(
+    name="accurate",
+    model_fallback=FACE_MODEL_FALLBACK or "cnn",
+    haar_fallback=True,
+    contrast_fallback=True,
+    rotation_fallback=True,
+    detect_retry_upsample=max(FACE_DETECT_RETRY_UPSAMPLE, FACE_DETECT_UPSAMPLE + 1),
+    locations_per_variant=max(3, RECOGNIZE_LOCATIONS_PER_VARIANT),
+    num_jitters=max(FACE_ENCODING_JITTERS_RECOGNIZE, FACE_ENCODING_JITTERS_REGISTER),
+    max_candidates=max(10, RECOGNIZE_MAX_CANDIDATES),
+)
+
+requested_profiles_cache = None
+
+
+def requested_profiles():
+    # Se resuelve en el primer uso: leer los valores del enum al importar cargaria los stubs tambien en el CLI.
+    global requested_profiles_cache
+    if requested_profiles_cache is None:
+        requested_profiles_cache = {
+            pb2.RECOGNITION_PROFILE_FAST: PROFILE_FAST,
+            pb2.RECOGNITION_PROFILE_BALANCED: PROFILE_FULL,
+            pb2.RECOGNITION_PROFILE_ACCURATE: PROFILE_ACCURATE,
+        }
+    return requested_profiles_cache
+
+
+def select_recognition_profile(remaining_seconds, pending, requested=0):
+    # Un perfil pedido explicitamente por el cliente se respeta; la degradacion solo aplica al default.
+    explicit = requested_profiles().get(int(requested or 0))
+    if explicit is not None:
+        return explicit
+    if not DEGRADED_PROFILE_ENABLED:
+        return PROFILE_FULL
+    if remaining_seconds is not None and remaining_seconds * 1000.0 < DEGRADED_DEADLINE_MS:
+        return PROFILE_DEGRADED
+    if DEGRADED_QUEUE_DEPTH > 0 and pending >= DEGRADED_QUEUE_DEPTH:
+        return PROFILE_DEGRADED
+    return PROFILE_FULL
+
+
 def enhance_contrast_clahe(rgb_image):
     lab = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2LAB)
     l_channel, a_channel, b_channel = cv2.split(lab)
@@ -114,20 +591,23 @@ def rotate_rgb_image(rgb_image, angle_degrees):
     )
 
 
-def build_detection_variants(rgb_image):
+def build_detection_variants(rgb_image, profile=None):
+    profile = profile or PROFILE_FULL
     variants = [("base", rgb_image)]
 
-    if FACE_CONTRAST_FALLBACK:
+    if profile.contrast_fallback:
         try:
-            enhanced = enhance_contrast_clahe(rgb_image)
+            with stage("variant_clahe"):
+                enhanced = enhance_contrast_clahe(rgb_image)
             variants.append(("clahe", enhanced))
         except Exception:
             pass
 
-    if FACE_ROTATION_FALLBACK:
-        for angle in FACE_ROTATION_ANGLES:
+    if profile.rotation_fallback:
+        for angle in profile.rotation_angles:
             try:
-                rotated = rotate_rgb_image(rgb_image, angle)
+                with stage("variant_rotate"):
+                    rotated = rotate_rgb_image(rgb_image, angle)
                 variants.append((f"rot_{angle}", rotated))
             except Exception:
                 continue
@@ -147,6 +627,7 @@ def haar_rects_to_locations(rects):
 
 
 def detect_face_locations_haar(rgb_image):
+    haar_frontal, haar_profile = haar_cascades()
     if haar_frontal.empty() and haar_profile.empty():
         return []
 
@@ -198,59 +679,79 @@ def detect_face_locations_haar(rgb_image):
     return unique
 
 
-def detect_face_locations(rgb_image, model):
-    locations = face_recognition.face_locations(
-        rgb_image,
-        number_of_times_to_upsample=FACE_DETECT_UPSAMPLE,
-        model=model,
-    )
-
-    if not locations and FACE_DETECT_RETRY_UPSAMPLE > FACE_DETECT_UPSAMPLE:
-        locations = face_recognition.face_locations(
+def detect_face_locations(rgb_image, model, profile=None):
+    """Devuelve (locations, detector) con el detector que encontro las caras (p. ej. `hog`, `cnn_upsample`, `haar`)."""
+    profile = profile or PROFILE_FULL
+    detector = model
+    with stage(f"detect_{model}"):
+        locations = face_models.face_locations(
             rgb_image,
-            number_of_times_to_upsample=FACE_DETECT_RETRY_UPSAMPLE,
+            number_of_times_to_upsample=profile.detect_upsample,
             model=model,
         )
 
-    if not locations and FACE_HAAR_FALLBACK:
-        locations = detect_face_locations_haar(rgb_image)
+        if not locations and profile.detect_retry_upsample > profile.detect_upsample:
+            detector = f"{model}_upsample"
+            locations = face_models.face_locations(
+                rgb_image,
+                number_of_times_to_upsample=profile.detect_retry_upsample,
+                model=model,
+            )
+
+    if not locations and profile.haar_fallback:
+        detector = "haar"
+        with stage("detect_haar"):
+            locations = detect_face_locations_haar(rgb_image)
 
-    return locations
+    return locations, detector
 
 
-def extract_primary_face_encoding(rgb_image, num_jitters=1):
-    variants = build_detection_variants(rgb_image)
+def detect_variant_locations(variant_rgb, profile):
+    locations, detector = detect_face_locations(variant_rgb, profile.model, profile)
+    if not locations and profile.model_fallback and profile.model_fallback != profile.model:
+        locations, detector = detect_face_locations(variant_rgb, profile.model_fallback, profile)
+    return locations, detector
 
-    for _, variant_rgb in variants:
-        locations = detect_face_locations(variant_rgb, FACE_MODEL)
 
-        if not locations and FACE_MODEL_FALLBACK and FACE_MODEL_FALLBACK != FACE_MODEL:
-            locations = detect_face_locations(variant_rgb, FACE_MODEL_FALLBACK)
+def extract_primary_face_encoding(rgb_image, num_jitters=1, check_deadline=None, profile=None):
+    profile = profile or PROFILE_FULL
+    variants = build_detection_variants(rgb_image, profile)
+
+    for variant_name, variant_rgb in variants:
+        if check_deadline is not None:
+            check_deadline()
+        append_event("variants_tried", variant_name)
+        locations, detector = detect_variant_locations(variant_rgb, profile)
 
         if not locations:
             continue
 
         best_location = max(locations, key=lambda loc: max(0, loc[2] - loc[0]) * max(0, loc[1] - loc[3]))
-        encodings = face_recognition.face_encodings(
-            variant_rgb,
-            [best_location],
-            num_jitters=max(1, int(num_jitters)),
-            model=FACE_ENCODING_MODEL,
-        )
+        with stage("encode"):
+            encodings = face_models.face_encodings(
+                variant_rgb,
+                [best_location],
+                num_jitters=max(1, int(num_jitters)),
+                model=FACE_ENCODING_MODEL,
+            )
         if encodings:
+            note_event("match_source", f"{variant_name}/{detector}")
             return encodings[0]
 
     return None
 
 
-def extract_candidate_encodings(rgb_image, num_jitters=1, max_candidates=3):
+def extract_candidate_encodings(rgb_image, num_jitters=1, max_candidates=3, check_deadline=None, profile=None):
+    profile = profile or PROFILE_FULL
     candidates = []
-    variants = build_detection_variants(rgb_image)
-
-    for _, variant_rgb in variants:
-        locations = detect_face_locations(variant_rgb, FACE_MODEL)
-        if not locations and FACE_MODEL_FALLBACK and FACE_MODEL_FALLBACK != FACE_MODEL:
-            locations = detect_face_locations(variant_rgb, FACE_MODEL_FALLBACK)
+    sources = []
+    variants = build_detection_variants(rgb_image, profile)
+
+    for variant_name, variant_rgb in variants:
+        if check_deadline is not None:
+            check_deadline()
+        append_event("variants_tried", variant_name)
+        locations, detector = detect_variant_locations(variant_rgb, profile)
         if not locations:
             continue
 
@@ -260,33 +761,167 @@ def extract_candidate_encodings(rgb_image, num_jitters=1, max_candidates=3):
             reverse=True,
         )
 
-        for location in ordered_locations[:RECOGNIZE_LOCATIONS_PER_VARIANT]:
-            encodings = face_recognition.face_encodings(
-                variant_rgb,
-                [location],
-                num_jitters=max(1, int(num_jitters)),
-                model=FACE_ENCODING_MODEL,
-            )
+        for location in ordered_locations[:profile.locations_per_variant]:
+            with stage("encode"):
+                encodings = face_models.face_encodings(
+                    variant_rgb,
+                    [location],
+                    num_jitters=max(1, int(num_jitters)),
+                    model=FACE_ENCODING_MODEL,
+                )
             if not encodings:
                 continue
             candidates.append(encodings[0])
+            sources.append(f"{variant_name}/{detector}")
 
-    return select_diverse_candidates(candidates, max_candidates)
+    selected = select_diverse_indices(candidates, max_candidates)
+    # Origen de cada candidato, en el mismo orden, para atribuir el match (metricas y trazas).
+    note_event("candidate_sources", [sources[index] for index in selected])
+    return [candidates[index] for index in selected]
 
 
-def select_diverse_candidates(candidates, max_candidates):
+def location_area(location):
+    return max(0, location[2] - location[0]) * max(0, location[1] - location[3])
+
+
+def location_iou(a, b):
+    top = max(a[0], b[0])
+    right = min(a[1], b[1])
+    bottom = min(a[2], b[2])
+    left = max(a[3], b[3])
+    inter = location_area((top, right, bottom, left)) if bottom > top and right > left else 0
+    union = location_area(a) + location_area(b) - inter
+    return float(inter) / union if union > 0 else 0.0
+
+
+def extract_frame_face_encodings(rgb_image, num_jitters=1, max_faces=None, check_deadline=None, profile=None):
+    # Las variantes rotadas devuelven cajas en otro sistema de coordenadas; en modo multi-rostro solo
+    # se usan las que comparten geometria con el frame (base y CLAHE).
+    profile = (profile or PROFILE_FULL)._replace(rotation_fallback=False)
+    max_faces = MULTI_FACE_MAX_FACES if max_faces is None else max(1, int(max_faces))
+    locations = []
+
+    for variant_name, variant_rgb in build_detection_variants(rgb_image, profile):
+        if check_deadline is not None:
+            check_deadline()
+        append_event("variants_tried", variant_name)
+        for location in detect_variant_locations(variant_rgb, profile)[0]:
+            if all(location_iou(location, kept) < MULTI_FACE_IOU_DEDUP for kept in locations):
+                locations.append(tuple(int(v) for v in location))
+
+    locations = sorted(locations, key=location_area, reverse=True)[:max_faces]
+    if not locations:
+        return [], []
+
+    # Una sola llamada de dlib para todas las caras del frame.
+    with stage("encode"):
+        encodings = face_models.face_encodings(
+            rgb_image,
+            locations,
+            num_jitters=max(1, int(num_jitters)),
+            model=FACE_ENCODING_MODEL,
+        )
+    return locations, encodings
+
+
+def pairwise_face_distances(queries, known_embeddings):
+    queries = np.asarray(queries, dtype=np.float64)
+    known = np.asarray(known_embeddings, dtype=np.float64)
+    squared = (
+        np.sum(queries * queries, axis=1)[:, None]
+        + np.sum(known * known, axis=1)[None, :]
+        - 2.0 * (queries @ known.T)
+    )
+    return np.sqrt(np.maximum(squared, 0.0))
+
+
+def rank_employees(distances, known_ids, top_k):
+    # Mejor distancia por empleado (la galeria puede tener varios embeddings por persona).
+    best_by_employee = {}
+    for row in np.atleast_2d(distances):
+        seen = set()
+        for idx in np.argsort(row):
+            employee_id = str(known_ids[int(idx)])
+            if employee_id in seen:
+                continue
+            seen.add(employee_id)
+            distance = float(row[idx])
+            best_by_employee[employee_id] = min(best_by_employee.get(employee_id, distance), distance)
+            if len(seen) >= top_k:
+                break
+    return sorted(best_by_employee.items(), key=lambda item: item[1])[:top_k]
+
+
+def assign_face_matches(matches):
+    # Una persona no puede aparecer dos veces en el mismo frame: gana la caja con menor distancia.
+    assigned = [False] * len(matches)
+    taken = set()
+    order = sorted(range(len(matches)), key=lambda i: matches[i][0])
+    for i in order:
+        distance, employee_id = matches[i]
+        if distance < THRESHOLD and employee_id and employee_id not in taken:
+            taken.add(employee_id)
+            assigned[i] = True
+    return assigned
+
+
+def validate_client_embedding(values):
+    if not CLIENT_EMBEDDINGS_ENABLED:
+        raise InvalidRecognizeInput("Embeddings de cliente deshabilitados en este servidor")
+
+    vec = np.array(values, dtype=np.float64)
+    if vec.ndim != 1 or vec.size != EMBEDDING_DIMENSIONS:
+        raise InvalidRecognizeInput(f"embedding debe tener {EMBEDDING_DIMENSIONS} dimensiones, recibido {vec.size}")
+    if not np.all(np.isfinite(vec)):
+        raise InvalidRecognizeInput("embedding contiene valores no finitos")
+
+    # Los descriptores de dlib tienen norma ~1.0-1.6 y componentes pequenos; fuera de eso no vienen del mismo modelo.
+    norm = float(np.linalg.norm(vec))
+    if norm < CLIENT_EMBEDDING_NORM_MIN or norm > CLIENT_EMBEDDING_NORM_MAX or float(np.max(np.abs(vec))) > 1.0:
+        raise InvalidRecognizeInput(f"embedding fuera de rango plausible (norma={norm:.3f})")
+
+    return vec
+
+
+def resolve_client_face_location(face_box, image_shape):
+    height, width = image_shape[:2]
+    top = max(0, min(int(face_box.top), height))
+    bottom = max(0, min(int(face_box.bottom), height))
+    left = max(0, min(int(face_box.left), width))
+    right = max(0, min(int(face_box.right), width))
+
+    if bottom - top < CLIENT_FACE_BOX_MIN_SIDE or right - left < CLIENT_FACE_BOX_MIN_SIDE:
+        raise InvalidRecognizeInput("face_box invalido o demasiado pequeno para la imagen")
+
+    return (top, right, bottom, left)
+
+
+def extract_face_box_encodings(rgb_image, face_box, num_jitters=1):
+    note_event("match_source", "face_box")
+    location = resolve_client_face_location(face_box, rgb_image.shape)
+    with stage("encode"):
+        return face_models.face_encodings(
+            rgb_image,
+            [location],
+            num_jitters=max(1, int(num_jitters)),
+            model=FACE_ENCODING_MODEL,
+        )
+
+
+def select_diverse_indices(candidates, max_candidates):
     if len(candidates) <= max_candidates:
-        return candidates
+        return list(range(len(candidates)))
 
-    selected = [np.array(candidates[0], dtype=np.float64)]
-    remaining = [np.array(item, dtype=np.float64) for item in candidates[1:]]
+    vectors = [np.array(item, dtype=np.float64) for item in candidates]
+    selected = [0]
+    remaining = list(range(1, len(vectors)))
 
     while remaining and len(selected) < max_candidates:
         best_index = 0
         best_score = -1.0
 
-        for idx, candidate in enumerate(remaining):
-            distances = [float(np.linalg.norm(candidate - chosen)) for chosen in selected]
+        for idx, candidate_index in enumerate(remaining):
+            distances = [float(np.linalg.norm(vectors[candidate_index] - vectors[chosen])) for chosen in selected]
             score = min(distances) if distances else 0.0
             if score > best_score:
                 best_score = score
@@ -466,18 +1101,23 @@ def load_image_rgb_auto_oriented(image_path):
             normalized = ImageOps.exif_transpose(pil_image).convert("RGB")
             return np.array(normalized)
     except Exception:
-        return face_recognition.load_image_file(image_path)
+        return face_models.load_image_file(image_path)
 
 
 def decode_request_image_bgr_auto_oriented(image_bytes):
-    try:
-        with Image.open(io.BytesIO(image_bytes)) as pil_image:
-            normalized = ImageOps.exif_transpose(pil_image).convert("RGB")
-            rgb_np = np.array(normalized)
-            return cv2.cvtColor(rgb_np, cv2.COLOR_RGB2BGR)
-    except Exception:
-        image = np.frombuffer(image_bytes, np.uint8)
-        return cv2.imdecode(image, cv2.IMREAD_COLOR)
+    with stage("decode"):
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as pil_image:
+                normalized = ImageOps.exif_transpose(pil_image).convert("RGB")
+                rgb_np = np.array(normalized)
+                note_event("image_size", [int(rgb_np.shape[1]), int(rgb_np.shape[0])])
+                return cv2.cvtColor(rgb_np, cv2.COLOR_RGB2BGR)
+        except Exception:
+            image = np.frombuffer(image_bytes, np.uint8)
+            frame = cv2.imdecode(image, cv2.IMREAD_COLOR)
+            if frame is not None:
+                note_event("image_size", [int(frame.shape[1]), int(frame.shape[0])])
+            return frame
 
 
 def encode_bgr_to_jpeg_bytes(frame, quality=92):
@@ -487,346 +1127,2663 @@ def encode_bgr_to_jpeg_bytes(frame, quality=92):
     return encoded.tobytes()
 
 
-def extract_face_embeddings_from_paths(image_paths):
-    results = []
-    for image_path in image_paths:
-        embedding = extract_face_embedding_from_path(image_path)
-        if embedding is None:
-            results.append(
-                {
-                    "path": image_path,
-                    "success": False,
-                    "error": "No se detecto rostro",
-                }
-            )
-            continue
-
-        results.append(
-            {
-                "path": image_path,
-                "success": True,
-                "embedding": embedding,
-            }
-        )
+def resolve_extract_batch_workers(total_paths, workers=None):
+    if workers is None:
+        workers = EXTRACT_BATCH_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(int(workers), int(total_paths)))
 
-    return results
 
+def apply_thread_budget(threads):
+    """Fija los hilos por llamada de OpenCV, BLAS y FAISS (OpenMP); devuelve el valor efectivo de cada uno."""
+    threads = max(1, int(threads))
+    layout = {}
+    try:
+        cv2.setNumThreads(threads)
+        layout["opencv"] = cv2.getNumThreads()
+    except Exception as exc:
+        layout["opencv"] = f"error: {exc}"
 
-class FaceService(pb2_grpc.FaceRecognitionServiceServicer):
-    def __init__(self):
-        self.known_ids = []
-        self.known_embeddings = np.array([])
-        self._cache_lock = threading.RLock()
-        self._last_refresh_ts = 0.0
-        self._faiss_enabled = USE_FAISS and FAISS_AVAILABLE
-        self._faiss_index_type = FAISS_INDEX_TYPE or "flat"
-        self._faiss_index = None
-        self._faiss_ids = []
-        if USE_FAISS and not FAISS_AVAILABLE:
-            print(f"[WARN] FAISS no disponible, se usara busqueda lineal: {FAISS_IMPORT_ERROR}")
-        if self._faiss_enabled:
-            print(
-                "[INFO] FAISS habilitado: index=%s topk=%d fallback_ratio=%.2f"
-                % (self._faiss_index_type, FAISS_TOPK, FAISS_FALLBACK_RATIO)
-            )
-        self.load_embeddings()
+    # Ajusta en caliente las librerias ya cargadas (numpy y dlib enlazan BLAS).
+    threadpoolctl.threadpool_limits(limits=threads, user_api="blas")
+    for info in threadpoolctl.threadpool_info():
+        layout[f"{info.get('user_api')}:{info.get('internal_api')}"] = info.get("num_threads")
 
-    def load_embeddings(self):
-        pool_conn = get_connection_pool()
-        conn = pool_conn.getconn()
+    if faiss is not None:
         try:
-            cur = conn.cursor()
-            try:
-                cur.execute("SELECT employee_id, embedding FROM employees")
-                data = cur.fetchall()
-            finally:
-                cur.close()
-        finally:
-            pool_conn.putconn(conn)
+            faiss.omp_set_num_threads(threads)
+            layout["faiss_omp"] = faiss.omp_get_max_threads()
+        except Exception as exc:
+            layout["faiss_omp"] = f"error: {exc}"
+    return layout
+
+
+def configure_thread_layout():
+    """Calcula el reparto de hilos del servidor, lo aplica en caliente y devuelve el valor efectivo por libreria.
+
+    Las variables de entorno (setdefault respeta las del operador) llegan a los workers spawn del executor de
+    CPU, que cargan BLAS/OpenMP despues de arrancar.
+    """
+    global THREAD_LAYOUT
+    THREAD_LAYOUT = resolve_thread_layout()
+    for thread_env_var in THREAD_ENV_VARS:
+        os.environ.setdefault(thread_env_var, str(THREAD_LAYOUT["library_threads"]))
+    return apply_thread_budget(THREAD_LAYOUT["library_threads"])
+
+
+def format_thread_layout(applied, extra=None):
+    parts = [
+        f"cpus={THREAD_LAYOUT['cpus']}",
+        f"budget={THREAD_LAYOUT['budget']}",
+        f"paralelos={THREAD_LAYOUT['parallel']}",
+        f"codificacion={THREAD_LAYOUT['encode_parallel']}",
+        f"altas={THREAD_LAYOUT['enrollment_parallel']}",
+        f"busqueda={THREAD_LAYOUT['search_parallel']}",
+        f"hilos_por_llamada={THREAD_LAYOUT['library_threads']}",
+    ]
+    parts.extend(f"{key}={value}" for key, value in (extra or {}).items())
+    parts.extend(f"{key}={value}" for key, value in applied.items())
+    return " ".join(parts)
+
+
+def _init_extract_batch_worker():
+    # Cada proceso usa un solo hilo por libreria para no sobre-suscribir los nucleos.
+    try:
+        apply_thread_budget(1)
+    except Exception:
+        pass
 
-        ids = []
-        embeddings = []
 
-        for emp_id, embed in data:
-            prototype_vectors = decode_embedding_payload(embed)
-            for vector in prototype_vectors:
-                ids.append(emp_id)
-                embeddings.append(vector)
+def _init_cpu_worker(library_threads):
+    # Workers del executor de CPU en asyncio: cada proceso recibe su parte del presupuesto.
+    try:
+        apply_thread_budget(library_threads)
+    except Exception:
+        pass
 
-        with self._cache_lock:
-            if embeddings:
-                self.known_embeddings = np.array(embeddings)
-                self.known_ids = ids
-            else:
-                self.known_embeddings = np.array([])
-                self.known_ids = []
-            self._rebuild_faiss_index()
-            self._last_refresh_ts = time.time()
 
-        print(f"Loaded {len(self.known_ids)} embeddings into memory.")
+def build_extract_batch_result(image_path, embedding, error=None):
+    if embedding is None:
+        return {
+            "path": image_path,
+            "success": False,
+            "error": error or "No se detecto rostro",
+        }
 
-    def _maybe_refresh_embeddings(self):
-        now = time.time()
-        if REFRESH_SECONDS <= 0:
-            return
-        if now - self._last_refresh_ts >= REFRESH_SECONDS:
-            self.load_embeddings()
+    return {
+        "path": image_path,
+        "success": True,
+        "embedding": embedding,
+    }
 
-    def _cache_snapshot(self):
-        with self._cache_lock:
-            if len(self.known_embeddings) == 0:
-                return np.array([]), []
-            return np.array(self.known_embeddings, copy=True), list(self.known_ids)
 
-    def _rebuild_faiss_index(self):
-        if not self._faiss_enabled:
-            self._faiss_index = None
-            self._faiss_ids = []
-            return
-        if len(self.known_embeddings) == 0:
-            self._faiss_index = None
-            self._faiss_ids = []
-            return
-        vectors = np.array(self.known_embeddings, dtype=np.float32)
-        if vectors.ndim != 2:
-            self._faiss_index = None
-            self._faiss_ids = []
-            return
-        dims = vectors.shape[1]
-        if self._faiss_index_type == "hnsw":
-            index = faiss.IndexHNSWFlat(dims, FAISS_HNSW_M)
-            index.hnsw.efSearch = FAISS_HNSW_EF_SEARCH
-            index.hnsw.efConstruction = FAISS_HNSW_EF_CONSTRUCTION
-        else:
-            index = faiss.IndexFlatL2(dims)
-        index.add(vectors)
-        self._faiss_index = index
-        self._faiss_ids = list(self.known_ids)
+def extract_face_embeddings_from_paths(image_paths, workers=None, timeout_seconds=None):
+    image_paths = list(image_paths)
+    if not image_paths:
+        return []
 
-    def _faiss_search_candidates(self, vector, k):
-        if not self._faiss_enabled or self._faiss_index is None or len(self._faiss_ids) == 0:
-            return []
-        vec = np.array(vector, dtype=np.float32).reshape(1, -1)
-        distances, indices = self._faiss_index.search(vec, k)
-        if indices.size == 0:
-            return []
-        pairs = []
-        for idx, dist in zip(indices[0].tolist(), distances[0].tolist()):
-            if idx is None:
-                continue
-            idx = int(idx)
-            if idx < 0 or idx >= len(self._faiss_ids):
-                continue
-            # FAISS IndexFlatL2 returns squared L2 distance.
-            pairs.append((idx, float(np.sqrt(dist))))
-        return pairs
+    if timeout_seconds is None:
+        timeout_seconds = EXTRACT_BATCH_TIMEOUT_SECONDS
+    pool_size = resolve_extract_batch_workers(len(image_paths), workers)
+
+    if pool_size <= 1:
+        return [
+            build_extract_batch_result(image_path, extract_face_embedding_from_path(image_path))
+            for image_path in image_paths
+        ]
+
+    results = {}
+    remaining = list(range(len(image_paths)))
+    while remaining:
+        resubmit = []
+        # Pool (y no ProcessPoolExecutor) porque terminate() permite matar un worker atascado
+        # en una imagen patologica sin bloquear la salida del CLI.
+        with multiprocessing.Pool(processes=pool_size, initializer=_init_extract_batch_worker) as extract_pool:
+            pending = [
+                (index, extract_pool.apply_async(extract_face_embedding_from_path, (image_paths[index],)))
+                for index in remaining
+            ]
+            for position, (index, async_result) in enumerate(pending):
+                try:
+                    results[index] = build_extract_batch_result(
+                        image_paths[index], async_result.get(timeout=timeout_seconds)
+                    )
+                except multiprocessing.TimeoutError:
+                    results[index] = build_extract_batch_result(
+                        image_paths[index], None, error="Tiempo de extraccion excedido"
+                    )
+                    # La tarea vencida sigue ocupando su worker: si se siguiera esperando en este pool, las
+                    # imagenes siguientes podrian vencer sin haber corrido. Se recoge lo que ya termino, se
+                    # mata el pool al salir del with y el resto se reenvia a uno nuevo.
+                    for later_index, later_result in pending[position + 1:]:
+                        if later_result.ready():
+                            results[later_index] = collect_extract_batch_result(image_paths[later_index], later_result)
+                        else:
+                            resubmit.append(later_index)
+                    break
+                except Exception as exc:
+                    results[index] = build_extract_batch_result(
+                        image_paths[index], None, error=f"Error de extraccion: {exc}"
+                    )
+        remaining = resubmit
 
-    def _upsert_cache_entry(self, employee_id, embeddings):
-        vectors = []
-        for emb in embeddings:
-            vec = np.array(emb, dtype=np.float64)
-            if vec.ndim == 1 and vec.size > 0:
-                vectors.append(vec)
+    return [results[index] for index in range(len(image_paths))]
 
-        if not vectors:
-            return
 
-        with self._cache_lock:
-            keep_ids = []
-            keep_embeddings = []
-            for idx, known_id in enumerate(self.known_ids):
-                if known_id != employee_id:
-                    keep_ids.append(known_id)
-                    keep_embeddings.append(self.known_embeddings[idx])
+def collect_extract_batch_result(image_path, async_result):
+    try:
+        return build_extract_batch_result(image_path, async_result.get(timeout=0))
+    except Exception as exc:
+        return build_extract_batch_result(image_path, None, error=f"Error de extraccion: {exc}")
 
-            for vector in vectors:
-                keep_ids.append(employee_id)
-                keep_embeddings.append(vector)
 
-            if keep_embeddings:
-                self.known_embeddings = np.array(keep_embeddings, dtype=np.float64)
-                self.known_ids = keep_ids
-            else:
-                self.known_embeddings = np.array([])
-                self.known_ids = []
+class StageCapture:
+    """Tiempos por etapa y eventos de una peticion; viaja en un ContextVar y vuelve de los workers de CPU."""
 
-            self._rebuild_faiss_index()
-            self._last_refresh_ts = time.time()
+    __slots__ = ("stages", "events")
 
-    def RegisterEmployee(self, request, context):
-        try:
-            frame = decode_request_image_bgr_auto_oriented(request.image)
+    def __init__(self):
+        self.stages = {}
+        self.events = {}
 
-            if frame is None:
-                return pb2.RegisterEmployeeResponse(success=False, message="Invalid image")
+    def add_stage(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
 
-            with face_encode_semaphore:
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                encoding = extract_primary_face_encoding(rgb_frame, num_jitters=FACE_ENCODING_JITTERS_REGISTER)
+    def merge(self, stages, events):
+        for name, seconds in stages.items():
+            self.add_stage(name, seconds)
+        self.events.update(events)
 
-            if encoding is None:
-                return pb2.RegisterEmployeeResponse(success=False, message="No face detected")
 
-            new_embedding = np.array(encoding, dtype=np.float64)
-            normalized_photo_bytes = encode_bgr_to_jpeg_bytes(frame) or request.image
+current_capture = contextvars.ContextVar("bmpi_stage_capture", default=None)
 
-            pool_conn = get_connection_pool()
-            conn = pool_conn.getconn()
-            cache_embeddings = [new_embedding]
-            try:
-                cur = conn.cursor()
-                try:
-                    cur.execute(
-                        "SELECT embedding, samples_count FROM employees WHERE employee_id = %s",
-                        (request.employee_id,),
-                    )
-                    existing = cur.fetchone()
-
-                    if existing:
-                        old_prototypes = decode_embedding_payload(existing[0])
-                        samples_count = int(existing[1] or 1)
-                        merged = old_prototypes + [new_embedding]
-                        selected = select_prototypes(merged, MAX_PROTOTYPES_PER_EMPLOYEE)
-                        payload = build_embedding_payload(selected)
-                        cache_embeddings = selected
-
-                        cur.execute(
-                            """
-                            UPDATE employees
-                            SET name = %s,
-                                embedding = %s,
-                                photo = %s,
-                                samples_count = %s
-                            WHERE employee_id = %s
-                            """,
-                            (
-                                request.name,
-                                pickle.dumps(payload),
-                                normalized_photo_bytes,
-                                samples_count + 1,
-                                request.employee_id,
-                            ),
-                        )
-                        message = f"Employee embedding updated ({samples_count + 1} samples, {len(selected)} prototipos)"
-                    else:
-                        payload = build_embedding_payload([new_embedding])
-                        cur.execute(
-                            "INSERT INTO employees (name, employee_id, embedding, photo, samples_count) VALUES (%s,%s,%s,%s,%s)",
-                            (request.name, request.employee_id, pickle.dumps(payload), normalized_photo_bytes, 1),
-                        )
-                        message = "Employee registered"
 
-                    conn.commit()
-                except Exception:
-                    conn.rollback()
-                    raise
-                finally:
-                    cur.close()
-            finally:
-                pool_conn.putconn(conn)
+@contextmanager
+def stage(name):
+    capture = current_capture.get()
+    if capture is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        capture.add_stage(name, time.perf_counter() - started)
 
-            self._upsert_cache_entry(request.employee_id, cache_embeddings)
-            return pb2.RegisterEmployeeResponse(success=True, message=message)
-        except Exception as exc:
-            print(f"RegisterEmployee error: {exc}")
-            traceback.print_exc()
-            return pb2.RegisterEmployeeResponse(success=False, message="Error interno al registrar empleado")
 
-    def RecognizeFace(self, request, context):
-        try:
-            self._maybe_refresh_embeddings()
-            known_embeddings, known_ids = self._cache_snapshot()
-            if len(known_embeddings) == 0:
-                return pb2.RecognizeFaceResponse(recognized=False)
+def note_event(key, value):
+    capture = current_capture.get()
+    if capture is not None:
+        capture.events[key] = value
 
-            frame = decode_request_image_bgr_auto_oriented(request.image)
-            if frame is None:
-                return pb2.RecognizeFaceResponse(recognized=False)
 
-            with face_encode_semaphore:
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                encodings = extract_candidate_encodings(
-                    rgb_frame,
-                    num_jitters=FACE_ENCODING_JITTERS_RECOGNIZE,
-                    max_candidates=RECOGNIZE_MAX_CANDIDATES,
-                )
-                if len(encodings) == 0:
-                    return pb2.RecognizeFaceResponse(recognized=False)
+def append_event(key, value):
+    capture = current_capture.get()
+    if capture is not None:
+        capture.events.setdefault(key, []).append(value)
+
+
+def captured_event(key, default=None):
+    capture = current_capture.get()
+    if capture is None:
+        return default
+    return capture.events.get(key, default)
+
+
+def run_with_capture(func, *args):
+    """Ejecuta func en un worker de CPU (hilo o proceso) y devuelve (resultado, etapas, eventos)."""
+    capture = StageCapture()
+    token = current_capture.set(capture)
+    try:
+        result = func(*args)
+    finally:
+        current_capture.reset(token)
+    return result, capture.stages, capture.events
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in labels) + "}"
+
+
+def format_metric_value(value):
+    # Enteros tal cual: con .6g los contadores grandes y los gauges en bytes pierden digitos.
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    return f"{float(value):.6g}"
+
+
+def render_prometheus_text(families):
+    """families: [(nombre, tipo, ayuda, [(sufijo, labels, valor), ...])] en formato de texto 0.0.4."""
+    lines = []
+    for name, kind, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{name}{suffix}{format_labels(labels)} {format_metric_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsRegistry:
+    """Histogramas y contadores en memoria; los gauges se leen de los snapshots existentes al exportar."""
+
+    def __init__(self, buckets):
+        self._buckets = tuple(sorted(float(b) for b in buckets))
+        self._lock = threading.Lock()
+        self._help = {}
+        self._histograms = {}
+        self._counters = {}
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [[0] * (len(self._buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def families(self):
+        grouped = {}
+        with self._lock:
+            for (name, labels), (counts, total, count) in sorted(self._histograms.items()):
+                samples = grouped.setdefault((name, "histogram"), [])
+                cumulative = 0
+                for bound, bucket_count in zip(self._buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    samples.append(("_bucket", labels + (("le", le),), cumulative))
+                samples.append(("_sum", labels, total))
+                samples.append(("_count", labels, count))
+            for (name, labels), value in sorted(self._counters.items()):
+                grouped.setdefault((name, "counter"), []).append(("", labels, value))
+        return [(name, kind, self._help.get(name, name), samples) for (name, kind), samples in grouped.items()]
+
+
+metrics = MetricsRegistry(METRICS_LATENCY_BUCKETS)
+metrics.describe("bmpi_rpc_duration_seconds", "Latencia de cada RPC")
+metrics.describe("bmpi_rpc_total", "RPC atendidos por resultado")
+metrics.describe("bmpi_stage_duration_seconds", "Tiempo acumulado por etapa del pipeline dentro de una peticion")
+metrics.describe("bmpi_match_source_total", "Variante/detector que produjo el rostro usado en la respuesta")
+
+
+def classify_rpc_outcome(response, context):
+    try:
+        code = context.code()
+    except Exception:
+        code = None
+    if code is not None and code != grpc.StatusCode.OK:
+        return code.name.lower() if hasattr(code, "name") else str(code)
+    if hasattr(response, "recognized"):
+        return "recognized" if response.recognized else "not_recognized"
+    if hasattr(response, "success"):
+        return "ok" if response.success else "failed"
+    return "ok"
+
+
+def classify_rpc_failure(exc, context):
+    """Outcome de una RPC que termino con excepcion: el codigo gRPC que recibe el cliente, en minusculas.
+
+    context.abort() deja fijado su codigo antes de lanzar; una excepcion sin codigo llega como UNKNOWN y una
+    cancelacion del cliente como CANCELLED. Es el mismo nombre que registra el replay con exc.code().
+    """
+    if type(exc).__name__ == "CancelledError":
+        return "cancelled"
+    try:
+        code = context.code()
+    except Exception:
+        code = None
+    if code is not None and code != grpc.StatusCode.OK:
+        return code.name.lower() if hasattr(code, "name") else str(code)
+    return "unknown"
+
+
+def record_rpc(method, capture, elapsed, outcome):
+    metrics.observe("bmpi_rpc_duration_seconds", elapsed, method=method)
+    metrics.inc("bmpi_rpc_total", method=method, outcome=outcome)
+    for name, seconds in capture.stages.items():
+        metrics.observe("bmpi_stage_duration_seconds", seconds, method=method, stage=name)
+    source = capture.events.get("match_source")
+    if source and outcome in ("recognized", "ok"):
+        metrics.inc("bmpi_match_source_total", rpc=method, source=source)
+
+
+def instrumented_rpc(method):
+    """Decorador de RPC: abre la captura de etapas y registra latencia, resultado y fuente del match.
+
+    Una llamada anidada (el servicer asyncio delegando en el sincrono) reutiliza la captura externa.
+    Si el servicer tiene `trace_sink` o `request_capture`, la peticion se ofrece ademas a esos registros.
+    """
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(self, request, context):
+                if current_capture.get() is not None:
+                    return await func(self, request, context)
+                capture = StageCapture()
+                token = current_capture.set(capture)
+                started = time.perf_counter()
+                outcome = "unknown"
+                response = None
+                try:
+                    response = await func(self, request, context)
+                    outcome = classify_rpc_outcome(response, context)
+                    return response
+                except BaseException as exc:
+                    outcome = classify_rpc_failure(exc, context)
+                    raise
+                finally:
+                    current_capture.reset(token)
+                    elapsed = time.perf_counter() - started
+                    record_rpc(method, capture, elapsed, outcome)
+                    if self.trace_sink is not None:
+                        trace_rpc(self.trace_sink, method, request, response, capture, elapsed, outcome)
+                    if self.request_capture is not None:
+                        self.request_capture.offer(method, request, response, capture, elapsed, outcome)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, request, context):
+            if current_capture.get() is not None:
+                return func(self, request, context)
+            capture = StageCapture()
+            token = current_capture.set(capture)
+            started = time.perf_counter()
+            outcome = "unknown"
+            response = None
+            try:
+                response = func(self, request, context)
+                outcome = classify_rpc_outcome(response, context)
+                return response
+            except BaseException as exc:
+                outcome = classify_rpc_failure(exc, context)
+                raise
+            finally:
+                current_capture.reset(token)
+                elapsed = time.perf_counter() - started
+                record_rpc(method, capture, elapsed, outcome)
+                if self.trace_sink is not None:
+                    trace_rpc(self.trace_sink, method, request, response, capture, elapsed, outcome)
+                if self.request_capture is not None:
+                    self.request_capture.offer(method, request, response, capture, elapsed, outcome)
+
+        return wrapper
+
+    return decorator
+
+
+def labeled_samples(label, values):
+    return [("", ((label, key),), value) for key, value in values.items()]
+
+
+def snapshot_metric_families(service):
+    """Gauges y contadores derivados de los snapshots que ya exponia el servicio."""
+    gallery = service.gallery_snapshot()
+    admission = service.admission_snapshot()
+    scheduler = service.scheduler_snapshot()
+    enrollment = service.enrollment_snapshot()
+    caches = service.cache_snapshots()
+
+    shed = []
+    for name, snap in admission.items():
+        shed.append(("", (("method", name), ("reason", "queue_full")), snap["shed_queue_full"]))
+        shed.append(("", (("method", name), ("reason", "deadline")), snap["shed_deadline"]))
+    lookups = []
+    for name, snap in caches.items():
+        for kind, stats in snap["kinds"].items():
+            for result in ("hits", "misses", "coalesced"):
+                lookups.append(("", (("cache", name), ("kind", kind), ("result", result)), stats[result]))
+    classes = scheduler["classes"]
+
+    return [
+        ("bmpi_gallery_embeddings", "gauge", "Prototipos en la galeria en memoria", [("", (), gallery["embeddings"])]),
+        ("bmpi_gallery_employees", "gauge", "Empleados distintos en la galeria", [("", (), gallery["employees"])]),
+        ("bmpi_gallery_version", "gauge", "Version de la galeria", [("", (), gallery["version"])]),
+        (
+            "bmpi_gallery_snapshot_age_seconds",
+            "gauge",
+            "Segundos desde la ultima recarga completa de la galeria",
+            [("", (), gallery["age_seconds"])],
+        ),
+        (
+            "bmpi_admission_pending",
+            "gauge",
+            "Peticiones admitidas esperando o ejecutando CPU",
+            labeled_samples("method", {name: snap["pending"] for name, snap in admission.items()}),
+        ),
+        ("bmpi_admission_shed_total", "counter", "Peticiones descartadas por admision", shed),
+        ("bmpi_scheduler_slots", "gauge", "Slots de CPU del planificador", [("", (), scheduler["total_slots"])]),
+        (
+            "bmpi_scheduler_queue_depth",
+            "gauge",
+            "Peticiones esperando slot de CPU por clase",
+            labeled_samples("class", {name: snap["waiting"] for name, snap in classes.items()}),
+        ),
+        (
+            "bmpi_scheduler_running",
+            "gauge",
+            "Slots de CPU ocupados por clase",
+            labeled_samples("class", {name: snap["running"] for name, snap in classes.items()}),
+        ),
+        (
+            "bmpi_scheduler_granted_total",
+            "counter",
+            "Slots de CPU concedidos por clase",
+            labeled_samples("class", {name: snap["granted"] for name, snap in classes.items()}),
+        ),
+        ("bmpi_enrollment_queue_depth", "gauge", "Altas en cola", [("", (), enrollment["queued"])]),
+        ("bmpi_enrollment_jobs", "gauge", "Jobs de alta por estado", labeled_samples("state", enrollment["jobs"])),
+        (
+            "bmpi_cache_entries",
+            "gauge",
+            "Entradas por cache",
+            labeled_samples("cache", {name: snap["entries"] for name, snap in caches.items()}),
+        ),
+        ("bmpi_cache_lookups_total", "counter", "Consultas por cache, espacio de claves y resultado", lookups),
+    ] + (
+        trace_metric_families(service.trace_sink)
+        + capture_metric_families(service.request_capture)
+        + memory_metric_families(service)
+    )
+
+
+def capture_metric_families(capture):
+    if capture is None:
+        return []
+    snap = capture.snapshot()
+    results = {name: snap[name] for name in ("written", "dropped", "purged")}
+    return [
+        (
+            "bmpi_capture_items_total",
+            "counter",
+            "Muestras del corpus de captura por resultado",
+            labeled_samples("result", results),
+        ),
+        ("bmpi_capture_corpus_items", "gauge", "Muestras retenidas en el corpus de captura", [("", (), snap["items"])]),
+    ]
+
+
+def trace_metric_families(sink):
+    if sink is None:
+        return []
+    snap = sink.snapshot()
+    results = {name: snap[name] for name in ("written", "dropped", "skipped")}
+    return [
+        ("bmpi_trace_records_total", "counter", "Registros de traza por resultado", labeled_samples("result", results)),
+        ("bmpi_trace_queue_depth", "gauge", "Registros de traza pendientes de escribir", [("", (), snap["queued"])]),
+    ]
+
+
+def render_metrics(service):
+    return render_prometheus_text(metrics.families() + snapshot_metric_families(service))
+
+
+def start_metrics_server(service):
+    """Endpoint HTTP local con /metrics en formato Prometheus; None si BMPI_METRICS_PORT no esta configurado."""
+    if METRICS_PORT <= 0:
+        return None
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            route, _, query = self.path.partition("?")
+            if route == "/debug/profile" and PROFILE_HTTP:
+                self._profile(query)
+                return
+            if route == "/debug/memory":
+                self._memory(query)
+                return
+            if route != "/metrics":
+                self.send_error(404)
+                return
+            try:
+                body = render_metrics(service).encode("utf-8")
+            except Exception as exc:
+                self.send_error(500, str(exc))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _profile(self, query):
+            from urllib.parse import parse_qs
+
+            try:
+                seconds = float(parse_qs(query).get("seconds", [PROFILE_SECONDS])[0])
+            except ValueError:
+                self.send_error(400, "seconds invalido")
+                return
+            result = sampling_profiler.run(seconds)
+            if result is None:
+                self.send_error(409, "ya hay un perfil en curso")
+                return
+            self._send_json(result)
+
+        def _memory(self, query):
+            from urllib.parse import parse_qs
+
+            try:
+                top = max(1, int(parse_qs(query).get("top", [MEMORY_TOP])[0]))
+            except ValueError:
+                self.send_error(400, "top invalido")
+                return
+            try:
+                result = memory_report(service, top)
+            except Exception as exc:
+                self.send_error(500, str(exc))
+                return
+            self._send_json(result)
+
+        def _send_json(self, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((METRICS_HOST, METRICS_PORT), MetricsHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name="bmpi-metrics", daemon=True).start()
+    print(f"[INFO] Metricas Prometheus en http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    print(f"[INFO] Memoria por componente en http://{METRICS_HOST}:{METRICS_PORT}/debug/memory")
+    if PROFILE_HTTP:
+        print(f"[INFO] Perfilado bajo demanda en http://{METRICS_HOST}:{METRICS_PORT}/debug/profile?seconds=N")
+    return httpd
+
+
+# Hojas de pila que corresponden a hilos dormidos esperando trabajo, no a CPU: el muestreo solo ve el frame
+# Python que llamo a la espera en C, asi que se filtran por archivo o por (archivo, funcion).
+PROFILE_IDLE_FILES = ("threading.py", "selectors.py", "queue.py", "socketserver.py")
+PROFILE_IDLE_FUNCTIONS = (
+    ("thread.py", "_worker"),
+    ("_server.py", "_serve"),
+    ("socket.py", "accept"),
+    ("socket.py", "readinto"),
+)
+
+
+def profile_is_idle(frame):
+    filename = os.path.basename(frame.f_code.co_filename)
+    return filename in PROFILE_IDLE_FILES or (filename, frame.f_code.co_name) in PROFILE_IDLE_FUNCTIONS
+
+
+def profile_thread_label(name):
+    # ThreadPoolExecutor-0_3 -> ThreadPoolExecutor-0: los hilos de un mismo pool se agregan en una sola raiz.
+    base, sep, suffix = name.rpartition("_")
+    return base if sep and suffix.isdigit() else name
+
+
+def profile_frame_label(frame):
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}.{code.co_name}:{code.co_firstlineno}"
+
+
+class SamplingProfiler:
+    """Perfilador estadistico bajo demanda: muestrea sys._current_frames() de todos los hilos durante N segundos.
+
+    Fuera de una sesion no hay ningun hilo ni hook activo. Escribe un archivo de pilas colapsadas
+    (compatible con flamegraph.pl / speedscope) y un resumen con las funciones mas calientes.
+    """
+
+    def __init__(self, output_dir=PROFILE_DIR, interval_ms=PROFILE_INTERVAL_MS, top=PROFILE_TOP):
+        self.output_dir = output_dir
+        self.interval = interval_ms / 1000.0
+        self.top = top
+        self._busy = threading.Lock()
+
+    def start(self, seconds=PROFILE_SECONDS):
+        """Lanza una sesion en segundo plano; False si ya hay una en curso."""
+        if not self._busy.acquire(blocking=False):
+            return False
+        threading.Thread(target=self._session, args=(seconds,), name="bmpi-profiler", daemon=True).start()
+        return True
+
+    def run(self, seconds=PROFILE_SECONDS):
+        """Sesion sincrona; devuelve el resumen o None si ya hay una en curso."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        return self._session(seconds)
+
+    def _session(self, seconds):
+        try:
+            seconds = min(max(0.1, float(seconds)), PROFILE_MAX_SECONDS)
+            print(f"[INFO] Perfilado iniciado: {seconds:.1f}s cada {self.interval * 1000.0:.1f}ms")
+            stacks, samples, idle = self.sample(seconds)
+            result = self.write(stacks, samples, idle, seconds)
+            print(f"[INFO] Perfilado terminado: {result['collapsed']} {result['summary']}")
+            return result
+        except Exception as exc:
+            print(f"[WARN] Perfilado fallido: {exc}")
+            return {"error": str(exc)}
+        finally:
+            self._busy.release()
+
+    def sample(self, seconds):
+        own_id = threading.get_ident()
+        stacks = {}
+        samples = 0
+        idle = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if profile_is_idle(frame):
+                    idle += 1
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(profile_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(profile_thread_label(names.get(thread_id, str(thread_id))))
+                key = tuple(reversed(labels))
+                stacks[key] = stacks.get(key, 0) + 1
+                samples += 1
+            time.sleep(self.interval)
+        return stacks, samples, idle
+
+    def summarize(self, stacks):
+        own = {}
+        cumulative = {}
+        for stack, count in stacks.items():
+            own[stack[-1]] = own.get(stack[-1], 0) + count
+            for label in set(stack[1:]):
+                cumulative[label] = cumulative.get(label, 0) + count
+        return own, cumulative
+
+    def write(self, stacks, samples, idle, seconds):
+        ensure_private_dir(self.output_dir)
+        base = os.path.join(self.output_dir, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{os.getpid()}")
+        collapsed_path = base + ".collapsed"
+        summary_path = base + ".txt"
+        with create_private_file(collapsed_path) as handle:
+            for stack, count in sorted(stacks.items(), key=lambda item: item[1], reverse=True):
+                handle.write(";".join(stack) + f" {count}\n")
+
+        own, cumulative = self.summarize(stacks)
+        total = max(1, samples)
+        lines = [
+            f"duracion={seconds:.1f}s intervalo={self.interval * 1000.0:.1f}ms muestras_activas={samples} "
+            f"muestras_en_espera={idle}",
+        ]
+        if GRPC_ASYNC and ASYNC_CPU_EXECUTOR != "thread":
+            lines.append("nota: el executor de CPU usa procesos; su trabajo aparece como espera en este proceso")
+        lines.append("")
+        lines.append(f"{'propio':>8} {'%':>6} {'acumulado':>10} {'%':>6}  funcion")
+        for label, count in sorted(own.items(), key=lambda item: item[1], reverse=True)[: self.top]:
+            lines.append(
+                f"{count:>8} {100.0 * count / total:>5.1f}% {cumulative.get(label, 0):>10} "
+                f"{100.0 * cumulative.get(label, 0) / total:>5.1f}%  {label}"
+            )
+        with create_private_file(summary_path) as handle:
+            handle.write("\n".join(lines) + "\n")
+
+        return {
+            "collapsed": collapsed_path,
+            "summary": summary_path,
+            "samples": samples,
+            "idle_samples": idle,
+            "top": [
+                {"function": label, "self": count, "cumulative": cumulative.get(label, 0)}
+                for label, count in sorted(own.items(), key=lambda item: item[1], reverse=True)[: self.top]
+            ],
+        }
+
+
+sampling_profiler = SamplingProfiler()
+
+
+def install_profile_signal():
+    """Asocia BMPI_PROFILE_SIGNAL (default SIGUSR2) a una sesion de BMPI_PROFILE_SECONDS en segundo plano."""
+    if not PROFILE_SIGNAL or PROFILE_SIGNAL in ("0", "NONE", "OFF"):
+        return None
+    signum = getattr(signal, PROFILE_SIGNAL, None)
+    if signum is None:
+        print(f"[WARN] Senal de perfilado no disponible en esta plataforma: {PROFILE_SIGNAL}")
+        return None
+
+    def handle(_signum, _frame):
+        if not sampling_profiler.start(PROFILE_SECONDS):
+            print("[WARN] Ya hay un perfilado en curso; se ignora la senal")
+
+    try:
+        signal.signal(signum, handle)
+    except ValueError:
+        # signal.signal solo funciona en el hilo principal (p. ej. servidor embebido en otro proceso).
+        print("[WARN] Senal de perfilado no instalada: el servidor no corre en el hilo principal")
+        return None
+    print(
+        f"[INFO] Perfilado bajo demanda: kill -{PROFILE_SIGNAL[3:]} {os.getpid()} "
+        f"({PROFILE_SECONDS:.0f}s -> {PROFILE_DIR})"
+    )
+    return signum
+
+
+# Funciones cuyas asignaciones (vistas por tracemalloc) se atribuyen a cada componente. numpy, y con el los arrays
+# que devuelve cv2, registra sus buffers en tracemalloc; la memoria interna de dlib, FAISS y libpq no.
+MEMORY_COMPONENT_FUNCTIONS = {
+    "image_buffers": (
+        "decode_request_image_bgr_auto_oriented",
+        "encode_recognize_request",
+        "encode_register_image",
+        "build_detection_variants",
+        "enhance_contrast_clahe",
+        "rotate_rgb_image",
+        "detect_face_locations_haar",
+        "encode_bgr_to_jpeg_bytes",
+        "load_image_rgb_auto_oriented",
+    ),
+    "gallery": ("FaceService.load_embeddings", "FaceService._rebuild_faiss_index", "decode_embedding_payload"),
+}
+MEMORY_COMPONENT_PACKAGES = (("psycopg2", "db_pool"), ("asyncpg", "db_pool"), ("grpc", "grpc"))
+memory_component_ranges_cache = None
+
+
+def process_rss_bytes():
+    """RSS actual del proceso (Linux); None donde /proc no existe."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def process_peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss esta en KB en Linux y en bytes en macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def model_memory_bytes(name, rss_before):
+    # dlib reserva en C++: el crecimiento del RSS al construir el modelo es la mejor medida disponible;
+    # sin /proc se usa el tamano del archivo, que es del mismo orden.
+    rss_after = process_rss_bytes()
+    if rss_before is not None and rss_after is not None and rss_after > rss_before:
+        return rss_after - rss_before
+    if name in FACE_MODEL_FILES:
+        try:
+            return os.path.getsize(os.path.join(face_models_dir(), FACE_MODEL_FILES[name]))
+        except OSError:
+            return None
+    return None
+
+
+def faiss_index_bytes(index):
+    if index is None:
+        return 0
+    size = int(index.ntotal) * int(index.d) * 4
+    hnsw = getattr(index, "hnsw", None)
+    if hnsw is not None:
+        # Grafo HNSW: vecinos (int32), offsets por vector (int64) y nivel de cada vector (int32).
+        size += int(hnsw.neighbors.size()) * 4 + int(hnsw.offsets.size()) * 8 + int(hnsw.levels.size()) * 4
+    return size
+
+
+def db_pool_snapshot():
+    # Solo conteos: la memoria de cada conexion vive en libpq y cae en la parte no atribuida del RSS.
+    if connection_pool is None:
+        return {"connections": 0, "idle": 0}
+    idle = len(getattr(connection_pool, "_pool", ()))
+    used = len(getattr(connection_pool, "_used", {}))
+    return {"connections": idle + used, "idle": idle, "max": getattr(connection_pool, "maxconn", None)}
+
+
+def start_memory_tracing():
+    if MEMORY_TRACEMALLOC_FRAMES <= 0 or tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(MEMORY_TRACEMALLOC_FRAMES)
+    print(f"[INFO] tracemalloc activo ({MEMORY_TRACEMALLOC_FRAMES} frames): memoria Python atribuida por componente")
+    return True
+
+
+def memory_component_ranges():
+    global memory_component_ranges_cache
+    if memory_component_ranges_cache is None:
+        ranges = []
+        for component, names in MEMORY_COMPONENT_FUNCTIONS.items():
+            for name in names:
+                target = globals().get(name.split(".")[0])
+                for attr in name.split(".")[1:]:
+                    target = getattr(target, attr, None)
+                try:
+                    lines, first = inspect.getsourcelines(target)
+                except (OSError, TypeError):
+                    continue
+                ranges.append((first, first + len(lines), component))
+        memory_component_ranges_cache = ranges
+    return memory_component_ranges_cache
+
+
+def traced_memory_component(traceback_frames, own_file, ranges):
+    # Del frame mas reciente al mas antiguo: gana la funcion conocida mas cercana a la asignacion.
+    for frame in reversed(traceback_frames):
+        if frame.filename == own_file:
+            for first, last, component in ranges:
+                if first <= frame.lineno < last:
+                    return component
+            continue
+        for package, component in MEMORY_COMPONENT_PACKAGES:
+            if f"{os.sep}{package}{os.sep}" in frame.filename:
+                return component
+    return "other"
+
+
+def traced_memory_report(top=MEMORY_TOP):
+    """Memoria Python viva segun tracemalloc: por componente y los sitios de asignacion mas grandes."""
+    if not tracemalloc.is_tracing():
+        return {"tracing": False, "hint": "BMPI_MEMORY_TRACEMALLOC_FRAMES>0 para atribuir la memoria Python"}
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+    own_file = os.path.abspath(__file__)
+    ranges = memory_component_ranges()
+    by_component = {}
+    for entry in snapshot.statistics("traceback"):
+        component = traced_memory_component(entry.traceback, own_file, ranges)
+        by_component[component] = by_component.get(component, 0) + entry.size
+    top_sites = [
+        {
+            "site": f"{os.path.basename(entry.traceback[0].filename)}:{entry.traceback[0].lineno}",
+            "bytes": entry.size,
+            "count": entry.count,
+        }
+        for entry in snapshot.statistics("lineno")[:top]
+    ]
+    return {
+        "tracing": True,
+        "frames": tracemalloc.get_traceback_limit(),
+        "traced_bytes": current,
+        "traced_peak_bytes": peak,
+        "by_component": dict(sorted(by_component.items(), key=lambda entry: entry[1], reverse=True)),
+        "top_sites": top_sites,
+    }
+
+
+def memory_components(gallery, dlib_models):
+    return {
+        "embedding_matrix": gallery["embedding_matrix"],
+        "embedding_ids": gallery["embedding_ids"],
+        "faiss_index": gallery["faiss_index"],
+        "dlib_models": sum(size for size in dlib_models.values() if size),
+    }
+
+
+def memory_report(service, top=MEMORY_TOP):
+    """Bytes por componente del proceso servidor y pico de la ultima recarga de galeria."""
+    gallery = service.memory_snapshot()
+    dlib_models = face_models.model_bytes()
+    components = memory_components(gallery, dlib_models)
+    rss = process_rss_bytes()
+    return {
+        "pid": os.getpid(),
+        "rss_bytes": rss,
+        "rss_peak_bytes": process_peak_rss_bytes(),
+        "components": components,
+        # Resto del RSS: heap de Python no atribuido, libpq, buffers de gRPC, librerias cargadas y fragmentacion.
+        "unattributed_rss_bytes": rss - sum(components.values()) if rss is not None else None,
+        # En modo asyncio con executor de procesos los modelos viven en los workers, no en este proceso.
+        "dlib_models": dlib_models,
+        "db_pool": db_pool_snapshot(),
+        "last_reload": gallery["last_reload"],
+        "tracemalloc": traced_memory_report(top),
+    }
+
+
+def memory_metric_families(service):
+    gallery = service.memory_snapshot()
+    components = memory_components(gallery, face_models.model_bytes())
+    reload = gallery["last_reload"]
+    reload_peak = reload.get("traced_peak_bytes", reload.get("estimated_peak_bytes", 0))
+    families = [
+        (
+            "bmpi_memory_component_bytes",
+            "gauge",
+            "Bytes retenidos por componente del servidor",
+            labeled_samples("component", components),
+        ),
+        (
+            "bmpi_gallery_reload_peak_bytes",
+            "gauge",
+            "Pico de memoria de la ultima recarga de galeria (tracemalloc o estimado)",
+            [("", (), reload_peak)],
+        ),
+    ]
+    rss = process_rss_bytes()
+    if rss is not None:
+        families.append(("bmpi_process_resident_bytes", "gauge", "RSS del proceso servidor", [("", (), rss)]))
+    return families
+
+
+TRACE_NORMAL_OUTCOMES = ("ok", "failed", "recognized", "not_recognized")
+
+
+class TraceSink:
+    """Registros JSONL por peticion: las RPC encolan sin bloquear y un hilo de fondo escribe y rota el archivo.
+
+    Con `slow_ms` > 0 solo se escriben las peticiones que superan ese tiempo; `sample_rate` se aplica encima.
+    Las RPC terminadas con un codigo de error gRPC se escriben siempre.
+    """
+
+    def __init__(self, path, sample_rate=1.0, slow_ms=0.0, max_bytes=TRACE_MAX_BYTES, backups=TRACE_BACKUPS,
+                 queue_max=TRACE_QUEUE_MAX):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue = queue.Queue(maxsize=queue_max)
+        self._lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._skipped = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._writer, name="bmpi-trace", daemon=True)
+        self._thread.start()
+
+    def should_record(self, elapsed_ms, outcome):
+        if outcome not in TRACE_NORMAL_OUTCOMES:
+            return True
+        if self.slow_ms > 0 and elapsed_ms < self.slow_ms:
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def offer(self, record):
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+
+    def skip(self):
+        with self._lock:
+            self._skipped += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "path": self.path,
+                "written": self._written,
+                "dropped": self._dropped,
+                "skipped": self._skipped,
+                "queued": self._queue.qsize(),
+            }
+
+    def _writer(self):
+        while True:
+            record = self._queue.get()
+            try:
+                self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+                with self._lock:
+                    self._written += 1
+                if self._queue.empty():
+                    self._file.flush()
+                if self._file.tell() >= self.max_bytes:
+                    self._rotate()
+            except Exception as exc:
+                print(f"[WARN] No se pudo escribir traza en {self.path}: {exc}")
+
+    def _rotate(self):
+        self._file.close()
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+
+def build_trace_sink():
+    if not TRACE_PATH:
+        return None
+    try:
+        sink = TraceSink(TRACE_PATH, TRACE_SAMPLE_RATE, TRACE_SLOW_MS)
+    except OSError as exc:
+        print(f"[WARN] Trazas desactivadas, no se pudo abrir {TRACE_PATH}: {exc}")
+        return None
+    print(
+        "[INFO] Trazas JSONL en %s: sample_rate=%.3f slow_ms=%.0f max_bytes=%d backups=%d"
+        % (TRACE_PATH, TRACE_SAMPLE_RATE, TRACE_SLOW_MS, TRACE_MAX_BYTES, TRACE_BACKUPS)
+    )
+    return sink
+
+
+def build_trace_record(method, request, response, capture, elapsed, outcome):
+    events = capture.events
+    record = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "method": method,
+        "outcome": outcome,
+        "duration_ms": round(elapsed * 1000.0, 2),
+        "stages_ms": {name: round(seconds * 1000.0, 2) for name, seconds in capture.stages.items()},
+    }
+    image = getattr(request, "image", None)
+    if image:
+        record["image_bytes"] = len(image)
+    for key in ("image_size", "profile", "variants_tried", "match_source", "candidates", "search_backend"):
+        if key in events:
+            record[key] = events[key]
+    if "best_distance" in events:
+        record["best_distance"] = round(events["best_distance"], 4)
+    employee_id = getattr(request, "employee_id", "") or getattr(response, "employee_id", "")
+    if employee_id:
+        record["employee_id"] = employee_id
+    return record
+
+
+def trace_rpc(sink, method, request, response, capture, elapsed, outcome):
+    if not sink.should_record(elapsed * 1000.0, outcome):
+        sink.skip()
+        return
+    sink.offer(build_trace_record(method, request, response, capture, elapsed, outcome))
+
+
+class RequestCapture:
+    """Corpus local de peticiones reales para reproducirlas con scripts/replay_captura.py.
+
+    Cada muestra son dos archivos: `<id>.pb` con el request serializado y `<id>.json` con el metodo, la referencia de
+    consentimiento y el resultado observado. El JSON se escribe al final, asi que una muestra sin JSON esta incompleta.
+    Las muestras mas antiguas que la retencion, o que excedan `max_items`, se borran en el hilo de escritura.
+    """
+
+    PURGE_INTERVAL_SECONDS = 600.0
+
+    def __init__(self, directory, consent, sample_rate=CAPTURE_SAMPLE_RATE, methods=CAPTURE_METHODS,
+                 retention_hours=CAPTURE_RETENTION_HOURS, max_items=CAPTURE_MAX_ITEMS, queue_max=TRACE_QUEUE_MAX):
+        self.directory = directory
+        self.consent = consent
+        self.sample_rate = sample_rate
+        self.methods = frozenset(methods)
+        self.retention_seconds = retention_hours * 3600.0
+        self.max_items = max_items
+        self._queue = queue.Queue(maxsize=queue_max)
+        self._lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._purged = 0
+        # Son fotos de rostros: la carpeta debe ser privada del usuario, no una ajena o compartida preexistente.
+        ensure_private_dir(directory)
+        self._items = self.purge()
+        self._last_purge = time.monotonic()
+        self._thread = threading.Thread(target=self._writer, name="bmpi-capture", daemon=True)
+        self._thread.start()
+
+    def offer(self, method, request, response, capture, elapsed, outcome):
+        if method not in self.methods or random.random() >= self.sample_rate:
+            return False
+        meta = {
+            "method": method,
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "consent": self.consent,
+            "outcome": outcome,
+            "duration_ms": round(elapsed * 1000.0, 2),
+            "employee_id": getattr(response, "employee_id", "") if response is not None else "",
+            "match_source": capture.events.get("match_source"),
+        }
+        try:
+            self._queue.put_nowait((meta, request.SerializeToString()))
+            return True
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "items": self._items,
+                "written": self._written,
+                "dropped": self._dropped,
+                "purged": self._purged,
+            }
+
+    def purge(self):
+        """Borra las muestras vencidas y las mas antiguas por encima de `max_items`; devuelve las que quedan."""
+        cutoff = time.time() - self.retention_seconds
+        items = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                items.append((os.path.getmtime(path), name[: -len(".json")]))
+            except OSError:
+                continue
+        items.sort()
+        expired = [item_id for mtime, item_id in items if mtime < cutoff]
+        kept = [item_id for mtime, item_id in items if mtime >= cutoff]
+        if len(kept) > self.max_items:
+            expired.extend(kept[: len(kept) - self.max_items])
+            kept = kept[len(kept) - self.max_items:]
+        for item_id in expired:
+            for suffix in (".json", ".pb"):
+                try:
+                    os.remove(os.path.join(self.directory, item_id + suffix))
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._purged += len(expired)
+        return len(kept)
+
+    def _write_private(self, path, data):
+        # Los ids de muestra son unicos: O_EXCL nunca choca con una muestra propia, solo con algo plantado.
+        with create_private_file(path, "wb") as handle:
+            handle.write(data)
+
+    def _writer(self):
+        while True:
+            try:
+                meta, payload = self._queue.get(timeout=self.PURGE_INTERVAL_SECONDS)
+            except queue.Empty:
+                meta = None
+            try:
+                if meta is not None:
+                    item_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:12]}"
+                    meta["id"] = item_id
+                    self._write_private(os.path.join(self.directory, item_id + ".pb"), payload)
+                    self._write_private(
+                        os.path.join(self.directory, item_id + ".json"), json.dumps(meta).encode("utf-8")
+                    )
+                    with self._lock:
+                        self._written += 1
+                        self._items += 1
+                overdue = time.monotonic() - self._last_purge >= self.PURGE_INTERVAL_SECONDS
+                if overdue or self._items > self.max_items:
+                    remaining = self.purge()
+                    with self._lock:
+                        self._items = remaining
+                    self._last_purge = time.monotonic()
+            except Exception as exc:
+                print(f"[WARN] No se pudo guardar la captura en {self.directory}: {exc}")
+
+
+def build_request_capture():
+    if not CAPTURE_DIR:
+        return None
+    if not CAPTURE_CONSENT:
+        print("[WARN] BMPI_CAPTURE_DIR configurado sin BMPI_CAPTURE_CONSENT: la captura de peticiones queda desactivada")
+        return None
+    try:
+        capture = RequestCapture(CAPTURE_DIR, CAPTURE_CONSENT)
+    except OSError as exc:
+        print(f"[WARN] Captura desactivada, no se pudo preparar {CAPTURE_DIR}: {exc}")
+        return None
+    print(
+        "[INFO] Captura de peticiones en %s: metodos=%s sample_rate=%.3f retencion=%.0fh max=%d consentimiento=%s"
+        % (CAPTURE_DIR, ",".join(CAPTURE_METHODS), CAPTURE_SAMPLE_RATE, CAPTURE_RETENTION_HOURS, CAPTURE_MAX_ITEMS,
+           CAPTURE_CONSENT)
+    )
+    return capture
+
+
+class AdmissionGate:
+    """Cola acotada por tipo de RPC: cuenta peticiones esperando o ejecutando trabajo de CPU."""
+
+    def __init__(self, name, max_pending):
+        self.name = name
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._admitted = 0
+        self._shed_queue_full = 0
+        self._shed_deadline = 0
+        self._last_log_ts = 0.0
+
+    def try_acquire(self):
+        with self._lock:
+            if self.max_pending > 0 and self._pending >= self.max_pending:
+                self._shed_queue_full += 1
+                self._maybe_log_locked("cola llena")
+                return False
+            self._pending += 1
+            self._admitted += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def record_deadline_shed(self):
+        with self._lock:
+            self._shed_deadline += 1
+            self._maybe_log_locked("deadline vencido")
+
+    def _maybe_log_locked(self, reason):
+        now = time.time()
+        if now - self._last_log_ts < ADMISSION_LOG_INTERVAL_SECONDS:
+            return
+        self._last_log_ts = now
+        print(
+            "[WARN] %s descartando peticiones (%s): pending=%d/%d shed_queue_full=%d shed_deadline=%d"
+            % (self.name, reason, self._pending, self.max_pending, self._shed_queue_full, self._shed_deadline)
+        )
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "admitted": self._admitted,
+                "shed_queue_full": self._shed_queue_full,
+                "shed_deadline": self._shed_deadline,
+            }
+
+
+class _InFlight:
+    __slots__ = ("done", "ok", "value")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+        self.value = None
+
+
+def result_cache_kind(key):
+    # El primer elemento de la clave separa espacios: encodings ("recognize", "register"), respuestas ("result")...
+    return key[0] if isinstance(key, tuple) and key else "default"
+
+
+class ResultCache:
+    """LRU acotado por hash de contenido con single-flight: peticiones identicas concurrentes comparten un calculo.
+
+    Los aciertos se cuentan por espacio de claves (`result_cache_kind`): mezclar encodings y respuestas en un
+    solo hit_ratio esconde cual de las dos capas esta funcionando.
+    """
+
+    def __init__(self, name, max_entries):
+        self.name = name
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._stats = {}
+        self._last_log_ts = time.time()
+
+    def _count_locked(self, key, result):
+        kind = result_cache_kind(key)
+        stats = self._stats.get(kind)
+        if stats is None:
+            stats = self._stats[kind] = {"hits": 0, "misses": 0, "coalesced": 0}
+        stats[result] += 1
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._count_locked(key, "hits")
+                self._maybe_log_locked()
+                return self._entries[key]
+            self._count_locked(key, "misses")
+            self._maybe_log_locked()
+            return None
+
+    def peek(self, key):
+        """(encontrado, valor) sin contar la consulta: quien llama la registra con `record()` al saber el desenlace."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return True, self._entries[key]
+            return False, None
+
+    def record(self, key, result):
+        with self._lock:
+            self._count_locked(key, result)
+            self._maybe_log_locked()
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._put_locked(key, value)
+
+    def _put_locked(self, key, value):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """`compute()` devuelve (valor, cacheable); si el lider falla, los que esperaban reintentan."""
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self._count_locked(key, "hits")
+                    self._maybe_log_locked()
+                    return self._entries[key]
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _InFlight()
+                    self._inflight[key] = flight
+                else:
+                    self._count_locked(key, "coalesced")
+
+            if not leader:
+                flight.done.wait()
+                if flight.ok:
+                    return flight.value
+                continue
+
+            try:
+                value, cacheable = compute()
+            except BaseException:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                flight.done.set()
+                raise
+
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._count_locked(key, "misses")
+                if cacheable:
+                    self._put_locked(key, value)
+                self._maybe_log_locked()
+            flight.value = value
+            flight.ok = True
+            flight.done.set()
+            return value
+
+    def _maybe_log_locked(self):
+        now = time.time()
+        if now - self._last_log_ts < RESULT_CACHE_LOG_INTERVAL_SECONDS:
+            return
+        self._last_log_ts = now
+        print("[INFO] cache %s: %s" % (self.name, self._snapshot_locked()))
+
+    def _snapshot_locked(self):
+        kinds = {}
+        for kind, stats in sorted(self._stats.items()):
+            lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+            kinds[kind] = dict(
+                stats,
+                hit_ratio=round(float(stats["hits"] + stats["coalesced"]) / lookups, 4) if lookups else 0.0,
+            )
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "kinds": kinds}
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot_locked()
+
+
+def image_content_key(kind, image_bytes, *params):
+    return (kind, hashlib.sha256(image_bytes).hexdigest()) + tuple(params)
+
+
+def recognize_encoding_key(request):
+    face_box = None
+    if request.HasField("face_box"):
+        face_box = (request.face_box.top, request.face_box.right, request.face_box.bottom, request.face_box.left)
+    return image_content_key("recognize", request.image, int(request.profile), face_box, bool(request.multi_face))
+
+
+def register_idempotency_key(request):
+    # Sin clave no se deduplica en memoria: un resultado recordado sobreviviria a una baja hecha por el backend.
+    # Los reintentos sin clave los absorbe _store_registration comparando con la ultima foto guardada.
+    if request.idempotency_key:
+        return ("key", request.employee_id, request.idempotency_key)
+    return None
+
+
+class _SchedClass:
+    __slots__ = (
+        "name",
+        "weight",
+        "cap",
+        "cap_limit",
+        "dedicated",
+        "running",
+        "waiters",
+        "pass_value",
+        "last_grant_ts",
+        "granted",
+        "wait_ms_total",
+        "wait_ms_max",
+        "buckets",
+    )
+
+    def __init__(self, name, weight, cap_limit, dedicated=False):
+        self.name = name
+        self.weight = weight
+        # cap_limit es el tope configurado (None = todos los slots); cap, el valor efectivo.
+        self.cap_limit = cap_limit
+        self.cap = 1
+        # Una clase dedicada tiene `cap` slots propios, fuera de los compartidos: nunca ocupa uno de RecognizeFace.
+        self.dedicated = dedicated
+        self.running = 0
+        self.waiters = deque()
+        self.pass_value = 0.0
+        self.last_grant_ts = 0.0
+        self.granted = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.buckets = [0] * (len(SCHED_WAIT_BUCKETS_MS) + 1)
+
+
+class _SchedTicket:
+    __slots__ = ("enqueued_ts", "granted", "waker")
+
+    def __init__(self, waker=None):
+        self.enqueued_ts = time.time()
+        self.granted = False
+        # Para esperas en el event loop: se llama (con el lock tomado) al conceder el slot.
+        self.waker = waker
+
+
+def _resolve_grant(future):
+    if not future.done():
+        future.set_result(True)
+
+
+def _grant_waker(loop, future):
+    def wake():
+        try:
+            loop.call_soon_threadsafe(_resolve_grant, future)
+        except RuntimeError:
+            # Event loop ya cerrado (apagado): nadie espera ese slot.
+            pass
+
+    return wake
+
+
+class CpuScheduler:
+    """Reparte los slots de deteccion/codificacion entre clases de RPC.
+
+    Clases ponderadas (stride scheduling) con tope de concurrencia por clase; una clase con peticiones
+    esperando que no recibe un slot en `starvation_ms` pasa por delante de los pesos. Las clases de `dedicated`
+    no compiten por los `total_slots`: solo las limita su tope (una codificacion de dlib no se puede interrumpir,
+    asi que un alta masiva en un slot compartido dejaria a los reconocimientos esperando detras).
+    """
+
+    def __init__(self, total_slots, weights, caps, starvation_ms, dedicated=()):
+        self.total_slots = max(1, int(total_slots))
+        self.starvation_ms = starvation_ms
+        self._cond = threading.Condition()
+        self._running = 0
+        self._virtual_time = 0.0
+        self._classes = {}
+        for name, weight in weights.items():
+            cap_limit = caps.get(name)
+            self._classes[name] = _SchedClass(
+                name,
+                max(1, int(weight)),
+                max(1, int(cap_limit)) if cap_limit is not None else None,
+                name in dedicated,
+            )
+        self._resolve_caps_locked()
+
+    def _resolve_caps_locked(self):
+        for cls in self._classes.values():
+            cls.cap = cls.cap_limit if cls.cap_limit is not None else self.total_slots
+
+    def set_total_slots(self, total_slots):
+        with self._cond:
+            self.total_slots = max(1, int(total_slots))
+            self._resolve_caps_locked()
+            self._dispatch_locked()
+
+    def check_caps(self):
+        """Avisos de coherencia entre topes por clase y slots; lista vacia si todo cuadra."""
+        warnings = []
+        with self._cond:
+            for cls in self._classes.values():
+                if cls.cap_limit is None and cls.cap != self.total_slots:
+                    warnings.append(f"clase {cls.name}: tope {cls.cap} no sigue a los {self.total_slots} slots")
+                elif not cls.dedicated and cls.cap_limit is not None and cls.cap_limit > self.total_slots:
+                    warnings.append(
+                        f"clase {cls.name}: tope configurado {cls.cap_limit} supera los {self.total_slots} slots"
+                    )
+        return warnings
+
+    @contextmanager
+    def slot(self, name, check_deadline=None):
+        with stage("cpu_wait"):
+            self.acquire(name, check_deadline)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    @asynccontextmanager
+    async def async_slot(self, name, check_deadline=None):
+        with stage("cpu_wait"):
+            await self.acquire_async(name, check_deadline)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    def _enqueue_locked(self, cls, ticket):
+        if not cls.waiters and cls.running == 0:
+            # Una clase que vuelve de estar inactiva no acumula credito del tiempo en que no pidio CPU.
+            cls.pass_value = max(cls.pass_value, self._virtual_time)
+        cls.waiters.append(ticket)
+        self._dispatch_locked()
+
+    def _record_wait_locked(self, cls, ticket):
+        wait_ms = (time.time() - ticket.enqueued_ts) * 1000.0
+        cls.wait_ms_total += wait_ms
+        cls.wait_ms_max = max(cls.wait_ms_max, wait_ms)
+        cls.buckets[bisect.bisect_left(SCHED_WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def acquire(self, name, check_deadline=None):
+        cls = self._classes[name]
+        ticket = _SchedTicket()
+        with self._cond:
+            self._enqueue_locked(cls, ticket)
+            while not ticket.granted:
+                self._cond.wait(timeout=0.05 if check_deadline is not None else None)
+                if ticket.granted or check_deadline is None:
+                    continue
+                try:
+                    check_deadline()
+                except BaseException:
+                    cls.waiters.remove(ticket)
+                    self._dispatch_locked()
+                    raise
+            self._record_wait_locked(cls, ticket)
+
+    async def acquire_async(self, name, check_deadline=None):
+        """Como `acquire()` pero la espera es un Future del event loop: no ocupa ningun hilo mientras hace cola."""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+        cls = self._classes[name]
+        ticket = _SchedTicket(_grant_waker(loop, granted))
+        with self._cond:
+            self._enqueue_locked(cls, ticket)
+        try:
+            while not granted.done():
+                await asyncio.wait({granted}, timeout=0.05 if check_deadline is not None else None)
+                if not granted.done() and check_deadline is not None:
+                    check_deadline()
+        except BaseException:
+            with self._cond:
+                if ticket.granted:
+                    # Concedido mientras venciamos el plazo o nos cancelaban: se devuelve el slot.
+                    self._release_locked(cls)
+                else:
+                    cls.waiters.remove(ticket)
+                self._dispatch_locked()
+            raise
+        with self._cond:
+            self._record_wait_locked(cls, ticket)
+
+    def release(self, name):
+        cls = self._classes[name]
+        with self._cond:
+            self._release_locked(cls)
+            self._dispatch_locked()
+
+    def _release_locked(self, cls):
+        cls.running = max(0, cls.running - 1)
+        if not cls.dedicated:
+            self._running = max(0, self._running - 1)
+
+    def _pick_locked(self):
+        shared_free = self._running < self.total_slots
+        eligible = [
+            cls
+            for cls in self._classes.values()
+            if cls.waiters and cls.running < cls.cap and (cls.dedicated or shared_free)
+        ]
+        if not eligible:
+            return None
+        now = time.time()
+        if self.starvation_ms > 0:
+            starving = [
+                cls
+                for cls in eligible
+                if (now - max(cls.last_grant_ts, cls.waiters[0].enqueued_ts)) * 1000.0 >= self.starvation_ms
+            ]
+            if starving:
+                return min(starving, key=lambda cls: max(cls.last_grant_ts, cls.waiters[0].enqueued_ts))
+        return min(eligible, key=lambda cls: (cls.pass_value, -cls.weight))
+
+    def _dispatch_locked(self):
+        granted_any = False
+        while True:
+            cls = self._pick_locked()
+            if cls is None:
+                break
+            ticket = cls.waiters.popleft()
+            ticket.granted = True
+            if ticket.waker is not None:
+                ticket.waker()
+            cls.running += 1
+            cls.granted += 1
+            cls.last_grant_ts = time.time()
+            granted_any = True
+            if cls.dedicated:
+                continue
+            self._running += 1
+            self._virtual_time = cls.pass_value
+            cls.pass_value += 1.0 / cls.weight
+        if granted_any:
+            self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            classes = {}
+            for cls in self._classes.values():
+                classes[cls.name] = {
+                    "weight": cls.weight,
+                    "cap": cls.cap,
+                    "dedicated": cls.dedicated,
+                    "running": cls.running,
+                    "waiting": len(cls.waiters),
+                    "granted": cls.granted,
+                    "wait_ms_avg": round(cls.wait_ms_total / cls.granted, 2) if cls.granted else 0.0,
+                    "wait_ms_max": round(cls.wait_ms_max, 2),
+                    "wait_ms_buckets": dict(zip([str(b) for b in SCHED_WAIT_BUCKETS_MS] + ["inf"], cls.buckets)),
+                }
+            return {"total_slots": self.total_slots, "running": self._running, "classes": classes}
+
+
+cpu_scheduler = CpuScheduler(
+    FACE_ENCODE_CONCURRENCY, SCHED_WEIGHTS, SCHED_CAPS, SCHED_STARVATION_MS, dedicated=SCHED_DEDICATED_CLASSES
+)
+
+
+def lower_thread_priority(increment):
+    # En Linux setpriority acepta el id nativo del hilo y cambia solo su nice.
+    if increment <= 0 or not hasattr(os, "setpriority"):
+        return
+    try:
+        tid = threading.get_native_id()
+        current = os.getpriority(os.PRIO_PROCESS, tid)
+        os.setpriority(os.PRIO_PROCESS, tid, min(19, current + increment))
+    except OSError as exc:
+        print(f"[WARN] No se pudo bajar la prioridad del hilo de altas: {exc}")
+
+
+class EnrollmentJobRecord:
+    __slots__ = ("job_id", "key", "seq", "request", "state", "message", "submitted_ts", "finished_ts")
+
+    def __init__(self, job_id, key, seq, request):
+        self.job_id = job_id
+        self.key = key
+        self.seq = seq
+        self.request = request
+        self.state = pb2.ENROLLMENT_STATE_QUEUED
+        self.message = ""
+        self.submitted_ts = time.time()
+        self.finished_ts = None
+
+
+class EnrollmentQueue:
+    """Altas en segundo plano: FIFO acotada, workers propios con menor prioridad que RecognizeFace."""
+
+    def __init__(self, service, workers, max_queued, retention):
+        self._service = service
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self._seq = 0
+        self._dequeued = 0
+        self._threads = []
+        self._register = None
+
+    def use_runner(self, register):
+        """`register(request)` reemplaza el alta sincrona; en asyncio la hace el servicer con su executor de CPU."""
+        self._register = register
+
+    def _run_job(self, request):
+        if self._register is not None:
+            return self._register(request)
+        return self._service._register_idempotent(
+            request,
+            lambda: self._service._register_uncached(request, lambda: None, "enrollment"),
+        )
+
+    def submit(self, request):
+        """Devuelve el job (nuevo o el existente para la misma clave), o None si la cola esta llena."""
+        key = register_idempotency_key(request)
+        with self._lock:
+            existing = self._jobs.get(self._by_key.get(key)) if key is not None else None
+            if existing is not None and existing.state != pb2.ENROLLMENT_STATE_FAILED:
+                return self._to_message_locked(existing)
+            if self._seq - self._dequeued >= self.max_queued:
+                return None
+
+            self._seq += 1
+            job = EnrollmentJobRecord(uuid.uuid4().hex, key, self._seq, request)
+            self._jobs[job.job_id] = job
+            if key is not None:
+                self._by_key[key] = job.job_id
+            self._evict_finished_locked()
+            self._ensure_workers_locked()
+            message = self._to_message_locked(job)
+        self._queue.put(job.job_id)
+        return message
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._to_message_locked(job) if job is not None else None
+
+    def snapshot(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                name = pb2.EnrollmentState.Name(job.state)
+                counts[name] = counts.get(name, 0) + 1
+            return {
+                "workers": self.workers,
+                "queued": self._seq - self._dequeued,
+                "max_queued": self.max_queued,
+                "jobs": counts,
+            }
+
+    def _to_message_locked(self, job):
+        position = 0
+        if job.state == pb2.ENROLLMENT_STATE_QUEUED:
+            position = max(1, job.seq - self._dequeued)
+        return pb2.EnrollmentJob(job_id=job.job_id, state=job.state, message=job.message, queue_position=position)
+
+    def _evict_finished_locked(self):
+        overflow = len(self._jobs) - self.retention
+        if overflow <= 0:
+            return
+        for job_id in list(self._jobs.keys()):
+            if overflow <= 0:
+                break
+            job = self._jobs[job_id]
+            if job.finished_ts is None:
+                continue
+            del self._jobs[job_id]
+            if job.key is not None and self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+            overflow -= 1
+
+    def _ensure_workers_locked(self):
+        if self._threads:
+            return
+        for idx in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"bmpi-enroll-{idx}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _yield_to_recognition(self):
+        # dlib no se puede interrumpir a mitad de una cara: se cede antes de empezar cada alta.
+        gate = self._service._admission["RecognizeFace"]
+        deadline = time.time() + ENROLLMENT_YIELD_MAX_MS / 1000.0
+        while gate.pending() > 0 and time.time() < deadline:
+            time.sleep(0.02)
+
+    def _worker(self):
+        lower_thread_priority(ENROLLMENT_NICE)
+        while True:
+            job_id = self._queue.get()
+            self._yield_to_recognition()
+            with self._lock:
+                self._dequeued += 1
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job.state = pb2.ENROLLMENT_STATE_RUNNING
+                request = job.request
+
+            try:
+                response = self._run_job(request)
+                state = pb2.ENROLLMENT_STATE_SUCCEEDED if response.success else pb2.ENROLLMENT_STATE_FAILED
+                message = response.message
+            except Exception as exc:
+                print(f"Enrollment job {job_id} error: {exc}")
+                traceback.print_exc()
+                state = pb2.ENROLLMENT_STATE_FAILED
+                message = "Error interno al registrar empleado"
+
+            with self._lock:
+                job.state = state
+                job.message = message
+                job.finished_ts = time.time()
+                job.request = None
+
+
+def deadline_checker(context):
+    def check():
+        if context is None:
+            return
+        remaining = context.time_remaining()
+        if remaining is not None and remaining * 1000.0 <= ADMISSION_MIN_REMAINING_MS:
+            raise RequestDeadlineExceeded()
+
+    return check
+
+
+def reject_overloaded(context, response):
+    context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+    context.set_details("Servidor saturado, reintentar mas tarde")
+    # grpc-retry-pushback-ms es la clave estandar que respetan las politicas de reintento de gRPC.
+    context.set_trailing_metadata((("grpc-retry-pushback-ms", str(ADMISSION_RETRY_AFTER_MS)),))
+    return response
+
+
+def resolve_recognition_profile(context, gate, requested=0):
+    remaining = context.time_remaining() if context is not None else None
+    profile = select_recognition_profile(remaining, gate.pending(), requested)
+    note_event("profile", profile.name)
+    if context is not None:
+        context.set_trailing_metadata((("bmpi-recognition-profile", profile.name),))
+    return profile
+
+
+def reject_invalid_input(context, response, exc):
+    context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+    context.set_details(str(exc))
+    return response
+
+
+def reject_expired(context, response):
+    context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
+    context.set_details("Deadline vencido antes de completar el procesamiento")
+    return response
+
+
+def build_warmup_image(size=256):
+    # Imagen sintetica determinista (degradado + ovalo con ojos y boca): no hace falta un rostro real,
+    # solo recorrer cada detector y el encoder con un tamano tipico.
+    ramp = np.linspace(60, 200, size, dtype=np.uint8)
+    image = np.dstack([np.tile(ramp, (size, 1))] * 3).copy()
+    center = (size // 2, size // 2)
+    cv2.ellipse(image, center, (size // 4, size // 3), 0, 0, 360, (150, 170, 200), -1)
+    for dx in (-size // 10, size // 10):
+        cv2.circle(image, (center[0] + dx, center[1] - size // 12), size // 28, (40, 40, 40), -1)
+    cv2.ellipse(image, (center[0], center[1] + size // 8), (size // 10, size // 28), 0, 0, 180, (60, 50, 120), -1)
+    return image
+
+
+def run_warmup_pipeline():
+    """Recorre decodificacion, detectores, variantes y encoder habilitados; devuelve (tiempos_ms, encoding)."""
+    timings = {}
+
+    def timed(stage, func):
+        started = time.perf_counter()
+        result = func()
+        timings[stage] = round((time.perf_counter() - started) * 1000.0, 1)
+        return result
+
+    profiles = (PROFILE_FULL, PROFILE_FAST, PROFILE_ACCURATE)
+    jpeg_bytes = encode_bgr_to_jpeg_bytes(build_warmup_image())
+    frame = timed("decode", lambda: decode_request_image_bgr_auto_oriented(jpeg_bytes))
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    models = {profile.model for profile in profiles} | {p.model_fallback for p in profiles if p.model_fallback}
+    for model in sorted(models):
+        timed(f"detect_{model}", lambda: face_models.face_locations(rgb_frame, number_of_times_to_upsample=0, model=model))
+    if any(profile.haar_fallback for profile in profiles):
+        timed("detect_haar", lambda: detect_face_locations_haar(rgb_frame))
+    if any(profile.contrast_fallback for profile in profiles):
+        timed("clahe", lambda: enhance_contrast_clahe(rgb_frame))
+    if any(profile.rotation_fallback for profile in profiles):
+        timed("rotate", lambda: rotate_rgb_image(rgb_frame, FACE_ROTATION_ANGLES[0]))
+
+    height, width = rgb_frame.shape[:2]
+    location = (height // 8, width * 7 // 8, height * 7 // 8, width // 8)
+    encodings = timed(
+        "encode",
+        lambda: face_models.face_encodings(rgb_frame, [location], num_jitters=1, model=FACE_ENCODING_MODEL),
+    )
+    return timings, (encodings[0] if encodings else None)
+
+
+def encode_register_image(image_bytes, num_jitters):
+    frame = decode_request_image_bgr_auto_oriented(image_bytes)
+    if frame is None:
+        return None, None, False
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    encoding = extract_primary_face_encoding(rgb_frame, num_jitters=num_jitters)
+    return encoding, encode_bgr_to_jpeg_bytes(frame), True
+
+
+def encode_recognize_request(image_bytes, profile, face_box=None, multi_face=False):
+    frame = decode_request_image_bgr_auto_oriented(image_bytes)
+    if frame is None:
+        return None, []
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    if face_box is not None:
+        return None, extract_face_box_encodings(rgb_frame, face_box, num_jitters=profile.num_jitters)
+    if multi_face:
+        return extract_frame_face_encodings(rgb_frame, num_jitters=profile.num_jitters, profile=profile)
+    return None, extract_candidate_encodings(
+        rgb_frame,
+        num_jitters=profile.num_jitters,
+        max_candidates=profile.max_candidates,
+        profile=profile,
+    )
+
+
+# Los servicers no heredan de pb2_grpc.FaceRecognitionServiceServicer: resolver la base al definir la clase
+# importaria grpc y protobuf tambien en el CLI. Implementan todos los RPC del contrato.
+class FaceService:
+    def __init__(self):
+        load_server_dependencies()
+        self.trace_sink = build_trace_sink()
+        self.request_capture = build_request_capture()
+        self.known_ids = []
+        self.known_embeddings = np.array([])
+        self._cache_lock = threading.RLock()
+        self._gallery_version = 0
+        self._last_refresh_ts = 0.0
+        self._result_cache = ResultCache("recognition", RESULT_CACHE_MAX_ENTRIES)
+        self._register_results = ResultCache("register", REGISTER_IDEMPOTENCY_MAX_ENTRIES)
+        self._enrollments = EnrollmentQueue(self, ENROLLMENT_WORKERS, ENROLLMENT_QUEUE_MAX, ENROLLMENT_JOB_RETENTION)
+        self._faiss_enabled = USE_FAISS and FAISS_AVAILABLE
+        self._faiss_index_type = FAISS_INDEX_TYPE or "flat"
+        self._faiss_index = None
+        self._faiss_ids = []
+        self._gallery_ids_bytes = 0
+        self._last_reload_memory = {}
+        # (matriz de solo lectura, tupla de ids, version), republicada en cada reconstruccion: las lecturas toman
+        # la referencia sin lock ni copia, asi que el event loop nunca espera a una recarga ni copia la galeria.
+        self._gallery_view = (self.known_embeddings, (), 0)
+        self._admission = {
+            "RecognizeFace": AdmissionGate("RecognizeFace", ADMISSION_MAX_PENDING_RECOGNIZE),
+            "RegisterEmployee": AdmissionGate("RegisterEmployee", ADMISSION_MAX_PENDING_REGISTER),
+        }
+        if USE_FAISS and not FAISS_AVAILABLE:
+            print(f"[WARN] FAISS no disponible, se usara busqueda lineal: {FAISS_IMPORT_ERROR}")
+        if self._faiss_enabled:
+            print(
+                "[INFO] FAISS habilitado: index=%s topk=%d fallback_ratio=%.2f"
+                % (self._faiss_index_type, FAISS_TOPK, FAISS_FALLBACK_RATIO)
+            )
+        self.load_embeddings()
+
+    def load_embeddings(self):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # El pico incluye lo que asignen en paralelo otras peticiones; con poco trafico es el de la recarga.
+            traced_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        rss_before = process_rss_bytes()
+        started = time.perf_counter()
+        pool_conn = get_connection_pool()
+        with stage("db_gallery_load"):
+            conn = pool_conn.getconn()
+            try:
+                cur = conn.cursor()
+                try:
+                    cur.execute("SELECT employee_id, embedding FROM employees")
+                    data = cur.fetchall()
+                finally:
+                    cur.close()
+            finally:
+                pool_conn.putconn(conn)
+
+        ids = []
+        embeddings = []
+        payload_bytes = 0
+
+        for emp_id, embed in data:
+            payload_bytes += len(embed or b"")
+            prototype_vectors = decode_embedding_payload(embed)
+            for vector in prototype_vectors:
+                ids.append(emp_id)
+                embeddings.append(vector)
+
+        with self._cache_lock:
+            previous_bytes = int(self.known_embeddings.nbytes)
+            if embeddings:
+                self.known_embeddings = np.array(embeddings)
+                self.known_ids = ids
+            else:
+                self.known_embeddings = np.array([])
+                self.known_ids = []
+            self._rebuild_faiss_index()
+            self._gallery_version += 1
+            self._last_refresh_ts = time.time()
+            self._publish_gallery_locked()
+            matrix_bytes = int(self.known_embeddings.nbytes)
+            faiss_bytes = faiss_index_bytes(self._faiss_index)
+            faiss_copy_bytes = int(self.known_embeddings.size) * 4 if self._faiss_index is not None else 0
+            # Un str por fila: los prototipos de un empleado comparten el mismo objeto.
+            self._gallery_ids_bytes = sys.getsizeof(self.known_ids) + sum(sys.getsizeof(emp_id) for emp_id, _ in data)
+
+        # Maximo teorico en el momento del swap: filas crudas + vectores decodificados + matriz nueva y anterior
+        # + copia float32 e indice de FAISS.
+        decoded_bytes = sum(int(vector.nbytes) for vector in embeddings)
+        rows = len(data)
+        # Filas crudas y vectores sueltos ya no hacen falta: fuera antes de medir lo que queda retenido.
+        del data, embeddings
+        reload = {
+            "ts": self._last_refresh_ts,
+            "seconds": round(time.perf_counter() - started, 3),
+            "rows": rows,
+            "embeddings": len(ids),
+            "payload_bytes": payload_bytes,
+            "estimated_peak_bytes": payload_bytes + decoded_bytes + matrix_bytes + previous_bytes
+            + faiss_copy_bytes + faiss_bytes,
+            "rss_before_bytes": rss_before,
+            "rss_after_bytes": process_rss_bytes(),
+        }
+        if tracing:
+            traced_after, traced_peak = tracemalloc.get_traced_memory()
+            reload["traced_peak_bytes"] = max(0, traced_peak - traced_before)
+            reload["traced_retained_bytes"] = traced_after - traced_before
+        self._last_reload_memory = reload
+
+        print(f"Loaded {len(self.known_ids)} embeddings into memory.")
+
+    def _maybe_refresh_embeddings(self):
+        now = time.time()
+        if REFRESH_SECONDS <= 0:
+            return
+        if now - self._last_refresh_ts >= REFRESH_SECONDS:
+            self.load_embeddings()
+
+    def _publish_gallery_locked(self):
+        # La matriz se reemplaza entera en cada cambio y nunca se modifica en sitio: basta marcarla de solo lectura.
+        self.known_embeddings.setflags(write=False)
+        self._gallery_view = (self.known_embeddings, tuple(self.known_ids), self._gallery_version)
+
+    def gallery_view(self):
+        """(embeddings, ids, version) coherentes entre si; O(1), sin lock."""
+        view = self._gallery_view
+        if view[0] is not self.known_embeddings:
+            # Alguien asigno la galeria directamente (microbench, escalado_galeria): se publica ahora.
+            with self._cache_lock:
+                self._publish_gallery_locked()
+                view = self._gallery_view
+        return view
+
+    def _cache_snapshot(self):
+        embeddings, ids, _ = self.gallery_view()
+        return embeddings, ids
+
+    def gallery_version(self):
+        return self.gallery_view()[2]
+
+    def memory_snapshot(self):
+        with self._cache_lock:
+            return {
+                "embedding_matrix": int(self.known_embeddings.nbytes),
+                "embedding_ids": self._gallery_ids_bytes,
+                "faiss_index": faiss_index_bytes(self._faiss_index),
+                "last_reload": dict(self._last_reload_memory),
+            }
+
+    def _rebuild_faiss_index(self):
+        if not self._faiss_enabled:
+            self._faiss_index = None
+            self._faiss_ids = []
+            return
+        if len(self.known_embeddings) == 0:
+            self._faiss_index = None
+            self._faiss_ids = []
+            return
+        vectors = np.array(self.known_embeddings, dtype=np.float32)
+        if vectors.ndim != 2:
+            self._faiss_index = None
+            self._faiss_ids = []
+            return
+        dims = vectors.shape[1]
+        if self._faiss_index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dims, FAISS_HNSW_M)
+            index.hnsw.efSearch = FAISS_HNSW_EF_SEARCH
+            index.hnsw.efConstruction = FAISS_HNSW_EF_CONSTRUCTION
+        else:
+            index = faiss.IndexFlatL2(dims)
+        index.add(vectors)
+        self._faiss_index = index
+        self._faiss_ids = list(self.known_ids)
+
+    def _faiss_search_candidates(self, vector, k):
+        return self._faiss_search_candidates_batch([vector], k)[0]
+
+    def _faiss_search_candidates_batch(self, vectors, k):
+        if not self._faiss_enabled or self._faiss_index is None or len(self._faiss_ids) == 0:
+            return [[] for _ in vectors]
+        mat = np.array(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        distances, indices = self._faiss_index.search(mat, k)
+        results = []
+        for row_indices, row_distances in zip(indices.tolist(), distances.tolist()):
+            pairs = []
+            for idx, dist in zip(row_indices, row_distances):
+                if idx is None:
+                    continue
+                idx = int(idx)
+                if idx < 0 or idx >= len(self._faiss_ids):
+                    continue
+                # FAISS IndexFlatL2 returns squared L2 distance.
+                pairs.append((idx, float(np.sqrt(dist))))
+            results.append(pairs)
+        return results
+
+    def _upsert_cache_entry(self, employee_id, embeddings):
+        vectors = []
+        for emb in embeddings:
+            vec = np.array(emb, dtype=np.float64)
+            if vec.ndim == 1 and vec.size > 0:
+                vectors.append(vec)
+
+        if not vectors:
+            return
+
+        with self._cache_lock:
+            keep_ids = []
+            keep_embeddings = []
+            for idx, known_id in enumerate(self.known_ids):
+                if known_id != employee_id:
+                    keep_ids.append(known_id)
+                    keep_embeddings.append(self.known_embeddings[idx])
 
-            best_distance = None
-            best_employee_id = None
-            for unknown in encodings:
-                local_distance = None
-                local_employee_id = None
-                if self._faiss_enabled:
-                    candidates = self._faiss_search_candidates(unknown, FAISS_TOPK)
-                    if candidates:
-                        # Exact check on FAISS top-k to keep precision high.
-                        best_idx = None
-                        best_local = None
-                        for idx, _ in candidates:
-                            dist = float(np.linalg.norm(known_embeddings[idx] - unknown))
-                            if best_local is None or dist < best_local:
-                                best_local = dist
-                                best_idx = idx
-                        if best_idx is not None and best_local is not None:
-                            local_distance = best_local
-                            local_employee_id = str(known_ids[best_idx])
-                            # If close to threshold, fall back to full scan to avoid misses.
-                            if local_distance >= THRESHOLD * FAISS_FALLBACK_RATIO:
-                                distances = face_recognition.face_distance(known_embeddings, unknown)
-                                local_index = int(np.argmin(distances))
-                                local_distance = float(distances[local_index])
-                                local_employee_id = str(known_ids[local_index])
+            for vector in vectors:
+                keep_ids.append(employee_id)
+                keep_embeddings.append(vector)
+
+            if keep_embeddings:
+                self.known_embeddings = np.array(keep_embeddings, dtype=np.float64)
+                self.known_ids = keep_ids
+            else:
+                self.known_embeddings = np.array([])
+                self.known_ids = []
+
+            self._rebuild_faiss_index()
+            self._gallery_version += 1
+            self._last_refresh_ts = time.time()
+            self._publish_gallery_locked()
+
+    def _store_registration(self, employee_id, name, encoding, photo_bytes):
+        new_embedding = np.array(encoding, dtype=np.float64)
+
+        pool_conn = get_connection_pool()
+        conn = pool_conn.getconn()
+        cache_embeddings = [new_embedding]
+        try:
+            cur = conn.cursor()
+            try:
+                cur.execute(
+                    "SELECT embedding, samples_count, photo FROM employees WHERE employee_id = %s",
+                    (employee_id,),
+                )
+                existing = cur.fetchone()
+
+                if existing and existing[2] is not None and bytes(existing[2]) == photo_bytes:
+                    # Misma foto normalizada que la ultima registrada: reintento, no una muestra nueva.
+                    samples_count = int(existing[1] or 1)
+                    cache_embeddings = None
+                    message = f"Employee already registered with this photo ({samples_count} samples)"
+                elif existing:
+                    old_prototypes = decode_embedding_payload(existing[0])
+                    samples_count = int(existing[1] or 1)
+                    merged = old_prototypes + [new_embedding]
+                    selected = select_prototypes(merged, MAX_PROTOTYPES_PER_EMPLOYEE)
+                    payload = build_embedding_payload(selected)
+                    cache_embeddings = selected
+
+                    cur.execute(
+                        """
+                        UPDATE employees
+                        SET name = %s,
+                            embedding = %s,
+                            photo = %s,
+                            samples_count = %s
+                        WHERE employee_id = %s
+                        """,
+                        (
+                            name,
+                            pickle.dumps(payload),
+                            photo_bytes,
+                            samples_count + 1,
+                            employee_id,
+                        ),
+                    )
+                    message = f"Employee embedding updated ({samples_count + 1} samples, {len(selected)} prototipos)"
                 else:
-                    distances = face_recognition.face_distance(known_embeddings, unknown)
-                    local_index = int(np.argmin(distances))
-                    local_distance = float(distances[local_index])
-                    local_employee_id = str(known_ids[local_index])
-                if local_distance is None or local_employee_id is None:
-                    continue
-                if best_distance is None or local_distance < best_distance:
-                    best_distance = local_distance
-                    best_employee_id = local_employee_id
-
-            if best_distance is not None and best_distance < THRESHOLD and best_employee_id:
-                employee_id = best_employee_id
-                confidence = max(0, 1 - (best_distance / THRESHOLD))
-                return pb2.RecognizeFaceResponse(
-                    recognized=True,
-                    employee_id=employee_id,
-                    confidence=float(confidence),
+                    payload = build_embedding_payload([new_embedding])
+                    cur.execute(
+                        "INSERT INTO employees (name, employee_id, embedding, photo, samples_count) VALUES (%s,%s,%s,%s,%s)",
+                        (name, employee_id, pickle.dumps(payload), photo_bytes, 1),
+                    )
+                    message = "Employee registered"
+
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+        finally:
+            pool_conn.putconn(conn)
+
+        if cache_embeddings is not None:
+            self._upsert_cache_entry(employee_id, cache_embeddings)
+        return message
+
+    def _register_idempotent(self, request, register):
+        """Ejecuta `register()` una vez por (empleado, idempotency_key); los reintentos reciben el resultado original."""
+        key = register_idempotency_key(request)
+        if key is None:
+            return register()
+
+        def compute():
+            response = register()
+            return (response.success, response.message), response.success
+
+        success, message = self._register_results.get_or_compute(key, compute)
+        return pb2.RegisterEmployeeResponse(success=success, message=message)
+
+    def _register_uncached(self, request, check_deadline, priority="register"):
+        encoding, photo_bytes, decoded = self._result_cache.get_or_compute(
+            image_content_key("register", request.image, FACE_ENCODING_JITTERS_REGISTER),
+            lambda: self._compute_register_encoding(request.image, check_deadline, priority),
+        )
+
+        if not decoded:
+            return pb2.RegisterEmployeeResponse(success=False, message="Invalid image")
+
+        if encoding is None:
+            return pb2.RegisterEmployeeResponse(success=False, message="No face detected")
+
+        check_deadline()
+        normalized_photo_bytes = photo_bytes or request.image
+        with stage("db_register"):
+            message = self._store_registration(request.employee_id, request.name, encoding, normalized_photo_bytes)
+        return pb2.RegisterEmployeeResponse(success=True, message=message)
+
+    def _search_matches(self, encodings, known_embeddings, known_ids):
+        """Devuelve (distancia, employee_id) por cada encoding, resolviendo todas las consultas juntas."""
+        if len(encodings) == 0 or len(known_embeddings) == 0:
+            return []
+
+        queries = np.array(encodings, dtype=np.float64).reshape(len(encodings), -1)
+        matches = [None] * len(queries)
+        pending = list(range(len(queries)))
+        backend = "exact"
+
+        if self._faiss_enabled:
+            backend = "faiss"
+            pending = []
+            for row, candidates in enumerate(self._faiss_search_candidates_batch(queries, FAISS_TOPK)):
+                # Exact check on FAISS top-k to keep precision high.
+                best = None
+                for idx, _ in candidates:
+                    dist = float(np.linalg.norm(known_embeddings[idx] - queries[row]))
+                    if best is None or dist < best[0]:
+                        best = (dist, str(known_ids[idx]))
+                # If close to threshold, fall back to full scan to avoid misses.
+                if best is None or best[0] >= THRESHOLD * FAISS_FALLBACK_RATIO:
+                    pending.append(row)
+                else:
+                    matches[row] = best
+
+        if pending:
+            if backend == "faiss":
+                backend = "faiss+exact"
+            distances = pairwise_face_distances(queries[pending], known_embeddings)
+            for offset, row in enumerate(pending):
+                local_index = int(np.argmin(distances[offset]))
+                matches[row] = (float(distances[offset, local_index]), str(known_ids[local_index]))
+
+        note_event("search_backend", backend)
+        return matches
+
+    def _search_ranked(self, encodings, known_embeddings, known_ids, top_k):
+        """Devuelve los top_k empleados distintos con su distancia exacta."""
+        if len(encodings) == 0 or len(known_embeddings) == 0:
+            return []
+        top_k = min(int(top_k), RECOGNIZE_MAX_TOP_K)
+        queries = np.array(encodings, dtype=np.float64).reshape(len(encodings), -1)
+
+        if self._faiss_enabled:
+            # Un empleado ocupa hasta MAX_PROTOTYPES_PER_EMPLOYEE vecinos: con k = top_k * prototipos los top_k
+            # empleados distintos quedan entre los candidatos, que se re-rankean con distancia exacta.
+            k = min(len(known_ids), max(FAISS_TOPK, top_k * MAX_PROTOTYPES_PER_EMPLOYEE))
+            candidates = self._faiss_search_candidates_batch(queries, k)
+            indices = sorted({idx for row in candidates for idx, _ in row})
+            if indices:
+                distances = pairwise_face_distances(queries, known_embeddings[indices])
+                ranked = rank_employees(distances, [known_ids[idx] for idx in indices], top_k)
+                if len(ranked) >= top_k:
+                    note_event("search_backend", "faiss")
+                    return ranked
+            # Menos de top_k empleados distintos entre los candidatos (galeria chica o prototipos de sobra):
+            # escaneo completo para no devolver un ranking incompleto.
+            note_event("search_backend", "faiss+exact")
+        else:
+            note_event("search_backend", "exact")
+        distances = pairwise_face_distances(queries, known_embeddings)
+        return rank_employees(distances, known_ids, top_k)
+
+    def admission_snapshot(self):
+        return {name: gate.snapshot() for name, gate in self._admission.items()}
+
+    def result_cache_snapshot(self):
+        return self._result_cache.snapshot()
+
+    def enrollment_snapshot(self):
+        return self._enrollments.snapshot()
+
+    def scheduler_snapshot(self):
+        return cpu_scheduler.snapshot()
+
+    def cache_snapshots(self):
+        return {"result": self._result_cache.snapshot(), "register": self._register_results.snapshot()}
+
+    def gallery_snapshot(self):
+        with self._cache_lock:
+            return {
+                "embeddings": len(self.known_ids),
+                "employees": len(set(self.known_ids)),
+                "version": self._gallery_version,
+                "age_seconds": max(0.0, time.time() - self._last_refresh_ts) if self._last_refresh_ts else 0.0,
+            }
+
+    def warm_up(self, rounds=1):
+        """Primera pasada de cada ruta caliente antes de aceptar trafico; devuelve los tiempos de la ultima ronda."""
+        timings = {}
+        for _ in range(max(1, int(rounds))):
+            timings, encoding = run_warmup_pipeline()
+            known_embeddings, known_ids = self._cache_snapshot()
+            if encoding is not None and len(known_embeddings) > 0:
+                started = time.perf_counter()
+                self._search_matches([encoding], known_embeddings, known_ids)
+                self._search_ranked([encoding], known_embeddings, known_ids, 2)
+                timings["search"] = round((time.perf_counter() - started) * 1000.0, 1)
+        return timings
+
+    def _lookup_cached_response(self, result_key):
+        cached = self._result_cache.get(result_key)
+        if cached is None:
+            return None
+        note_event("match_source", "cached_response")
+        return pb2.RecognizeFaceResponse.FromString(cached)
+
+    def _respond_recognition(self, request, face_locations, encodings, known_embeddings, known_ids):
+        note_event("candidates", len(encodings))
+        if face_locations is not None:
+            note_event("match_source", "multi_face")
+            with stage("search"):
+                matches = self._search_matches(encodings, known_embeddings, known_ids)
+            return self._build_multi_face_response(face_locations, matches)
+
+        if request.top_k > 0:
+            with stage("search"):
+                ranked = self._search_ranked(encodings, known_embeddings, known_ids, request.top_k)
+            if ranked:
+                note_event("best_distance", float(ranked[0][1]))
+            return self._build_ranked_response(ranked)
+
+        with stage("search"):
+            matches = self._search_matches(encodings, known_embeddings, known_ids)
+        if not matches:
+            return self._build_recognize_response(None, None)
+        best_index = min(range(len(matches)), key=lambda index: matches[index][0])
+        best_distance, best_employee_id = matches[best_index]
+        note_event("best_distance", float(best_distance))
+        sources = captured_event("candidate_sources")
+        if sources is not None and best_index < len(sources):
+            note_event("match_source", sources[best_index])
+        elif captured_event("match_source") is None:
+            # Encodings servidos por la cache de resultados: no se volvio a detectar.
+            note_event("match_source", "cached")
+        return self._build_recognize_response(best_distance, best_employee_id)
+
+    def _compute_register_encoding(self, image_bytes, check_deadline, priority="register"):
+        frame = decode_request_image_bgr_auto_oriented(image_bytes)
+        if frame is None:
+            return (None, None, False), True
+
+        with cpu_scheduler.slot(priority, check_deadline):
+            check_deadline()
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            encoding = extract_primary_face_encoding(
+                rgb_frame,
+                num_jitters=FACE_ENCODING_JITTERS_REGISTER,
+                check_deadline=check_deadline,
+            )
+        return (encoding, encode_bgr_to_jpeg_bytes(frame), True), True
+
+    def _compute_recognize_encodings(self, request, context, gate, check_deadline):
+        frame = decode_request_image_bgr_auto_oriented(request.image)
+        if frame is None:
+            return (None, []), True
+
+        face_locations = None
+        with cpu_scheduler.slot("recognize", check_deadline):
+            check_deadline()
+            # El perfil se elige ya con el slot de CPU asignado, con el deadline que realmente queda.
+            profile = resolve_recognition_profile(context, gate, request.profile)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if request.HasField("face_box"):
+                encodings = extract_face_box_encodings(
+                    rgb_frame,
+                    request.face_box,
+                    num_jitters=profile.num_jitters,
+                )
+            elif request.multi_face:
+                face_locations, encodings = extract_frame_face_encodings(
+                    rgb_frame,
+                    num_jitters=profile.num_jitters,
+                    check_deadline=check_deadline,
+                    profile=profile,
+                )
+            else:
+                encodings = extract_candidate_encodings(
+                    rgb_frame,
+                    num_jitters=profile.num_jitters,
+                    max_candidates=profile.max_candidates,
+                    check_deadline=check_deadline,
+                    profile=profile,
                 )
+        # Un resultado degradado se comparte con las peticiones en vuelo, pero no se guarda.
+        return (face_locations, encodings), profile.name != PROFILE_DEGRADED.name
+
+    def _build_recognize_response(self, best_distance, best_employee_id):
+        if best_distance is not None and best_distance < THRESHOLD and best_employee_id:
+            confidence = max(0, 1 - (best_distance / THRESHOLD))
+            return pb2.RecognizeFaceResponse(
+                recognized=True,
+                employee_id=best_employee_id,
+                confidence=float(confidence),
+            )
+
+        return pb2.RecognizeFaceResponse(recognized=False)
 
+    def _build_ranked_response(self, ranked):
+        if not ranked:
             return pb2.RecognizeFaceResponse(recognized=False)
+        best_employee_id, best_distance = ranked[0]
+        response = self._build_recognize_response(best_distance, best_employee_id)
+        for employee_id, distance in ranked:
+            response.alternatives.add(employee_id=employee_id, distance=float(distance))
+        if len(ranked) > 1:
+            response.margin = float(ranked[1][1] - best_distance)
+        return response
+
+    def _build_multi_face_response(self, locations, matches):
+        response = pb2.RecognizeFaceResponse(recognized=False)
+        best = None
+        for location, (distance, employee_id), recognized in zip(locations, matches, assign_face_matches(matches)):
+            top, right, bottom, left = location
+            face = response.faces.add(box=pb2.FaceBox(top=top, right=right, bottom=bottom, left=left))
+            if not recognized:
+                continue
+            face.recognized = True
+            face.employee_id = employee_id
+            face.confidence = float(max(0, 1 - (distance / THRESHOLD)))
+            if best is None or face.confidence > best.confidence:
+                best = face
+
+        # Los campos simples reflejan la mejor cara para clientes que no leen `faces`.
+        if best is not None:
+            response.recognized = True
+            response.employee_id = best.employee_id
+            response.confidence = best.confidence
+        return response
+
+    @instrumented_rpc("RegisterEmployee")
+    def RegisterEmployee(self, request, context):
+        gate = self._admission["RegisterEmployee"]
+        if not gate.try_acquire():
+            return reject_overloaded(context, pb2.RegisterEmployeeResponse(success=False, message="Server busy"))
+
+        check_deadline = deadline_checker(context)
+        try:
+            check_deadline()
+            return self._register_idempotent(request, lambda: self._register_uncached(request, check_deadline))
+        except RequestDeadlineExceeded:
+            gate.record_deadline_shed()
+            return reject_expired(context, pb2.RegisterEmployeeResponse(success=False, message="Deadline exceeded"))
+        except Exception as exc:
+            print(f"RegisterEmployee error: {exc}")
+            traceback.print_exc()
+            return pb2.RegisterEmployeeResponse(success=False, message="Error interno al registrar empleado")
+        finally:
+            gate.release()
+
+    @instrumented_rpc("RecognizeFace")
+    def RecognizeFace(self, request, context):
+        gate = self._admission["RecognizeFace"]
+        if not gate.try_acquire():
+            return reject_overloaded(context, pb2.RecognizeFaceResponse(recognized=False))
+
+        check_deadline = deadline_checker(context)
+        try:
+            check_deadline()
+            self._maybe_refresh_embeddings()
+            known_embeddings, known_ids, gallery_version = self.gallery_view()
+            if len(known_embeddings) == 0:
+                return pb2.RecognizeFaceResponse(recognized=False)
+
+            result_key = None
+            if len(request.embedding) > 0:
+                # Embedding calculado en el borde: directo a busqueda, sin decodificar ni detectar.
+                note_event("match_source", "client_embedding")
+                face_locations, encodings = None, [validate_client_embedding(request.embedding)]
+            else:
+                encoding_key = recognize_encoding_key(request)
+                result_key = ("result", encoding_key, int(request.top_k), gallery_version)
+                cached = self._lookup_cached_response(result_key)
+                if cached is not None:
+                    return cached
+
+                face_locations, encodings = self._result_cache.get_or_compute(
+                    encoding_key,
+                    lambda: self._compute_recognize_encodings(request, context, gate, check_deadline),
+                )
+                if len(encodings) == 0:
+                    return pb2.RecognizeFaceResponse(recognized=False)
+
+            check_deadline()
+            response = self._respond_recognition(request, face_locations, encodings, known_embeddings, known_ids)
+            # Solo se guarda la respuesta si sus encodings eran cacheables (no degradados).
+            if result_key is not None and self._result_cache.contains(encoding_key):
+                self._result_cache.put(result_key, response.SerializeToString())
+            return response
+        except InvalidRecognizeInput as exc:
+            return reject_invalid_input(context, pb2.RecognizeFaceResponse(recognized=False), exc)
+        except RequestDeadlineExceeded:
+            gate.record_deadline_shed()
+            return reject_expired(context, pb2.RecognizeFaceResponse(recognized=False))
         except Exception as exc:
             print(f"RecognizeFace error: {exc}")
             traceback.print_exc()
             return pb2.RecognizeFaceResponse(recognized=False)
-
+        finally:
+            gate.release()
+
+    @instrumented_rpc("SubmitEnrollment")
+    def SubmitEnrollment(self, request, context):
+        if not request.employee_id or not request.image:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("employee_id e image son obligatorios")
+            return pb2.EnrollmentJob(state=pb2.ENROLLMENT_STATE_FAILED)
+
+        job = self._enrollments.submit(request)
+        if job is None:
+            return reject_overloaded(
+                context,
+                pb2.EnrollmentJob(state=pb2.ENROLLMENT_STATE_FAILED, message="Cola de altas llena"),
+            )
+        return job
+
+    @instrumented_rpc("GetEnrollmentStatus")
+    def GetEnrollmentStatus(self, request, context):
+        job = self._enrollments.status(request.job_id)
+        if job is None:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Job de alta no encontrado o expirado")
+            return pb2.EnrollmentJob(job_id=request.job_id)
+        return job
+
+    @instrumented_rpc("LogAttendance")
     def LogAttendance(self, request, context):
         pool_conn = get_connection_pool()
         conn = pool_conn.getconn()
         try:
             cur = conn.cursor()
             try:
-                cur.execute(
-                    """
-                    SELECT timestamp FROM attendance
-                    WHERE employee_id = %s
-                    ORDER BY timestamp DESC LIMIT 1
-                    """,
-                    (request.employee_id,),
-                )
-                last = cur.fetchone()
-                if last and datetime.now() - last[0] < timedelta(minutes=5):
-                    return pb2.AttendanceResponse(success=False, message="Duplicate prevented")
+                with stage("db_attendance"):
+                    cur.execute(
+                        """
+                        SELECT timestamp FROM attendance
+                        WHERE employee_id = %s
+                        ORDER BY timestamp DESC LIMIT 1
+                        """,
+                        (request.employee_id,),
+                    )
+                    last = cur.fetchone()
+                    if last and datetime.now() - last[0] < timedelta(minutes=5):
+                        return pb2.AttendanceResponse(success=False, message="Duplicate prevented")
 
-                cur.execute(
-                    "INSERT INTO attendance (employee_id, timestamp) VALUES (%s, NOW())",
-                    (request.employee_id,),
-                )
-                conn.commit()
+                    cur.execute(
+                        "INSERT INTO attendance (employee_id, timestamp) VALUES (%s, NOW())",
+                        (request.employee_id,),
+                    )
+                    conn.commit()
             finally:
                 cur.close()
         finally:
@@ -834,14 +3791,16 @@ class FaceService(pb2_grpc.FaceRecognitionServiceServicer):
 
         return pb2.AttendanceResponse(success=True, message="Attendance logged")
 
+    @instrumented_rpc("ListEmployees")
     def ListEmployees(self, request, context):
         pool_conn = get_connection_pool()
         conn = pool_conn.getconn()
         try:
             cur = conn.cursor()
             try:
-                cur.execute("SELECT name, employee_id FROM employees")
-                rows = cur.fetchall()
+                with stage("db_list"):
+                    cur.execute("SELECT name, employee_id FROM employees")
+                    rows = cur.fetchall()
             finally:
                 cur.close()
         finally:
@@ -851,39 +3810,734 @@ class FaceService(pb2_grpc.FaceRecognitionServiceServicer):
         return pb2.EmployeeList(employees=employees)
 
 
-def serve():
-    server = grpc.server(
-        futures.ThreadPoolExecutor(max_workers=GRPC_WORKERS),
-        options=[
-            ("grpc.max_receive_message_length", GRPC_MAX_MSG_BYTES),
-            ("grpc.max_send_message_length", GRPC_MAX_MSG_BYTES),
-        ],
+def build_cpu_executor(workers=ASYNC_CPU_WORKERS, name="bmpi-cpu"):
+    if ASYNC_CPU_EXECUTOR == "thread":
+        return futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+    # spawn: hacer fork de un proceso con gRPC ya inicializado no es seguro.
+    return futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_cpu_worker,
+        initargs=(THREAD_LAYOUT["library_threads"],),
+    )
+
+
+async def create_async_db_pool():
+    if not ASYNCPG_AVAILABLE:
+        print(f"[WARN] asyncpg no disponible, LogAttendance/ListEmployees usaran psycopg2 en hilos: {ASYNCPG_IMPORT_ERROR}")
+        return None
+    cfg = resolve_db_config()
+    return await asyncpg.create_pool(
+        host=cfg["host"],
+        database=cfg["database"],
+        user=cfg["user"],
+        password=cfg["password"] or None,
+        ssl=cfg["sslmode"] if cfg["sslmode"] != "disable" else False,
+        min_size=1,
+        max_size=ASYNC_DB_POOL_MAX,
     )
-    pb2_grpc.add_FaceRecognitionServiceServicer_to_server(FaceService(), server)
 
-    if bool_from_env("BMPI_GRPC_TLS"):
-        cert_file = os.getenv("BMPI_GRPC_CERT_FILE", "").strip()
-        key_file = os.getenv("BMPI_GRPC_KEY_FILE", "").strip()
-        if not cert_file or not key_file:
-            raise RuntimeError("BMPI_GRPC_CERT_FILE and BMPI_GRPC_KEY_FILE are required when BMPI_GRPC_TLS=true")
 
-        with open(cert_file, "rb") as cert_handle:
-            cert_chain = cert_handle.read()
-        with open(key_file, "rb") as key_handle:
-            private_key = key_handle.read()
+class AsyncFaceService:
+    """Servicer grpc.aio: I/O en el event loop, deteccion/codificacion en un executor acotado."""
+
+    def __init__(self, service, cpu_executor, io_executor, db_pool=None, enrollment_executor=None):
+        self._service = service
+        self.trace_sink = service.trace_sink
+        self.request_capture = service.request_capture
+        self._cpu_executor = cpu_executor
+        # Las altas en segundo plano codifican en su propio executor: no ocupan workers de RecognizeFace.
+        self._enrollment_executor = enrollment_executor or cpu_executor
+        self._io_executor = io_executor
+        self._db_pool = db_pool
+        # (cache, clave) -> asyncio.Future del calculo en curso; solo se toca desde el event loop.
+        self._inflight = {}
+
+    async def _run_io(self, func, *args):
+        loop = asyncio.get_running_loop()
+        # Copia del contexto para que la captura de etapas de la peticion siga al hilo de I/O.
+        return await loop.run_in_executor(self._io_executor, contextvars.copy_context().run, func, *args)
+
+    async def _submit_cpu(self, priority, check_deadline, func, *args):
+        # Slot del planificador y executor de CPU esperados en el event loop: ningun hilo de I/O queda bloqueado.
+        loop = asyncio.get_running_loop()
+        executor = self._enrollment_executor if priority == "enrollment" else self._cpu_executor
+        async with cpu_scheduler.async_slot(priority, check_deadline):
+            result, stages, events = await loop.run_in_executor(executor, run_with_capture, func, *args)
+        capture = current_capture.get()
+        if capture is not None:
+            capture.merge(stages, events)
+        return result
+
+    async def _single_flight(self, cache, key, compute):
+        """Version asyncio de `ResultCache.get_or_compute`: la coalescencia vive en el event loop.
+
+        `compute()` es una corrutina que devuelve (valor, cacheable). Las copias esperan el Future del lider;
+        si el lider falla, reintentan (la siguiente en despertar pasa a calcular).
+        """
+        flight_key = (cache.name, key)
+        while True:
+            found, value = cache.peek(key)
+            if found:
+                cache.record(key, "hits")
+                return value
+            flight = self._inflight.get(flight_key)
+            if flight is None:
+                break
+            cache.record(key, "coalesced")
+            outcome = await asyncio.shield(flight)
+            if outcome is not None:
+                return outcome[0]
+
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = flight
+        try:
+            value, cacheable = await compute()
+        except BaseException:
+            self._inflight.pop(flight_key, None)
+            flight.set_result(None)
+            raise
+        self._inflight.pop(flight_key, None)
+        cache.record(key, "misses")
+        if cacheable:
+            cache.put(key, value)
+        flight.set_result((value,))
+        return value
+
+    async def _run_cpu_cached(self, key, cacheable, priority, check_deadline, func, *args):
+        async def compute():
+            return await self._submit_cpu(priority, check_deadline, func, *args), cacheable
+
+        return await self._single_flight(self._service._result_cache, key, compute)
+
+    async def _register(self, request, check_deadline, priority="register"):
+        encoding, photo_bytes, decoded = await self._run_cpu_cached(
+            image_content_key("register", request.image, FACE_ENCODING_JITTERS_REGISTER),
+            True,
+            priority,
+            check_deadline,
+            encode_register_image,
+            request.image,
+            FACE_ENCODING_JITTERS_REGISTER,
+        )
+        if not decoded:
+            return pb2.RegisterEmployeeResponse(success=False, message="Invalid image")
+        if encoding is None:
+            return pb2.RegisterEmployeeResponse(success=False, message="No face detected")
+
+        check_deadline()
+        with stage("db_register"):
+            message = await self._run_io(
+                self._service._store_registration,
+                request.employee_id,
+                request.name,
+                encoding,
+                photo_bytes or request.image,
+            )
+        return pb2.RegisterEmployeeResponse(success=True, message=message)
+
+    async def _register_idempotent(self, request, check_deadline, priority="register"):
+        # Mismo contrato que FaceService._register_idempotent, con la espera de los reintentos en el event loop.
+        key = register_idempotency_key(request)
+        if key is None:
+            return await self._register(request, check_deadline, priority)
+
+        async def compute():
+            response = await self._register(request, check_deadline, priority)
+            return (response.success, response.message), response.success
+
+        success, message = await self._single_flight(self._service._register_results, key, compute)
+        return pb2.RegisterEmployeeResponse(success=success, message=message)
+
+    def enrollment_runner(self, loop):
+        # Los workers de altas son hilos: delegan en el event loop para que dlib corra en el executor de CPU
+        # (procesos con BMPI_ASYNC_CPU_EXECUTOR=process) bajo la clase "enrollment" del planificador.
+        def register(request):
+            return asyncio.run_coroutine_threadsafe(
+                self._register_idempotent(request, lambda: None, "enrollment"), loop
+            ).result()
+
+        return register
+
+    @instrumented_rpc("RegisterEmployee")
+    async def RegisterEmployee(self, request, context):
+        gate = self._service._admission["RegisterEmployee"]
+        if not gate.try_acquire():
+            return reject_overloaded(context, pb2.RegisterEmployeeResponse(success=False, message="Server busy"))
+
+        check_deadline = deadline_checker(context)
+        try:
+            check_deadline()
+            return await self._register_idempotent(request, check_deadline)
+        except RequestDeadlineExceeded:
+            gate.record_deadline_shed()
+            return reject_expired(context, pb2.RegisterEmployeeResponse(success=False, message="Deadline exceeded"))
+        except Exception as exc:
+            print(f"RegisterEmployee error: {exc}")
+            traceback.print_exc()
+            return pb2.RegisterEmployeeResponse(success=False, message="Error interno al registrar empleado")
+        finally:
+            gate.release()
+
+    @instrumented_rpc("RecognizeFace")
+    async def RecognizeFace(self, request, context):
+        gate = self._service._admission["RecognizeFace"]
+        if not gate.try_acquire():
+            return reject_overloaded(context, pb2.RecognizeFaceResponse(recognized=False))
+
+        check_deadline = deadline_checker(context)
+        try:
+            check_deadline()
+            await self._run_io(self._service._maybe_refresh_embeddings)
+            known_embeddings, known_ids, gallery_version = self._service.gallery_view()
+            if len(known_embeddings) == 0:
+                return pb2.RecognizeFaceResponse(recognized=False)
+
+            result_key = None
+            if len(request.embedding) > 0:
+                note_event("match_source", "client_embedding")
+                face_locations, encodings = None, [validate_client_embedding(request.embedding)]
+            else:
+                encoding_key = recognize_encoding_key(request)
+                result_key = ("result", encoding_key, int(request.top_k), gallery_version)
+                cached = self._service._lookup_cached_response(result_key)
+                if cached is not None:
+                    return cached
+
+                profile = resolve_recognition_profile(context, gate, request.profile)
+                face_box = None
+                if request.HasField("face_box"):
+                    # Copia plana: el mensaje protobuf no debe cruzar al ejecutor de procesos.
+                    face_box = ClientFaceBox(
+                        request.face_box.top,
+                        request.face_box.right,
+                        request.face_box.bottom,
+                        request.face_box.left,
+                    )
+                face_locations, encodings = await self._run_cpu_cached(
+                    encoding_key,
+                    profile.name != PROFILE_DEGRADED.name,
+                    "recognize",
+                    check_deadline,
+                    encode_recognize_request,
+                    request.image,
+                    profile,
+                    face_box,
+                    bool(request.multi_face),
+                )
+                if len(encodings) == 0:
+                    return pb2.RecognizeFaceResponse(recognized=False)
+
+            check_deadline()
+            response = await self._run_io(
+                self._service._respond_recognition,
+                request,
+                face_locations,
+                encodings,
+                known_embeddings,
+                known_ids,
+            )
+            if result_key is not None and self._service._result_cache.contains(encoding_key):
+                self._service._result_cache.put(result_key, response.SerializeToString())
+            return response
+        except InvalidRecognizeInput as exc:
+            return reject_invalid_input(context, pb2.RecognizeFaceResponse(recognized=False), exc)
+        except RequestDeadlineExceeded:
+            gate.record_deadline_shed()
+            return reject_expired(context, pb2.RecognizeFaceResponse(recognized=False))
+        except Exception as exc:
+            print(f"RecognizeFace error: {exc}")
+            traceback.print_exc()
+            return pb2.RecognizeFaceResponse(recognized=False)
+        finally:
+            gate.release()
+
+    @instrumented_rpc("SubmitEnrollment")
+    async def SubmitEnrollment(self, request, context):
+        # Solo encola: los workers de altas del servicio sincrono delegan el alta en enrollment_runner.
+        return self._service.SubmitEnrollment(request, context)
+
+    @instrumented_rpc("GetEnrollmentStatus")
+    async def GetEnrollmentStatus(self, request, context):
+        return self._service.GetEnrollmentStatus(request, context)
+
+    @instrumented_rpc("LogAttendance")
+    async def LogAttendance(self, request, context):
+        if self._db_pool is None:
+            return await self._run_io(self._service.LogAttendance, request, context)
+
+        # stage() tambien cierra la medicion en el retorno temprano de "Duplicate prevented".
+        with stage("db_attendance"):
+            async with self._db_pool.acquire() as conn:
+                async with conn.transaction():
+                    last = await conn.fetchval(
+                        """
+                        SELECT timestamp FROM attendance
+                        WHERE employee_id = $1
+                        ORDER BY timestamp DESC LIMIT 1
+                        """,
+                        request.employee_id,
+                    )
+                    if last and datetime.now() - last < timedelta(minutes=5):
+                        return pb2.AttendanceResponse(success=False, message="Duplicate prevented")
+
+                    await conn.execute(
+                        "INSERT INTO attendance (employee_id, timestamp) VALUES ($1, NOW())",
+                        request.employee_id,
+                    )
+
+        return pb2.AttendanceResponse(success=True, message="Attendance logged")
+
+    @instrumented_rpc("ListEmployees")
+    async def ListEmployees(self, request, context):
+        if self._db_pool is None:
+            return await self._run_io(self._service.ListEmployees, request, context)
+
+        with stage("db_list"):
+            async with self._db_pool.acquire() as conn:
+                rows = await conn.fetch("SELECT name, employee_id FROM employees")
+
+        employees = [pb2.Employee(name=r[0], employee_id=str(r[1])) for r in rows]
+        return pb2.EmployeeList(employees=employees)
+
+
+def grpc_server_options():
+    return [
+        ("grpc.max_receive_message_length", GRPC_MAX_MSG_BYTES),
+        ("grpc.max_send_message_length", GRPC_MAX_MSG_BYTES),
+    ]
+
+
+def resolve_server_credentials():
+    if not bool_from_env("BMPI_GRPC_TLS"):
+        return None
+
+    cert_file = os.getenv("BMPI_GRPC_CERT_FILE", "").strip()
+    key_file = os.getenv("BMPI_GRPC_KEY_FILE", "").strip()
+    if not cert_file or not key_file:
+        raise RuntimeError("BMPI_GRPC_CERT_FILE and BMPI_GRPC_KEY_FILE are required when BMPI_GRPC_TLS=true")
+
+    with open(cert_file, "rb") as cert_handle:
+        cert_chain = cert_handle.read()
+    with open(key_file, "rb") as key_handle:
+        private_key = key_handle.read()
+
+    return grpc.ssl_server_credentials(((private_key, cert_chain),))
+
 
-        creds = grpc.ssl_server_credentials(((private_key, cert_chain),))
+def bind_server_port(server):
+    creds = resolve_server_credentials()
+    if creds is not None:
         server.add_secure_port("[::]:50051", creds)
         print("Face Recognition Service running on port 50051 (TLS enabled)...")
     else:
         server.add_insecure_port("[::]:50051")
         print("Face Recognition Service running on port 50051...")
 
+
+def build_health_servicer(aio=False):
+    if not GRPC_HEALTH_AVAILABLE:
+        print(f"[WARN] grpcio-health-checking no disponible, sin servicio de salud: {GRPC_HEALTH_IMPORT_ERROR}")
+        return None
+    if aio:
+        return health.aio.HealthServicer()
+    return health.HealthServicer(experimental_non_blocking=True)
+
+
+def health_service_names():
+    return ("", pb2.DESCRIPTOR.services_by_name["FaceRecognitionService"].full_name)
+
+
+def log_warmup(timings, elapsed):
+    stages = " ".join(f"{stage}={ms}ms" for stage, ms in timings.items())
+    print(f"[INFO] Warm-up completado en {elapsed:.2f}s: {stages}")
+
+
+def warm_up_sync(service):
+    if not WARMUP_ENABLED:
+        return
+    started = time.time()
+    try:
+        log_warmup(service.warm_up(WARMUP_ROUNDS), time.time() - started)
+    except Exception as exc:
+        # Fail-open: una imagen sintetica que falla no justifica dejar la instancia fuera de servicio.
+        print(f"[WARN] Warm-up fallo, se marca listo igualmente: {exc}")
+        traceback.print_exc()
+
+
+async def warm_up_async(service, cpu_executor):
+    if not WARMUP_ENABLED:
+        return
+    loop = asyncio.get_running_loop()
+    started = time.time()
+    try:
+        # Cada proceso del executor carga modelos por su cuenta: una pasada por worker.
+        await asyncio.gather(
+            *[loop.run_in_executor(cpu_executor, run_warmup_pipeline) for _ in range(ASYNC_CPU_WORKERS * WARMUP_ROUNDS)]
+        )
+        timings = await loop.run_in_executor(None, service.warm_up, WARMUP_ROUNDS)
+        log_warmup(timings, time.time() - started)
+    except Exception as exc:
+        print(f"[WARN] Warm-up fallo, se marca listo igualmente: {exc}")
+        traceback.print_exc()
+
+
+async def serve_async():
+    start_memory_tracing()
+    service = FaceService()
+    start_metrics_server(service)
+    install_profile_signal()
+    cpu_executor = build_cpu_executor()
+    enrollment_executor = build_cpu_executor(ENROLLMENT_WORKERS, "bmpi-enroll")
+    io_executor = futures.ThreadPoolExecutor(max_workers=GRPC_WORKERS, thread_name_prefix="bmpi-io")
+    db_pool = await create_async_db_pool()
+
+    # En modo asyncio los slots del planificador corresponden a los workers del executor de CPU.
+    cpu_scheduler.set_total_slots(ASYNC_CPU_WORKERS)
+    for warning in cpu_scheduler.check_caps():
+        print(f"[WARN] planificador de CPU: {warning}")
+    server = grpc.aio.server(options=grpc_server_options())
+    servicer = AsyncFaceService(service, cpu_executor, io_executor, db_pool, enrollment_executor)
+    service._enrollments.use_runner(servicer.enrollment_runner(asyncio.get_running_loop()))
+    pb2_grpc.add_FaceRecognitionServiceServicer_to_server(servicer, server)
+    health_servicer = build_health_servicer(aio=True)
+    if health_servicer is not None:
+        health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
+        for name in health_service_names():
+            await health_servicer.set(name, health_pb2.HealthCheckResponse.NOT_SERVING)
+    bind_server_port(server)
+    print(
+        "[INFO] gRPC asyncio habilitado: cpu_executor=%s cpu_workers=%d enrollment_workers=%d asyncpg=%s"
+        % (ASYNC_CPU_EXECUTOR, ASYNC_CPU_WORKERS, ENROLLMENT_WORKERS, db_pool is not None)
+    )
+
+    await server.start()
+    await warm_up_async(service, cpu_executor)
+    if health_servicer is not None:
+        for name in health_service_names():
+            await health_servicer.set(name, health_pb2.HealthCheckResponse.SERVING)
+    try:
+        await server.wait_for_termination()
+    finally:
+        if db_pool is not None:
+            await db_pool.close()
+        cpu_executor.shutdown(wait=False, cancel_futures=True)
+        enrollment_executor.shutdown(wait=False, cancel_futures=True)
+        io_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def report_thread_budget():
+    applied = configure_thread_layout()
+    extra = {"grpc_workers": GRPC_WORKERS}
+    if GRPC_ASYNC:
+        extra["cpu_executor"] = f"{ASYNC_CPU_EXECUTOR}:{ASYNC_CPU_WORKERS}"
+    else:
+        extra["encode_slots"] = FACE_ENCODE_CONCURRENCY
+    print(f"[INFO] Presupuesto de hilos: {format_thread_layout(applied, extra)}")
+    if THREAD_LAYOUT["encode_parallel"] + THREAD_LAYOUT["enrollment_parallel"] > THREAD_LAYOUT["budget"]:
+        print("[WARN] Hay mas codificaciones en paralelo que hilos en el presupuesto; los nucleos quedan sobre-suscritos.")
+
+
+def sync_grpc_handler_threads():
+    """Hilos de handler del servidor sincrono.
+
+    Una peticion admitida retiene su hilo mientras espera slot de CPU: si el pool fuese menor que la suma de los
+    topes de admision, las puertas nunca se llenarian y el exceso esperaria en la cola del executor. Se reservan
+    ademas BMPI_GRPC_WORKERS hilos para el resto de RPC (LogAttendance, ListEmployees, altas encoladas...).
+    """
+    return GRPC_WORKERS + ADMISSION_MAX_PENDING_RECOGNIZE + ADMISSION_MAX_PENDING_REGISTER
+
+
+def serve():
+    load_server_dependencies()
+    report_thread_budget()
+    if GRPC_ASYNC:
+        asyncio.run(serve_async())
+        return
+
+    handler_threads = sync_grpc_handler_threads()
+    # Con maximum_concurrent_rpcs gRPC rechaza (RESOURCE_EXHAUSTED) en lugar de encolar sin limite en el executor.
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=handler_threads),
+        options=grpc_server_options(),
+        maximum_concurrent_rpcs=handler_threads,
+    )
+    start_memory_tracing()
+    service = FaceService()
+    start_metrics_server(service)
+    install_profile_signal()
+    for warning in cpu_scheduler.check_caps():
+        print(f"[WARN] planificador de CPU: {warning}")
+    pb2_grpc.add_FaceRecognitionServiceServicer_to_server(service, server)
+    health_servicer = build_health_servicer()
+    if health_servicer is not None:
+        health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
+        for name in health_service_names():
+            health_servicer.set(name, health_pb2.HealthCheckResponse.NOT_SERVING)
+    bind_server_port(server)
+
+    # El puerto se abre antes del warm-up para que las sondas de salud vean NOT_SERVING y no un error de conexion.
     server.start()
+    warm_up_sync(service)
+    if health_servicer is not None:
+        for name in health_service_names():
+            health_servicer.set(name, health_pb2.HealthCheckResponse.SERVING)
     server.wait_for_termination()
 
 
+STARTUP_DEFERRED_MODULES = ("grpc", "google.protobuf", "psycopg2", "asyncio", "faiss", "asyncpg", "face_recognition")
+
+
+def parse_importtime(stderr_text):
+    modules = []
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            modules.append((name.strip(), int(self_us) / 1000.0, int(cumulative_us) / 1000.0))
+        except ValueError:
+            continue
+    return modules
+
+
+def build_startup_report(image_path=None, top=15):
+    """Desglose del arranque en frio: -X importtime del modulo, carga de modelos y, con imagen, el CLI extract completo."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    probe = (
+        "import json, sys, face_server; "
+        f"print(json.dumps([m for m in {STARTUP_DEFERRED_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=script_dir,
+        capture_output=True,
+        text=True,
+    )
+    modules = parse_importtime(result.stderr)
+    total_ms = next((cumulative for name, _, cumulative in modules if name == "face_server"), None)
+    try:
+        loaded_after_import = json.loads(result.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        loaded_after_import = None
+
+    model_names = ["hog", "pose_5" if FACE_ENCODING_MODEL == "small" else "pose_68", "encoder"]
+    if "cnn" in (FACE_MODEL, FACE_MODEL_FALLBACK):
+        model_names.append("cnn")
+    model_load_ms = {}
+    for name in model_names:
+        started = time.perf_counter()
+        face_models._model(name)
+        model_load_ms[name] = round((time.perf_counter() - started) * 1000.0, 1)
+
+    report = {
+        "import_total_ms": round(total_ms, 1) if total_ms is not None else None,
+        "import_top_self_ms": [
+            {"module": name, "self_ms": round(self_ms, 1), "cumulative_ms": round(cumulative_ms, 1)}
+            for name, self_ms, cumulative_ms in sorted(modules, key=lambda item: item[1], reverse=True)[:top]
+        ],
+        "deferred_loaded_after_import": loaded_after_import,
+        "model_load_ms": model_load_ms,
+        "model_cache_dir": FACE_MODEL_CACHE_DIR,
+    }
+
+    if image_path:
+        started = time.perf_counter()
+        extract = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "extract", image_path],
+            cwd=script_dir,
+            capture_output=True,
+            text=True,
+        )
+        report["extract_cli_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+        report["extract_cli_success"] = '"success": true' in extract.stdout
+
+    return report
+
+
+BENCH_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def list_bench_images(directory):
+    paths = []
+    for root, _, names in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in names if name.lower().endswith(BENCH_IMAGE_EXTENSIONS))
+    return sorted(paths)
+
+
+def bench_worker_counts(max_workers):
+    # 1, 2, 4, ... hasta max_workers (incluido): suficiente para ver donde se satura el throughput.
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max(1, int(max_workers)))
+    return counts
+
+
+def bench_library_threads(workers):
+    # Misma regla que el servidor (budget // trabajos en paralelo); en el bench solo hay `workers` pipelines.
+    return int(os.getenv("BMPI_LIBRARY_THREADS", "0")) or max(1, resolve_thread_layout()["budget"] // max(1, int(workers)))
+
+
+def _init_bench_worker(library_threads):
+    try:
+        apply_thread_budget(library_threads)
+    except Exception:
+        pass
+    # Modelos cargados antes de medir: la construccion de dlib no cuenta como tiempo de pipeline.
+    try:
+        run_warmup_pipeline()
+    except Exception:
+        pass
+
+
+def _bench_worker_pid(_):
+    time.sleep(0.05)
+    return os.getpid()
+
+
+def bench_pipeline_image(image_path):
+    """Pipeline de RecognizeFace sobre una imagen (sin busqueda en galeria) con sus etapas y eventos."""
+    with open(image_path, "rb") as handle:
+        image_bytes = handle.read()
+    # Sin deadline ni cola: el mismo perfil que recibe una peticion normal con la configuracion de entorno.
+    profile = select_recognition_profile(None, 0)
+    started = time.perf_counter()
+    try:
+        (_, encodings), stages, events = run_with_capture(encode_recognize_request, image_bytes, profile)
+        error = None
+    except Exception as exc:
+        encodings, stages, events, error = [], {}, {}, str(exc)
+    return {
+        "path": image_path,
+        "seconds": time.perf_counter() - started,
+        "profile": profile.name,
+        "primary_model": profile.model,
+        "decoded": "image_size" in events,
+        "stages": stages,
+        "variants_tried": events.get("variants_tried", []),
+        "candidate_sources": events.get("candidate_sources", []),
+        "candidates": len(encodings),
+        "error": error,
+    }
+
+
+def run_bench_pass(image_paths, workers):
+    """Procesa todas las imagenes con `workers` procesos ya calentados; devuelve (resultados, segundos de pared)."""
+    with multiprocessing.Pool(
+        processes=workers, initializer=_init_bench_worker, initargs=(bench_library_threads(workers),)
+    ) as bench_pool:
+        # Un proceso solo toma tareas despues de su initializer: cuando todos respondieron, todos estan calientes.
+        ready = set()
+        while len(ready) < workers:
+            ready.update(bench_pool.map(_bench_worker_pid, range(workers), chunksize=1))
+        started = time.perf_counter()
+        results = list(bench_pool.imap_unordered(bench_pipeline_image, image_paths, chunksize=1))
+        return results, time.perf_counter() - started
+
+
+def bench_percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize_bench_results(results):
+    total = len(results)
+    latencies_ms = sorted(item["seconds"] * 1000.0 for item in results)
+    stage_totals = {}
+    variant_hits = {}
+    detector_hits = {}
+    no_face = variant_fallback = detector_fallback = decode_errors = errors = 0
+
+    for item in results:
+        for name, seconds in item["stages"].items():
+            stage_totals[name] = stage_totals.get(name, 0.0) + seconds
+        if item["error"]:
+            errors += 1
+            continue
+        if not item["decoded"]:
+            decode_errors += 1
+            continue
+        sources = [source.split("/", 1) for source in item["candidate_sources"]]
+        if not sources:
+            no_face += 1
+            continue
+        for variant, detector in sources:
+            variant_hits[variant] = variant_hits.get(variant, 0) + 1
+            detector_hits[detector] = detector_hits.get(detector, 0) + 1
+        # Fallback: ningun candidato salio de la imagen original o del detector primario sin reintento.
+        if all(variant != "base" for variant, _ in sources):
+            variant_fallback += 1
+        if all(detector != item["primary_model"] for _, detector in sources):
+            detector_fallback += 1
+
+    pipeline_total = sum(stage_totals.values()) or 1.0
+    return {
+        "images": total,
+        "latency_ms": {
+            "mean": round(sum(latencies_ms) / total, 1) if total else None,
+            "p50": round(bench_percentile(latencies_ms, 0.50), 1) if total else None,
+            "p95": round(bench_percentile(latencies_ms, 0.95), 1) if total else None,
+            "max": round(latencies_ms[-1], 1) if total else None,
+        },
+        "stages_ms_per_image": {
+            name: {"mean": round(seconds * 1000.0 / total, 1), "share": round(seconds / pipeline_total, 3)}
+            for name, seconds in sorted(stage_totals.items(), key=lambda entry: entry[1], reverse=True)
+        },
+        "variant_hits": dict(sorted(variant_hits.items(), key=lambda entry: entry[1], reverse=True)),
+        "detector_hits": dict(sorted(detector_hits.items(), key=lambda entry: entry[1], reverse=True)),
+        "rates": {
+            "no_face": round(no_face / total, 3) if total else None,
+            "variant_fallback": round(variant_fallback / total, 3) if total else None,
+            "detector_fallback": round(detector_fallback / total, 3) if total else None,
+            "decode_error": round(decode_errors / total, 3) if total else None,
+            "error": round(errors / total, 3) if total else None,
+        },
+    }
+
+
+def build_bench_report(directory, max_workers=None):
+    """Pipeline de produccion sobre una carpeta de fotos: desglose por etapa con 1 proceso e imagenes/s de 1 a N."""
+    image_paths = list_bench_images(directory)
+    if not image_paths:
+        return None
+    max_workers = resolve_extract_batch_workers(len(image_paths), max_workers)
+
+    throughput = []
+    breakdown = None
+    for workers in bench_worker_counts(max_workers):
+        results, wall_seconds = run_bench_pass(image_paths, workers)
+        if breakdown is None:
+            # Con un solo proceso no hay contencion de CPU: es el desglose representativo por imagen.
+            breakdown = summarize_bench_results(results)
+        throughput.append({
+            "workers": workers,
+            "library_threads_per_worker": bench_library_threads(workers),
+            "images_per_second": round(len(results) / wall_seconds, 2) if wall_seconds > 0 else None,
+            "wall_seconds": round(wall_seconds, 2),
+            "p95_ms": summarize_bench_results(results)["latency_ms"]["p95"],
+        })
+
+    return {
+        "directory": os.path.abspath(directory),
+        "profile": select_recognition_profile(None, 0)._asdict(),
+        "cpus": os.cpu_count(),
+        "thread_budget": resolve_thread_layout()["budget"],
+        "single_worker": breakdown,
+        "throughput": throughput,
+    }
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "startup-report":
+        image_path = sys.argv[2] if len(sys.argv) > 2 else None
+        print(json.dumps({"success": True, "report": build_startup_report(image_path)}))
+        sys.exit(0)
+
     if len(sys.argv) > 1 and sys.argv[1] == "extract":
         image_path = sys.argv[2] if len(sys.argv) > 2 else None
         if not image_path:
@@ -908,4 +4562,28 @@ if __name__ == "__main__":
         print(json.dumps({"success": True, "results": batch_results}))
         sys.exit(0)
 
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        image_dir = sys.argv[2] if len(sys.argv) > 2 else None
+        if not image_dir or not os.path.isdir(image_dir):
+            print(json.dumps({"success": False, "error": "carpeta de imagenes requerida"}))
+            sys.exit(0)
+
+        bench_max_workers = None
+        if len(sys.argv) > 3:
+            try:
+                bench_max_workers = int(sys.argv[3])
+            except ValueError:
+                bench_max_workers = 0
+            if bench_max_workers < 1:
+                print(json.dumps({"success": False, "error": "max_workers debe ser un entero positivo"}))
+                sys.exit(0)
+
+        bench_report = build_bench_report(image_dir, bench_max_workers)
+        if bench_report is None:
+            print(json.dumps({"success": False, "error": "La carpeta no contiene imagenes"}))
+            sys.exit(0)
+
+        print(json.dumps({"success": True, "report": bench_report}))
+        sys.exit(0)
+
     serve()
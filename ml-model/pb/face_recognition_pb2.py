@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x16\x66\x61\x63\x65_recognition.proto\x12\x10\x66\x61\x63\x65_recognition\"K\n\x17RegisterEmployeeRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x13\n\x0b\x65mployee_id\x18\x02 \x01(\t\x12\r\n\x05image\x18\x03 \x01(\x0c\"<\n\x18RegisterEmployeeResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"%\n\x14RecognizeFaceRequest\x12\r\n\x05image\x18\x01 \x01(\x0c\"T\n\x15RecognizeFaceResponse\x12\x12\n\nrecognized\x18\x01 \x01(\x08\x12\x13\n\x0b\x65mployee_id\x18\x02 \x01(\t\x12\x12\n\nconfidence\x18\x03 \x01(\x02\"(\n\x11\x41ttendanceRequest\x12\x13\n\x0b\x65mployee_id\x18\x01 \x01(\t\"6\n\x12\x41ttendanceResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x07\n\x05\x45mpty\"-\n\x08\x45mployee\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x13\n\x0b\x65mployee_id\x18\x02 \x01(\t\"=\n\x0c\x45mployeeList\x12-\n\temployees\x18\x01 \x03(\x0b\x32\x1a.face_recognition.Employee2\x8b\x03\n\x16\x46\x61\x63\x65RecognitionService\x12i\n\x10RegisterEmployee\x12).face_recognition.RegisterEmployeeRequest\x1a*.face_recognition.RegisterEmployeeResponse\x12`\n\rRecognizeFace\x12&.face_recognition.RecognizeFaceRequest\x1a\'.face_recognition.RecognizeFaceResponse\x12Z\n\rLogAttendance\x12#.face_recognition.AttendanceRequest\x1a$.face_recognition.AttendanceResponse\x12H\n\rListEmployees\x12\x17.face_recognition.Empty\x1a\x1e.face_recognition.EmployeeListB2Z0github.com/example/face-attendance/backend/pb;pbb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x16\x66\x61\x63\x65_recognition.proto\x12\x10\x66\x61\x63\x65_recognition\"d\n\x17RegisterEmployeeRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x13\n\x0b\x65mployee_id\x18\x02 \x01(\t\x12\r\n\x05image\x18\x03 \x01(\x0c\x12\x17\n\x0fidempotency_key\x18\x04 \x01(\t\"<\n\x18RegisterEmployeeResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"C\n\x07\x46\x61\x63\x65\x42ox\x12\x0b\n\x03top\x18\x01 \x01(\x05\x12\r\n\x05right\x18\x02 \x01(\x05\x12\x0e\n\x06\x62ottom\x18\x03 \x01(\x05\x12\x0c\n\x04left\x18\x04 \x01(\x05\"\xbf\x01\n\x14RecognizeFaceRequest\x12\r\n\x05image\x18\x01 \x01(\x0c\x12\x35\n\x07profile\x18\x02 \x01(\x0e\x32$.face_recognition.RecognitionProfile\x12+\n\x08\x66\x61\x63\x65_box\x18\x03 \x01(\x0b\x32\x19.face_recognition.FaceBox\x12\x11\n\tembedding\x18\x04 \x03(\x02\x12\x12\n\nmulti_face\x18\x05 \x01(\x08\x12\r\n\x05top_k\x18\x06 \x01(\x05\"7\n\x0eMatchCandidate\x12\x13\n\x0b\x65mployee_id\x18\x01 \x01(\t\x12\x10\n\x08\x64istance\x18\x02 \x01(\x02\"p\n\tFaceMatch\x12&\n\x03\x62ox\x18\x01 \x01(\x0b\x32\x19.face_recognition.FaceBox\x12\x12\n\nrecognized\x18\x02 \x01(\x08\x12\x13\n\x0b\x65mployee_id\x18\x03 \x01(\t\x12\x12\n\nconfidence\x18\x04 \x01(\x02\"\xc8\x01\n\x15RecognizeFaceResponse\x12\x12\n\nrecognized\x18\x01 \x01(\x08\x12\x13\n\x0b\x65mployee_id\x18\x02 \x01(\t\x12\x12\n\nconfidence\x18\x03 \x01(\x02\x12*\n\x05\x66\x61\x63\x65s\x18\x04 \x03(\x0b\x32\x1b.face_recognition.FaceMatch\x12\x36\n\x0c\x61lternatives\x18\x05 \x03(\x0b\x32 .face_recognition.MatchCandidate\x12\x0e\n\x06margin\x18\x06 \x01(\x02\"z\n\rEnrollmentJob\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x30\n\x05state\x18\x02 \x01(\x0e\x32!.face_recognition.EnrollmentState\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x16\n\x0equeue_position\x18\x04 \x01(\x05\")\n\x17\x45nrollmentStatusRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"(\n\x11\x41ttendanceRequest\x12\x13\n\x0b\x65mployee_id\x18\x01 \x01(\t\"6\n\x12\x41ttendanceResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x07\n\x05\x45mpty\"-\n\x08\x45mployee\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x13\n\x0b\x65mployee_id\x18\x02 \x01(\t\"=\n\x0c\x45mployeeList\x12-\n\temployees\x18\x01 \x03(\x0b\x32\x1a.face_recognition.Employee*\x97\x01\n\x12RecognitionProfile\x12\x1f\n\x1bRECOGNITION_PROFILE_DEFAULT\x10\x00\x12\x1c\n\x18RECOGNITION_PROFILE_FAST\x10\x01\x12 \n\x1cRECOGNITION_PROFILE_BALANCED\x10\x02\x12 \n\x1cRECOGNITION_PROFILE_ACCURATE\x10\x03*\xab\x01\n\x0f\x45nrollmentState\x12 \n\x1c\x45NROLLMENT_STATE_UNSPECIFIED\x10\x00\x12\x1b\n\x17\x45NROLLMENT_STATE_QUEUED\x10\x01\x12\x1c\n\x18\x45NROLLMENT_STATE_RUNNING\x10\x02\x12\x1e\n\x1a\x45NROLLMENT_STATE_SUCCEEDED\x10\x03\x12\x1b\n\x17\x45NROLLMENT_STATE_FAILED\x10\x04\x32\xce\x04\n\x16\x46\x61\x63\x65RecognitionService\x12i\n\x10RegisterEmployee\x12).face_recognition.RegisterEmployeeRequest\x1a*.face_recognition.RegisterEmployeeResponse\x12`\n\rRecognizeFace\x12&.face_recognition.RecognizeFaceRequest\x1a\'.face_recognition.RecognizeFaceResponse\x12Z\n\rLogAttendance\x12#.face_recognition.AttendanceRequest\x1a$.face_recognition.AttendanceResponse\x12H\n\rListEmployees\x12\x17.face_recognition.Empty\x1a\x1e.face_recognition.EmployeeList\x12^\n\x10SubmitEnrollment\x12).face_recognition.RegisterEmployeeRequest\x1a\x1f.face_recognition.EnrollmentJob\x12\x61\n\x13GetEnrollmentStatus\x12).face_recognition.EnrollmentStatusRequest\x1a\x1f.face_recognition.EnrollmentJobB2Z0github.com/example/face-attendance/backend/pb;pbb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,24 +32,38 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'face_recognition_pb2', _glo
 if not _descriptor._USE_C_DESCRIPTORS:
   _globals['DESCRIPTOR']._loaded_options = None
   _globals['DESCRIPTOR']._serialized_options = b'Z0github.com/example/face-attendance/backend/pb;pb'
+  _globals['_RECOGNITIONPROFILE']._serialized_start=1230
+  _globals['_RECOGNITIONPROFILE']._serialized_end=1381
+  _globals['_ENROLLMENTSTATE']._serialized_start=1384
+  _globals['_ENROLLMENTSTATE']._serialized_end=1555
   _globals['_REGISTEREMPLOYEEREQUEST']._serialized_start=44
-  _globals['_REGISTEREMPLOYEEREQUEST']._serialized_end=119
-  _globals['_REGISTEREMPLOYEERESPONSE']._serialized_start=121
-  _globals['_REGISTEREMPLOYEERESPONSE']._serialized_end=181
-  _globals['_RECOGNIZEFACEREQUEST']._serialized_start=183
-  _globals['_RECOGNIZEFACEREQUEST']._serialized_end=220
-  _globals['_RECOGNIZEFACERESPONSE']._serialized_start=222
-  _globals['_RECOGNIZEFACERESPONSE']._serialized_end=306
-  _globals['_ATTENDANCEREQUEST']._serialized_start=308
-  _globals['_ATTENDANCEREQUEST']._serialized_end=348
-  _globals['_ATTENDANCERESPONSE']._serialized_start=350
-  _globals['_ATTENDANCERESPONSE']._serialized_end=404
-  _globals['_EMPTY']._serialized_start=406
-  _globals['_EMPTY']._serialized_end=413
-  _globals['_EMPLOYEE']._serialized_start=415
-  _globals['_EMPLOYEE']._serialized_end=460
-  _globals['_EMPLOYEELIST']._serialized_start=462
-  _globals['_EMPLOYEELIST']._serialized_end=523
-  _globals['_FACERECOGNITIONSERVICE']._serialized_start=526
-  _globals['_FACERECOGNITIONSERVICE']._serialized_end=921
+  _globals['_REGISTEREMPLOYEEREQUEST']._serialized_end=144
+  _globals['_REGISTEREMPLOYEERESPONSE']._serialized_start=146
+  _globals['_REGISTEREMPLOYEERESPONSE']._serialized_end=206
+  _globals['_FACEBOX']._serialized_start=208
+  _globals['_FACEBOX']._serialized_end=275
+  _globals['_RECOGNIZEFACEREQUEST']._serialized_start=278
+  _globals['_RECOGNIZEFACEREQUEST']._serialized_end=469
+  _globals['_MATCHCANDIDATE']._serialized_start=471
+  _globals['_MATCHCANDIDATE']._serialized_end=526
+  _globals['_FACEMATCH']._serialized_start=528
+  _globals['_FACEMATCH']._serialized_end=640
+  _globals['_RECOGNIZEFACERESPONSE']._serialized_start=643
+  _globals['_RECOGNIZEFACERESPONSE']._serialized_end=843
+  _globals['_ENROLLMENTJOB']._serialized_start=845
+  _globals['_ENROLLMENTJOB']._serialized_end=967
+  _globals['_ENROLLMENTSTATUSREQUEST']._serialized_start=969
+  _globals['_ENROLLMENTSTATUSREQUEST']._serialized_end=1010
+  _globals['_ATTENDANCEREQUEST']._serialized_start=1012
+  _globals['_ATTENDANCEREQUEST']._serialized_end=1052
+  _globals['_ATTENDANCERESPONSE']._serialized_start=1054
+  _globals['_ATTENDANCERESPONSE']._serialized_end=1108
+  _globals['_EMPTY']._serialized_start=1110
+  _globals['_EMPTY']._serialized_end=1117
+  _globals['_EMPLOYEE']._serialized_start=1119
+  _globals['_EMPLOYEE']._serialized_end=1164
+  _globals['_EMPLOYEELIST']._serialized_start=1166
+  _globals['_EMPLOYEELIST']._serialized_end=1227
+  _globals['_FACERECOGNITIONSERVICE']._serialized_start=1558
+  _globals['_FACERECOGNITIONSERVICE']._serialized_end=2148
 # @@protoc_insertion_point(module_scope)
@@ -54,6 +54,16 @@ class FaceRecognitionServiceStub(object):
                 request_serializer=face__recognition__pb2.Empty.SerializeToString,
                 response_deserializer=face__recognition__pb2.EmployeeList.FromString,
                 _registered_method=True)
+        self.SubmitEnrollment = channel.unary_unary(
+                '/face_recognition.FaceRecognitionService/SubmitEnrollment',
+                request_serializer=face__recognition__pb2.RegisterEmployeeRequest.SerializeToString,
+                response_deserializer=face__recognition__pb2.EnrollmentJob.FromString,
+                _registered_method=True)
+        self.GetEnrollmentStatus = channel.unary_unary(
+                '/face_recognition.FaceRecognitionService/GetEnrollmentStatus',
+                request_serializer=face__recognition__pb2.EnrollmentStatusRequest.SerializeToString,
+                response_deserializer=face__recognition__pb2.EnrollmentJob.FromString,
+                _registered_method=True)
 
 
 class FaceRecognitionServiceServicer(object):
@@ -83,6 +93,18 @@ class FaceRecognitionServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SubmitEnrollment(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetEnrollmentStatus(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_FaceRecognitionServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -106,6 +128,16 @@ def add_FaceRecognitionServiceServicer_to_server(servicer, server):
                     request_deserializer=face__recognition__pb2.Empty.FromString,
                     response_serializer=face__recognition__pb2.EmployeeList.SerializeToString,
             ),
+            'SubmitEnrollment': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitEnrollment,
+                    request_deserializer=face__recognition__pb2.RegisterEmployeeRequest.FromString,
+                    response_serializer=face__recognition__pb2.EnrollmentJob.SerializeToString,
+            ),
+            'GetEnrollmentStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetEnrollmentStatus,
+                    request_deserializer=face__recognition__pb2.EnrollmentStatusRequest.FromString,
+                    response_serializer=face__recognition__pb2.EnrollmentJob.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'face_recognition.FaceRecognitionService', rpc_method_handlers)
@@ -224,3 +256,57 @@ class FaceRecognitionService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def SubmitEnrollment(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/face_recognition.FaceRecognitionService/SubmitEnrollment',
+            face__recognition__pb2.RegisterEmployeeRequest.SerializeToString,
+            face__recognition__pb2.EnrollmentJob.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetEnrollmentStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/face_recognition.FaceRecognitionService/GetEnrollmentStatus',
+            face__recognition__pb2.EnrollmentStatusRequest.SerializeToString,
+            face__recognition__pb2.EnrollmentJob.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
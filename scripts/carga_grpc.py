@@ -0,0 +1,696 @@
+#!/usr/bin/env python3
+"""Prueba de carga gRPC para face_server.py antes de un despliegue.
+
+Levanta face_server.py en un subproceso contra una base descartable y lo carga con imagenes locales
+(por defecto `datasets/` y `tmp-test-photos/`) usando el cliente generado en ml-model/pb:
+
+- --db standin: tablas employees/attendance en un SQLite temporal dentro del proceso del servidor (default,
+  no requiere Postgres; el acceso a la base queda serializado, asi que no sirve para medir la base)
+- --db postgres: initdb + pg_ctl en un directorio temporal, solo por socket unix (requiere binarios de Postgres
+  y un usuario distinto de root)
+- --target host:puerto: no levanta nada y carga un servidor ya en marcha
+
+Fases:
+1. seed: registra una imagen por identidad (carpetas `known/<id>` o, si no hay, la primera de cada carpeta)
+2. carga: RecognizeFace/RegisterEmployee segun --mix, en lazo cerrado (--concurrency) o abierto (--rate)
+
+En lazo abierto la latencia se mide tambien desde el instante programado de envio, para que la cola del
+cliente cuente cuando el servidor no da abasto (sin "coordinated omission").
+
+Genera un reporte JSON y uno Markdown en --output con throughput, percentiles y desglose de errores.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent import futures
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Sequence
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+ML_MODEL_DIR = ROOT_DIR / "ml-model"
+sys.path.insert(0, str(ML_MODEL_DIR))
+
+SUPPORTED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+SERVER_PORT = 50051
+
+
+@dataclass
+class LoadConfig:
+    images: list[Path]
+    output_dir: Path
+    db: str
+    target: str
+    concurrency: int
+    rate: float
+    arrivals: str
+    max_inflight: int
+    duration: float
+    requests: int
+    mix: dict[str, float]
+    seed_employees: int
+    max_dim: int
+    timeout: float
+    startup_timeout: float
+    random_seed: int
+    server_env: dict[str, str]
+
+
+@dataclass
+class Sample:
+    rpc: str
+    latency_ms: float
+    scheduled_latency_ms: float
+    outcome: str
+
+
+@dataclass
+class Workload:
+    seed: list[tuple[str, bytes]] = field(default_factory=list)
+    probes: list[tuple[str, bytes]] = field(default_factory=list)
+
+
+def parse_mix(raw: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for token in raw.split(","):
+        name, _, weight = token.partition(":")
+        name = name.strip()
+        if not name:
+            continue
+        if name not in ("recognize", "register"):
+            raise SystemExit(f"RPC desconocida en --mix: {name}")
+        mix[name] = float(weight or 1.0)
+    if not mix or sum(mix.values()) <= 0:
+        raise SystemExit("--mix debe tener al menos un peso positivo")
+    return mix
+
+
+def parse_args() -> LoadConfig:
+    parser = argparse.ArgumentParser(description="Prueba de carga gRPC para face_server.py.")
+    parser.add_argument(
+        "--images",
+        nargs="+",
+        default=[str(ROOT_DIR / "datasets"), str(ROOT_DIR / "tmp-test-photos")],
+        help="Directorios con imagenes (recursivo).",
+    )
+    parser.add_argument("--output", default="reports/carga", help="Directorio de salida de reportes.")
+    parser.add_argument("--db", default="standin", choices=["standin", "postgres"], help="Base descartable del servidor.")
+    parser.add_argument("--target", default="", help="Servidor ya levantado (host:puerto); no se arranca ninguno.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Clientes en lazo cerrado.")
+    parser.add_argument("--rate", type=float, default=0.0, help="Lazo abierto: peticiones por segundo (0 = lazo cerrado).")
+    parser.add_argument("--arrivals", default="poisson", choices=["poisson", "uniform"], help="Llegadas en lazo abierto.")
+    parser.add_argument("--max-inflight", type=int, default=64, help="Lazo abierto: peticiones simultaneas maximas.")
+    parser.add_argument("--duration", type=float, default=60.0, help="Duracion de la fase de carga en segundos.")
+    parser.add_argument("--requests", type=int, default=0, help="Tope de peticiones de la fase de carga (0 = sin tope).")
+    parser.add_argument("--mix", default="recognize:1.0", help="Pesos por RPC, p. ej. recognize:0.9,register:0.1.")
+    parser.add_argument("--seed-employees", type=int, default=0, help="Identidades a registrar (0 = todas).")
+    parser.add_argument("--max-dim", type=int, default=1280, help="Reescala imagenes mas grandes (0 = tal cual).")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Deadline por peticion en segundos.")
+    parser.add_argument("--startup-timeout", type=float, default=180.0, help="Espera maxima a que el servidor este SERVING.")
+    parser.add_argument("--random-seed", type=int, default=1234, help="Semilla para el orden y las llegadas.")
+    parser.add_argument(
+        "--server-env",
+        action="append",
+        default=[],
+        help="Variable extra para el servidor (KEY=VALUE), repetible. P. ej. --server-env BMPI_GRPC_ASYNC=1.",
+    )
+    parser.add_argument("--serve-standin", default="", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_standin:
+        serve_with_standin(Path(args.serve_standin))
+        raise SystemExit(0)
+
+    server_env = {}
+    for item in args.server_env:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--server-env espera KEY=VALUE: {item}")
+        server_env[key] = value
+
+    return LoadConfig(
+        images=[Path(path) for path in args.images],
+        output_dir=Path(args.output),
+        db=args.db,
+        target=args.target,
+        concurrency=max(1, args.concurrency),
+        rate=max(0.0, args.rate),
+        arrivals=args.arrivals,
+        max_inflight=max(1, args.max_inflight),
+        duration=max(1.0, args.duration),
+        requests=max(0, args.requests),
+        mix=parse_mix(args.mix),
+        seed_employees=max(0, args.seed_employees),
+        max_dim=max(0, args.max_dim),
+        timeout=max(0.1, args.timeout),
+        startup_timeout=max(1.0, args.startup_timeout),
+        random_seed=args.random_seed,
+        server_env=server_env,
+    )
+
+
+# --- Base descartable -------------------------------------------------------------------------------------------
+
+
+class StandinCursor:
+    """Cursor estilo psycopg2 sobre SQLite: traduce los placeholders y NOW() de las consultas de face_server."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._cursor = connection.cursor()
+
+    def execute(self, sql: str, params: Sequence = ()) -> None:
+        sql = sql.replace("%s", "?").replace("NOW()", "datetime('now', 'localtime')")
+        self._cursor.execute(sql, tuple(params))
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class StandinConnection:
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def cursor(self) -> StandinCursor:
+        return StandinCursor(self._connection)
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def rollback(self) -> None:
+        self._connection.rollback()
+
+
+class StandinPool:
+    """Reemplazo de psycopg2.pool.SimpleConnectionPool: una conexion SQLite prestada de a un hilo por vez."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS employees (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            employee_id TEXT UNIQUE NOT NULL,
+            embedding BLOB NOT NULL,
+            samples_count INTEGER NOT NULL DEFAULT 1,
+            photo BLOB
+        );
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            employee_id TEXT NOT NULL,
+            timestamp TIMESTAMP NOT NULL
+        );
+    """
+
+    def __init__(self, path: Path):
+        sqlite3.register_converter("TIMESTAMP", lambda raw: datetime.fromisoformat(raw.decode("utf-8")))
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        self._connection.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+    def getconn(self) -> StandinConnection:
+        self._lock.acquire()
+        return StandinConnection(self._connection)
+
+    def putconn(self, connection: StandinConnection) -> None:
+        self._lock.release()
+
+
+def serve_with_standin(db_path: Path) -> None:
+    import face_server
+
+    face_server.load_server_dependencies()
+    # En modo asyncio LogAttendance/ListEmployees caen al pool sincrono en hilos, que es el stand-in.
+    face_server.ASYNCPG_AVAILABLE = False
+    face_server.connection_pool = StandinPool(db_path)
+    face_server.schema_initialized = True
+    face_server.serve()
+
+
+def find_postgres_bin(name: str) -> str:
+    found = shutil.which(name)
+    if found:
+        return found
+    candidates = sorted(Path("/usr/lib/postgresql").glob(f"*/bin/{name}"), reverse=True)
+    if candidates:
+        return str(candidates[0])
+    raise SystemExit(f"No se encontro {name}: instalar Postgres o usar --db standin")
+
+
+def start_temp_postgres(workdir: Path) -> tuple[dict[str, str], Callable[[], None]]:
+    data_dir = workdir / "pgdata"
+    socket_dir = workdir / "pgsocket"
+    socket_dir.mkdir()
+    subprocess.run(
+        [find_postgres_bin("initdb"), "-D", str(data_dir), "-U", "postgres", "--auth=trust", "-E", "UTF8"],
+        check=True,
+        capture_output=True,
+    )
+    pg_ctl = find_postgres_bin("pg_ctl")
+    subprocess.run(
+        [pg_ctl, "-D", str(data_dir), "-l", str(workdir / "postgres.log"), "-w", "start",
+         "-o", f"-k {socket_dir} -c listen_addresses=''"],
+        check=True,
+        capture_output=True,
+    )
+    subprocess.run(
+        [find_postgres_bin("createdb"), "-h", str(socket_dir), "-U", "postgres", "bmpi"],
+        check=True,
+        capture_output=True,
+    )
+
+    def stop() -> None:
+        subprocess.run([pg_ctl, "-D", str(data_dir), "-m", "fast", "stop"], capture_output=True)
+
+    env = {"DB_HOST": str(socket_dir), "DB_NAME": "bmpi", "DB_USER": "postgres", "DB_PASSWORD": "", "DB_SSLMODE": "disable"}
+    return env, stop
+
+
+def port_in_use(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        return probe.connect_ex(("127.0.0.1", port)) == 0
+
+
+def start_server(config: LoadConfig, workdir: Path) -> tuple[subprocess.Popen, list]:
+    if port_in_use(SERVER_PORT):
+        raise SystemExit(f"El puerto {SERVER_PORT} ya esta en uso: detener el servidor o usar --target")
+    cleanups = []
+    env = dict(os.environ)
+    env.update(config.server_env)
+    if config.db == "postgres":
+        db_env, stop = start_temp_postgres(workdir)
+        env.update(db_env)
+        cleanups.append(stop)
+        command = [sys.executable, str(ML_MODEL_DIR / "face_server.py")]
+    else:
+        command = [sys.executable, str(Path(__file__).resolve()), "--serve-standin", str(workdir / "standin.sqlite")]
+
+    log_handle = open(workdir / "server.log", "w", encoding="utf-8")
+    process = subprocess.Popen(command, cwd=str(ML_MODEL_DIR), env=env, stdout=log_handle, stderr=subprocess.STDOUT)
+    cleanups.insert(0, log_handle.close)
+    return process, cleanups
+
+
+def wait_until_serving(channel, process: subprocess.Popen | None, timeout: float) -> float:
+    import grpc
+
+    started = time.perf_counter()
+    try:
+        from grpc_health.v1 import health_pb2, health_pb2_grpc
+    except ImportError:
+        health_pb2 = health_pb2_grpc = None
+
+    while time.perf_counter() - started < timeout:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"El servidor termino durante el arranque (codigo {process.returncode})")
+        try:
+            if health_pb2_grpc is None:
+                grpc.channel_ready_future(channel).result(timeout=1.0)
+                return time.perf_counter() - started
+            stub = health_pb2_grpc.HealthStub(channel)
+            response = stub.Check(health_pb2.HealthCheckRequest(service=""), timeout=1.0)
+            if response.status == health_pb2.HealthCheckResponse.SERVING:
+                return time.perf_counter() - started
+        except (grpc.RpcError, grpc.FutureTimeoutError):
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"El servidor no llego a SERVING en {timeout:.0f}s")
+
+
+# --- Carga ------------------------------------------------------------------------------------------------------
+
+
+def list_images(root: Path) -> list[Path]:
+    if not root.exists():
+        return []
+    return sorted(path for path in root.rglob("*") if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS)
+
+
+def read_image(path: Path, max_dim: int) -> bytes:
+    data = path.read_bytes()
+    if max_dim <= 0:
+        return data
+    import cv2
+    import numpy as np
+
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None or max(image.shape[:2]) <= max_dim:
+        return data
+    scale = max_dim / float(max(image.shape[:2]))
+    resized = cv2.resize(image, (int(image.shape[1] * scale), int(image.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+    return cv2.imencode(".jpg", resized, [cv2.IMWRITE_JPEG_QUALITY, 92])[1].tobytes()
+
+
+def build_workload(config: LoadConfig) -> Workload:
+    paths = [path for root in config.images for path in list_images(root)]
+    known = [path for path in paths if "known" in path.parts]
+    seed_by_identity: dict[str, Path] = {}
+    for path in known or paths:
+        seed_by_identity.setdefault(path.parent.name, path)
+
+    identities = sorted(seed_by_identity)
+    if config.seed_employees:
+        identities = identities[: config.seed_employees]
+    seed_paths = {seed_by_identity[identity] for identity in identities}
+
+    workload = Workload()
+    workload.seed = [(identity, read_image(seed_by_identity[identity], config.max_dim)) for identity in identities]
+    probe_paths = [path for path in paths if path not in seed_paths and path not in known] or list(seed_paths)
+    workload.probes = [(path.parent.name, read_image(path, config.max_dim)) for path in probe_paths]
+    random.Random(config.random_seed).shuffle(workload.probes)
+    return workload
+
+
+def classify_outcome(response) -> str:
+    # Mismo criterio que classify_rpc_outcome en face_server.py.
+    if hasattr(response, "recognized"):
+        return "recognized" if response.recognized else "not_recognized"
+    if hasattr(response, "success"):
+        return "ok" if response.success else "failed"
+    return "ok"
+
+
+class LoadRunner:
+    def __init__(self, config: LoadConfig, stub, workload: Workload):
+        from pb import face_recognition_pb2 as pb2
+
+        self.pb2 = pb2
+        self.config = config
+        self.stub = stub
+        self.workload = workload
+        self.samples: list[Sample] = []
+        self._samples_lock = threading.Lock()
+        self._counter = itertools.count()
+        self._counter_lock = threading.Lock()
+        rng = random.Random(config.random_seed)
+        names = list(config.mix)
+        weights = [config.mix[name] for name in names]
+        # Secuencia de RPC fija por semilla: dos corridas con la misma semilla piden lo mismo en el mismo orden.
+        self._plan = rng.choices(names, weights=weights, k=4096)
+
+    def next_index(self) -> int | None:
+        with self._counter_lock:
+            index = next(self._counter)
+        if self.config.requests and index >= self.config.requests:
+            return None
+        return index
+
+    def call(self, index: int, scheduled: float | None = None) -> None:
+        rpc = self._plan[index % len(self._plan)]
+        identity, image = self.workload.probes[index % len(self.workload.probes)]
+        started = time.perf_counter()
+        try:
+            if rpc == "register":
+                response = self.stub.RegisterEmployee(
+                    self.pb2.RegisterEmployeeRequest(employee_id=identity, name=identity, image=image),
+                    timeout=self.config.timeout,
+                )
+            else:
+                response = self.stub.RecognizeFace(self.pb2.RecognizeFaceRequest(image=image), timeout=self.config.timeout)
+            outcome = classify_outcome(response)
+        except Exception as exc:
+            code = getattr(exc, "code", None)
+            outcome = code().name.lower() if callable(code) else type(exc).__name__
+        finished = time.perf_counter()
+        latency_ms = (finished - started) * 1000.0
+        scheduled_latency_ms = (finished - scheduled) * 1000.0 if scheduled is not None else latency_ms
+        with self._samples_lock:
+            self.samples.append(Sample(rpc, latency_ms, scheduled_latency_ms, outcome))
+
+    def seed(self) -> list[Sample]:
+        samples = []
+        for identity, image in self.workload.seed:
+            started = time.perf_counter()
+            try:
+                response = self.stub.RegisterEmployee(
+                    self.pb2.RegisterEmployeeRequest(employee_id=identity, name=identity, image=image),
+                    timeout=max(self.config.timeout, 120.0),
+                )
+                outcome = classify_outcome(response)
+            except Exception as exc:
+                code = getattr(exc, "code", None)
+                outcome = code().name.lower() if callable(code) else type(exc).__name__
+            latency_ms = (time.perf_counter() - started) * 1000.0
+            samples.append(Sample("seed", latency_ms, latency_ms, outcome))
+        return samples
+
+    def run_closed_loop(self) -> float:
+        deadline = time.perf_counter() + self.config.duration
+
+        def client() -> None:
+            while time.perf_counter() < deadline:
+                index = self.next_index()
+                if index is None:
+                    return
+                self.call(index)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client, daemon=True) for _ in range(self.config.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    def run_open_loop(self) -> float:
+        rng = random.Random(self.config.random_seed + 1)
+        started = time.perf_counter()
+        deadline = started + self.config.duration
+        next_send = started
+        pending = []
+        with futures.ThreadPoolExecutor(max_workers=self.config.max_inflight) as executor:
+            while next_send < deadline:
+                index = self.next_index()
+                if index is None:
+                    break
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pending.append(executor.submit(self.call, index, next_send))
+                if self.config.arrivals == "poisson":
+                    next_send += rng.expovariate(self.config.rate)
+                else:
+                    next_send += 1.0 / self.config.rate
+            for future in pending:
+                future.result()
+        return time.perf_counter() - started
+
+
+# --- Reporte ----------------------------------------------------------------------------------------------------
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    idx = max(0, min(len(values) - 1, int(round((q / 100.0) * (len(values) - 1)))))
+    sorted_values = sorted(values)
+    return float(sorted_values[idx])
+
+
+def summarize_latency(values: Sequence[float]) -> dict:
+    if not values:
+        return {"count": 0, "avg_ms": 0.0, "p50_ms": 0.0, "p90_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "count": len(values),
+        "avg_ms": round(float(statistics.fmean(values)), 2),
+        "p50_ms": round(percentile(values, 50), 2),
+        "p90_ms": round(percentile(values, 90), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(float(max(values)), 2),
+    }
+
+
+SUCCESS_OUTCOMES = {"recognized", "not_recognized", "ok", "failed"}
+
+
+def summarize_samples(samples: Sequence[Sample], elapsed: float, open_loop: bool) -> dict:
+    outcomes: dict[str, int] = {}
+    for sample in samples:
+        outcomes[sample.outcome] = outcomes.get(sample.outcome, 0) + 1
+    errors = {outcome: count for outcome, count in outcomes.items() if outcome not in SUCCESS_OUTCOMES}
+    error_count = sum(errors.values())
+    ok_latency = [sample.latency_ms for sample in samples if sample.outcome in SUCCESS_OUTCOMES]
+    summary = {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 3) if elapsed > 0 else 0.0,
+        "goodput_rps": round(len(ok_latency) / elapsed, 3) if elapsed > 0 else 0.0,
+        "error_rate": round(error_count / len(samples), 6) if samples else 0.0,
+        "latency": summarize_latency(ok_latency),
+        "outcomes": outcomes,
+        "errors": errors,
+    }
+    if open_loop:
+        summary["scheduled_latency"] = summarize_latency([sample.scheduled_latency_ms for sample in samples])
+    return summary
+
+
+def build_payload(config: LoadConfig, workload: Workload, seed: list[Sample], samples: list[Sample], elapsed: float,
+                  startup_s: float | None) -> dict:
+    open_loop = config.rate > 0
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "target": config.target or f"localhost:{SERVER_PORT}",
+        "db": "externa" if config.target else config.db,
+        "settings": {
+            "mode": "open" if open_loop else "closed",
+            "concurrency": config.concurrency,
+            "rate": config.rate,
+            "arrivals": config.arrivals if open_loop else None,
+            "max_inflight": config.max_inflight if open_loop else None,
+            "duration_s": config.duration,
+            "requests": config.requests,
+            "mix": config.mix,
+            "max_dim": config.max_dim,
+            "timeout_s": config.timeout,
+            "random_seed": config.random_seed,
+            "server_env": config.server_env,
+        },
+        "images": {"seed": len(workload.seed), "probes": len(workload.probes)},
+        "startup_s": round(startup_s, 2) if startup_s is not None else None,
+        "seed": summarize_samples(seed, max(1e-9, sum(sample.latency_ms for sample in seed) / 1000.0), False),
+        "elapsed_s": round(elapsed, 3),
+        "total": summarize_samples(samples, elapsed, open_loop),
+        "rpcs": {
+            rpc: summarize_samples([sample for sample in samples if sample.rpc == rpc], elapsed, open_loop)
+            for rpc in sorted({sample.rpc for sample in samples})
+        },
+    }
+
+
+def write_reports(config: LoadConfig, payload: dict) -> tuple[Path, Path]:
+    config.output_dir.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_path = config.output_dir / f"carga_grpc_{ts}.json"
+    md_path = config.output_dir / f"carga_grpc_{ts}.md"
+
+    json_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    settings = payload["settings"]
+    total = payload["total"]
+    if settings["mode"] == "open":
+        mode = f"lazo abierto, {settings['rate']} req/s ({settings['arrivals']}), max_inflight={settings['max_inflight']}"
+    else:
+        mode = f"lazo cerrado, concurrencia={settings['concurrency']}"
+    lines = [
+        "# Prueba de carga gRPC",
+        "",
+        f"- Fecha: {payload['generated_at']}",
+        f"- Servidor: {payload['target']} (base: {payload['db']})",
+        f"- Modo: {mode}",
+        f"- Mix: {', '.join(f'{name}={weight}' for name, weight in settings['mix'].items())}",
+        f"- Imagenes: {payload['images']['seed']} seed, {payload['images']['probes']} de prueba "
+        f"(max_dim={settings['max_dim']})",
+        f"- Arranque hasta SERVING: {payload['startup_s'] if payload['startup_s'] is not None else 'n/a'} s",
+        f"- Peticiones: {total['requests']} en {payload['elapsed_s']} s",
+        f"- Throughput: {total['throughput_rps']} req/s (goodput {total['goodput_rps']} req/s)",
+        f"- Tasa de error: **{total['error_rate']:.4f}**",
+        "",
+        "## Latencia por RPC (respuestas sin error gRPC)",
+        "",
+        "| RPC | req | req/s | p50_ms | p90_ms | p95_ms | p99_ms | max_ms | errores |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for rpc, row in list(payload["rpcs"].items()) + [("total", total), ("seed", payload["seed"])]:
+        latency = row["latency"]
+        lines.append(
+            f"| {rpc} | {row['requests']} | {row['throughput_rps']:.2f} | {latency['p50_ms']:.2f} | "
+            f"{latency['p90_ms']:.2f} | {latency['p95_ms']:.2f} | {latency['p99_ms']:.2f} | {latency['max_ms']:.2f} | "
+            f"{sum(row['errors'].values())} |"
+        )
+    if "scheduled_latency" in total:
+        scheduled = total["scheduled_latency"]
+        lines.extend(
+            [
+                "",
+                "## Latencia desde el envio programado (lazo abierto)",
+                "",
+                f"- p50/p95/p99: {scheduled['p50_ms']:.2f} / {scheduled['p95_ms']:.2f} / {scheduled['p99_ms']:.2f} ms",
+            ]
+        )
+    lines.extend(["", "## Resultados", "", "| resultado | cantidad |", "|---|---:|"])
+    for outcome, count in sorted(total["outcomes"].items(), key=lambda item: item[1], reverse=True):
+        lines.append(f"| {outcome} | {count} |")
+
+    md_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return json_path, md_path
+
+
+def main() -> int:
+    config = parse_args()
+
+    import grpc
+    from pb import face_recognition_pb2_grpc as pb2_grpc
+
+    workload = build_workload(config)
+    if not workload.probes:
+        print(f"No se encontraron imagenes en {', '.join(str(path) for path in config.images)}")
+        return 2
+
+    workdir = Path(tempfile.mkdtemp(prefix="bmpi-carga-"))
+    process = None
+    cleanups = []
+    try:
+        if not config.target:
+            process, cleanups = start_server(config, workdir)
+        channel = grpc.insecure_channel(
+            config.target or f"localhost:{SERVER_PORT}",
+            options=[("grpc.max_send_message_length", 32 * 1024 * 1024)],
+        )
+        startup_s = wait_until_serving(channel, process, config.startup_timeout)
+        print(f"Servidor listo en {startup_s:.1f}s; registrando {len(workload.seed)} identidades")
+        runner = LoadRunner(config, pb2_grpc.FaceRecognitionServiceStub(channel), workload)
+        seed = runner.seed()
+        if config.rate > 0:
+            elapsed = runner.run_open_loop()
+        else:
+            elapsed = runner.run_closed_loop()
+        channel.close()
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for cleanup in cleanups:
+            cleanup()
+        if process is not None and process.returncode not in (0, -15):
+            print(f"Log del servidor: {workdir / 'server.log'}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    payload = build_payload(config, workload, seed, runner.samples, elapsed, startup_s if process is not None else None)
+    json_path, md_path = write_reports(config, payload)
+    total = payload["total"]
+    latency = total["latency"]
+    print(
+        f"{total['requests']} req en {payload['elapsed_s']}s: {total['throughput_rps']} req/s, "
+        f"p50={latency['p50_ms']}ms p95={latency['p95_ms']}ms p99={latency['p99_ms']}ms, "
+        f"errores={total['error_rate']:.2%}"
+    )
+    print(f"Reporte JSON: {json_path}")
+    print(f"Reporte MD: {md_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
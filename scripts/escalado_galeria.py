@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""Benchmark de escalado de la galeria (2k -> 200k empleados) para los backends de busqueda de face_server.py.
+
+Genera galerias sinteticas 128-d agrupadas (varios prototipos por identidad, ver microbench_face_server.py) y,
+por cada tamano y backend (exact / faiss flat / faiss hnsw), mide:
+- build: FaceService._rebuild_faiss_index
+- memoria: matriz de embeddings, indice FAISS serializado y pico de tracemalloc durante la recarga
+- latencia de consulta: _faiss_search_candidates (solo indice) y _search_matches (camino productivo, con
+  verificacion exacta y fallback lineal)
+- recall frente a busqueda exacta: recall@k de los candidatos del indice y acierto top-1 de _search_matches
+- recarga: load_embeddings desde una base SQLite (stand-in de carga_grpc) con los payloads pickle de produccion
+
+Genera un reporte JSON y uno Markdown con curvas de escalado en --output (y PNG si hay matplotlib).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import pickle
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from carga_grpc import StandinPool
+from microbench_face_server import build_search_service, synthetic_gallery, synthetic_queries, use_search_backend
+
+import face_server  # carga_grpc agrega ml-model al path
+
+try:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+
+# Celdas de la matriz de distancias por bloque de consultas en la verdad exacta (~32 MB por temporal float64).
+TRUTH_BLOCK_CELLS = 4_000_000
+
+
+@dataclass
+class ScalingConfig:
+    output_dir: Path
+    sizes: list[int]
+    prototypes: int
+    backends: list[str]
+    queries: int
+    impostor_ratio: float
+    skip_reload: bool
+    random_seed: int
+
+
+def parse_args() -> ScalingConfig:
+    parser = argparse.ArgumentParser(description="Escalado de galeria para los backends de busqueda.")
+    parser.add_argument("--output", default="reports/bench", help="Directorio de salida de reportes.")
+    parser.add_argument("--sizes", default="2000,10000,50000,200000", help="Empleados por galeria, separados por coma.")
+    parser.add_argument("--prototypes", type=int, default=3, help="Prototipos por empleado.")
+    parser.add_argument("--backends", default="exact,flat,hnsw", help="Backends a medir (exact, flat, hnsw).")
+    parser.add_argument("--queries", type=int, default=200, help="Consultas por tamano y backend.")
+    parser.add_argument(
+        "--impostor-ratio", type=float, default=0.2, help="Fraccion de consultas de personas fuera de la galeria."
+    )
+    parser.add_argument("--skip-reload", action="store_true", help="No medir load_embeddings (evita poblar la base).")
+    parser.add_argument("--random-seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    unknown = set(backends) - {"exact", "flat", "hnsw"}
+    if unknown:
+        raise SystemExit(f"Backends desconocidos: {', '.join(sorted(unknown))}")
+    return ScalingConfig(
+        output_dir=Path(args.output),
+        sizes=[max(1, int(token)) for token in args.sizes.split(",") if token.strip()],
+        prototypes=max(1, args.prototypes),
+        backends=backends,
+        queries=max(1, args.queries),
+        impostor_ratio=min(1.0, max(0.0, args.impostor_ratio)),
+        skip_reload=args.skip_reload,
+        random_seed=args.random_seed,
+    )
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    idx = max(0, min(len(values) - 1, int(round((q / 100.0) * (len(values) - 1)))))
+    return float(sorted(values)[idx])
+
+
+def build_queries(config: ScalingConfig, centers: np.ndarray, size: int) -> np.ndarray:
+    impostors = int(round(config.queries * config.impostor_ratio))
+    genuine = synthetic_queries(centers, config.queries - impostors, config.random_seed + size)
+    # Impostores: centros nuevos con la misma distribucion, fuera de la galeria.
+    _, _, outsiders = synthetic_gallery(max(1, impostors), 1, config.random_seed + size + 1)
+    rows = [genuine] + ([outsiders[:impostors]] if impostors else [])
+    return np.vstack(rows)
+
+
+def populate_standin(pool: StandinPool, embeddings: np.ndarray, ids: list[str], prototypes: int) -> None:
+    conn = pool.getconn()
+    try:
+        rows = []
+        for start in range(0, len(ids), prototypes):
+            payload = face_server.build_embedding_payload(list(embeddings[start : start + prototypes]))
+            rows.append((ids[start], ids[start], pickle.dumps(payload), prototypes))
+        cur = conn.cursor()
+        cur.execute("DELETE FROM employees")
+        for row in rows:
+            cur.execute("INSERT INTO employees (name, employee_id, embedding, samples_count) VALUES (%s,%s,%s,%s)", row)
+        conn.commit()
+    finally:
+        pool.putconn(conn)
+
+
+def index_bytes(service) -> int:
+    if service._faiss_index is None:
+        return 0
+    return int(face_server.faiss.serialize_index(service._faiss_index).nbytes)
+
+
+def measure_backend(config: ScalingConfig, service, backend: str, queries: np.ndarray, truth: list[str],
+                    truth_rows: np.ndarray) -> dict:
+    started = time.perf_counter()
+    use_search_backend(service, backend)
+    build_s = time.perf_counter() - started
+    embeddings, ids = service.known_embeddings, service.known_ids
+
+    candidate_ms = []
+    candidate_hits = 0
+    if backend != "exact":
+        for query, nearest in zip(queries, truth_rows):
+            started = time.perf_counter()
+            candidates = service._faiss_search_candidates(query, face_server.FAISS_TOPK)
+            candidate_ms.append((time.perf_counter() - started) * 1000.0)
+            candidate_hits += int(any(idx == nearest for idx, _ in candidates))
+
+    search_ms = []
+    top1_hits = 0
+    fallbacks = 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        matches, _, events = face_server.run_with_capture(service._search_matches, [query], embeddings, ids)
+        search_ms.append((time.perf_counter() - started) * 1000.0)
+        top1_hits += int(matches[0][1] == expected)
+        fallbacks += int(events.get("search_backend") == "faiss+exact")
+
+    result = {
+        "build_s": round(build_s, 4),
+        "index_mb": round(index_bytes(service) / 1e6, 2),
+        "search_p50_ms": round(percentile(search_ms, 50), 3),
+        "search_p95_ms": round(percentile(search_ms, 95), 3),
+        "search_mean_ms": round(statistics.fmean(search_ms), 3),
+        "top1_agreement": round(top1_hits / len(truth), 4),
+        "exact_fallback_rate": round(fallbacks / len(truth), 4) if backend != "exact" else None,
+    }
+    if candidate_ms:
+        result.update(
+            {
+                "index_p50_ms": round(percentile(candidate_ms, 50), 3),
+                "index_p95_ms": round(percentile(candidate_ms, 95), 3),
+                f"recall_at_{face_server.FAISS_TOPK}": round(candidate_hits / len(truth_rows), 4),
+            }
+        )
+    return result
+
+
+def measure_reload(service, backend: str) -> dict:
+    use_search_backend(service, backend)
+    started = time.perf_counter()
+    service.load_embeddings()
+    reload_s = time.perf_counter() - started
+    # Segunda recarga bajo tracemalloc: el trazado encarece cada asignacion y no debe contar en reload_s.
+    tracemalloc.start()
+    service.load_embeddings()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"reload_s": round(reload_s, 3), "reload_peak_mb": round(peak / 1e6, 1)}
+
+
+def exact_nearest_rows(queries: np.ndarray, embeddings: np.ndarray) -> np.ndarray:
+    """Fila mas cercana por consulta, por bloques: la matriz completa a 200k ocupa ~1 GB por temporal."""
+    block = max(1, TRUTH_BLOCK_CELLS // max(1, len(embeddings)))
+    rows = np.empty(len(queries), dtype=np.int64)
+    for start in range(0, len(queries), block):
+        distances = face_server.pairwise_face_distances(queries[start : start + block], embeddings)
+        rows[start : start + block] = np.argmin(distances, axis=1)
+    return rows
+
+
+def run_size(config: ScalingConfig, service, size: int) -> dict:
+    embeddings, ids, centers = synthetic_gallery(size, config.prototypes, config.random_seed)
+    queries = build_queries(config, centers, size)
+    truth_rows = exact_nearest_rows(queries, embeddings)
+    truth = [ids[int(row)] for row in truth_rows]
+
+    with service._cache_lock:
+        service.known_embeddings = embeddings
+        service.known_ids = ids
+    row = {
+        "employees": size,
+        "embeddings": len(ids),
+        "matrix_mb": round(embeddings.nbytes / 1e6, 2),
+        "backends": {},
+    }
+    for backend in config.backends:
+        if backend != "exact" and not face_server.FAISS_AVAILABLE:
+            continue
+        row["backends"][backend] = measure_backend(config, service, backend, queries, truth, truth_rows)
+        print(f"n={size} {backend}: {row['backends'][backend]}")
+
+    if not config.skip_reload:
+        populate_standin(face_server.connection_pool, embeddings, ids, config.prototypes)
+        for backend, result in row["backends"].items():
+            result.update(measure_reload(service, backend))
+            print(f"n={size} {backend} recarga: reload_s={result['reload_s']} peak_mb={result['reload_peak_mb']}")
+    return row
+
+
+def scaling_exponent(sizes: list[int], values: list[float]) -> float | None:
+    """Pendiente log-log: ~1.0 es lineal en el tamano de la galeria, ~0 es constante."""
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, values) if value > 0]
+    if len(points) < 2:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    if denominator == 0:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator, 3)
+
+
+def build_curves(rows: list[dict]) -> dict:
+    curves: dict[str, dict] = {}
+    metrics = ("build_s", "search_p50_ms", "search_p95_ms", "index_p50_ms", "reload_s")
+    backends = sorted({backend for row in rows for backend in row["backends"]})
+    for backend in backends:
+        series = [(row["employees"], row["backends"][backend]) for row in rows if backend in row["backends"]]
+        curves[backend] = {}
+        for metric in metrics:
+            points = [(size, result[metric]) for size, result in series if metric in result]
+            if points:
+                curves[backend][metric] = {
+                    "points": points,
+                    "exponent": scaling_exponent([size for size, _ in points], [value for _, value in points]),
+                }
+    return curves
+
+
+def plot_curves(curves: dict, path: Path) -> Path | None:
+    if plt is None:
+        return None
+    figure, axes = plt.subplots(1, 3, figsize=(15, 4))
+    panels = (("search_p95_ms", "busqueda p95 (ms)"), ("build_s", "build (s)"), ("reload_s", "recarga (s)"))
+    for axis, (metric, title) in zip(axes, panels):
+        for backend, backend_curves in curves.items():
+            if metric in backend_curves:
+                sizes, values = zip(*backend_curves[metric]["points"])
+                axis.plot(sizes, values, marker="o", label=backend)
+        axis.set_xscale("log")
+        axis.set_yscale("log")
+        axis.set_xlabel("empleados")
+        axis.set_title(title)
+        axis.legend()
+    figure.tight_layout()
+    figure.savefig(path)
+    plt.close(figure)
+    return path
+
+
+def write_reports(config: ScalingConfig, payload: dict) -> tuple[Path, Path]:
+    config.output_dir.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_path = config.output_dir / f"escalado_galeria_{ts}.json"
+    md_path = config.output_dir / f"escalado_galeria_{ts}.md"
+    plot_path = plot_curves(payload["curves"], config.output_dir / f"escalado_galeria_{ts}.png")
+    payload["plot"] = str(plot_path) if plot_path else None
+
+    json_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    recall_key = f"recall_at_{payload['settings']['faiss_topk']}"
+    lines = [
+        "# Escalado de galeria por backend",
+        "",
+        f"- Fecha: {payload['generated_at']}",
+        f"- Prototipos por empleado: {payload['settings']['prototypes']}",
+        f"- Consultas por punto: {payload['settings']['queries']} ({payload['settings']['impostor_ratio']:.0%} impostores)",
+        f"- FAISS: topk={payload['settings']['faiss_topk']} fallback_ratio={payload['settings']['faiss_fallback_ratio']} "
+        f"hnsw_m={payload['settings']['hnsw_m']} ef_search={payload['settings']['hnsw_ef_search']}",
+        "",
+        "## Resultados",
+        "",
+        f"| empleados | backend | build_s | matriz_mb | indice_mb | p50_ms | p95_ms | indice_p50_ms | {recall_key} "
+        "| top1 | fallback | recarga_s | pico_recarga_mb |",
+        "|---:|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+
+    def cell(value) -> str:
+        return "-" if value is None else str(value)
+
+    for row in payload["rows"]:
+        for backend, result in row["backends"].items():
+            lines.append(
+                f"| {row['employees']} | {backend} | {result['build_s']} | {row['matrix_mb']} | {result['index_mb']} | "
+                f"{result['search_p50_ms']} | {result['search_p95_ms']} | {cell(result.get('index_p50_ms'))} | "
+                f"{cell(result.get(recall_key))} | {result['top1_agreement']} | {cell(result['exact_fallback_rate'])} | "
+                f"{cell(result.get('reload_s'))} | {cell(result.get('reload_peak_mb'))} |"
+            )
+
+    lines.extend(
+        [
+            "",
+            "## Curvas de escalado",
+            "",
+            "Exponente log-log del metrico frente al numero de empleados (1.0 = lineal, 0 = constante).",
+            "",
+            "| backend | metrico | puntos (empleados: valor) | exponente |",
+            "|---|---|---|---:|",
+        ]
+    )
+    for backend, backend_curves in payload["curves"].items():
+        for metric, curve in backend_curves.items():
+            points = ", ".join(f"{size}: {value}" for size, value in curve["points"])
+            lines.append(f"| {backend} | {metric} | {points} | {cell(curve['exponent'])} |")
+    if payload["plot"]:
+        lines.extend(["", f"![curvas]({Path(payload['plot']).name})"])
+
+    md_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return json_path, md_path
+
+
+def main() -> int:
+    config = parse_args()
+    face_server.load_server_dependencies()
+    face_server.configure_thread_layout()
+    if not face_server.FAISS_AVAILABLE:
+        print(f"[WARN] FAISS no disponible, solo se mide el backend exacto: {face_server.FAISS_IMPORT_ERROR}")
+
+    with tempfile.TemporaryDirectory(prefix="bmpi-escalado-") as workdir:
+        service = build_search_service(np.zeros((0, 128)), [])
+        face_server.connection_pool = StandinPool(Path(workdir) / "galeria.sqlite")
+        rows = [run_size(config, service, size) for size in config.sizes]
+
+    payload = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "settings": {
+            "sizes": config.sizes,
+            "prototypes": config.prototypes,
+            "backends": config.backends,
+            "queries": config.queries,
+            "impostor_ratio": config.impostor_ratio,
+            "faiss_topk": face_server.FAISS_TOPK,
+            "faiss_fallback_ratio": face_server.FAISS_FALLBACK_RATIO,
+            "hnsw_m": face_server.FAISS_HNSW_M,
+            "hnsw_ef_search": face_server.FAISS_HNSW_EF_SEARCH,
+            "threshold": face_server.THRESHOLD,
+        },
+        "rows": rows,
+        "curves": build_curves(rows),
+    }
+    json_path, md_path = write_reports(config, payload)
+    print(f"Reporte JSON: {json_path}")
+    print(f"Reporte MD: {md_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks de las funciones calientes de face_server.py con entradas sinteticas.
+
+Cubre:
+- imagen: decode_request_image_bgr_auto_oriented, build_detection_variants, detectores HOG/CNN/Haar,
+  detect_face_locations (camino sin rostro, con reintentos), face_encodings y extract_candidate_encodings
+- embeddings: select_diverse_indices, select_prototypes, build_embedding_payload, decode_embedding_payload
+- busqueda por tamano de galeria: _cache_snapshot, pairwise_face_distances y _search_matches/_search_ranked
+  con busqueda exacta y con FAISS flat/HNSW
+
+Cada caso se calibra para durar al menos --min-time por ronda y se repite --repeat veces; se guarda la mediana.
+
+Uso:
+  python scripts/microbench_face_server.py --save-baseline reports/bench/microbench_baseline.json
+  python scripts/microbench_face_server.py --check reports/bench/microbench_baseline.json --max-regression 15
+
+Con --check el script termina con codigo 1 si algun caso es mas lento que la linea base en mas de
+--max-regression por ciento. Las lineas base dependen de la maquina: compararlas solo en el mismo equipo.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pickle
+import platform
+import re
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR / "ml-model"))
+
+import face_server  # noqa: E402
+
+EMBEDDING_DIMS = 128
+
+
+@dataclass
+class BenchConfig:
+    output_dir: Path
+    gallery_sizes: list[int]
+    prototypes: int
+    image_size: int
+    photo: Path | None
+    min_time: float
+    repeat: int
+    filter: re.Pattern | None
+    save_baseline: Path | None
+    check: Path | None
+    max_regression: float
+    random_seed: int
+
+
+@dataclass
+class Bench:
+    name: str
+    group: str
+    func: Callable[[], object]
+
+
+def parse_sizes(raw: str) -> list[int]:
+    sizes = []
+    for token in raw.split(","):
+        token = token.strip()
+        if token:
+            sizes.append(max(1, int(token)))
+    return sizes or [1000]
+
+
+def parse_args() -> BenchConfig:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks del camino caliente de face_server.py.")
+    parser.add_argument("--output", default="reports/bench", help="Directorio de salida de resultados.")
+    parser.add_argument("--gallery-sizes", default="1000,5000,20000", help="Empleados por galeria, separados por coma.")
+    parser.add_argument("--prototypes", type=int, default=3, help="Prototipos por empleado en la galeria sintetica.")
+    parser.add_argument("--image-size", type=int, default=256, help="Lado de la imagen sintetica.")
+    parser.add_argument("--photo", default="", help="Foto real opcional para los casos de imagen (en vez de sintetica).")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Duracion minima de cada ronda en segundos.")
+    parser.add_argument("--repeat", type=int, default=5, help="Rondas por caso.")
+    parser.add_argument("--filter", default="", help="Regex: solo los casos cuyo nombre coincide.")
+    parser.add_argument("--save-baseline", default="", help="Guarda los resultados como linea base en esta ruta.")
+    parser.add_argument("--check", default="", help="Compara contra esta linea base y falla si hay regresion.")
+    parser.add_argument("--max-regression", type=float, default=15.0, help="Regresion maxima tolerada (%%).")
+    parser.add_argument("--random-seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    return BenchConfig(
+        output_dir=Path(args.output),
+        gallery_sizes=parse_sizes(args.gallery_sizes),
+        prototypes=max(1, args.prototypes),
+        image_size=max(64, args.image_size),
+        photo=Path(args.photo) if args.photo else None,
+        min_time=max(0.01, args.min_time),
+        repeat=max(1, args.repeat),
+        filter=re.compile(args.filter) if args.filter else None,
+        save_baseline=Path(args.save_baseline) if args.save_baseline else None,
+        check=Path(args.check) if args.check else None,
+        max_regression=max(0.0, args.max_regression),
+        random_seed=args.random_seed,
+    )
+
+
+# --- Entradas sinteticas ----------------------------------------------------------------------------------------
+
+
+def synthetic_gallery(employees: int, prototypes: int, seed: int = 1234) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """Galeria 128-d agrupada: un centro por empleado y `prototypes` muestras alrededor.
+
+    Las escalas imitan encodings dlib reales: distancia intra-persona ~0.4 y entre personas ~1.0.
+    Devuelve (embeddings [employees * prototypes, 128], ids, centros [employees, 128]).
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0.0, 0.065, size=(employees, EMBEDDING_DIMS))
+    noise = rng.normal(0.0, 0.025, size=(employees, prototypes, EMBEDDING_DIMS))
+    embeddings = (centers[:, None, :] + noise).reshape(employees * prototypes, EMBEDDING_DIMS)
+    ids = [f"emp_{index:06d}" for index in range(employees) for _ in range(prototypes)]
+    return embeddings, ids, centers
+
+
+def synthetic_queries(centers: np.ndarray, count: int, seed: int = 4321) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(centers), size=count)
+    return centers[picks] + rng.normal(0.0, 0.025, size=(count, EMBEDDING_DIMS))
+
+
+def load_bench_image(config: BenchConfig) -> np.ndarray:
+    import cv2
+
+    if config.photo is not None:
+        frame = cv2.imread(str(config.photo), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise SystemExit(f"No se pudo leer la foto: {config.photo}")
+        scale = config.image_size / float(max(frame.shape[:2]))
+        if scale < 1.0:
+            size = (int(frame.shape[1] * scale), int(frame.shape[0] * scale))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return frame
+    return face_server.build_warmup_image(config.image_size)
+
+
+def build_search_service(embeddings: np.ndarray, ids: list[str]):
+    """FaceService real con una base vacia (stand-in de carga_grpc) y la galeria sintetica cargada en memoria."""
+    from carga_grpc import StandinPool
+
+    face_server.connection_pool = StandinPool(Path(":memory:"))
+    face_server.schema_initialized = True
+    service = face_server.FaceService()
+    with service._cache_lock:
+        service.known_embeddings = embeddings
+        service.known_ids = ids
+    return service
+
+
+def use_search_backend(service, backend: str) -> None:
+    with service._cache_lock:
+        service._faiss_enabled = backend != "exact"
+        service._faiss_index_type = backend
+        service._rebuild_faiss_index()
+
+
+# --- Casos ------------------------------------------------------------------------------------------------------
+
+
+def image_benches(config: BenchConfig) -> list[Bench]:
+    import cv2
+
+    frame = load_bench_image(config)
+    jpeg_bytes = face_server.encode_bgr_to_jpeg_bytes(frame)
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    height, width = rgb.shape[:2]
+    location = (height // 8, width * 7 // 8, height * 7 // 8, width // 8)
+    full = face_server.PROFILE_FULL
+    fast = face_server.PROFILE_FAST
+    upsample = full.detect_upsample
+    models = face_server.face_models
+
+    return [
+        Bench("decode_request_image_bgr_auto_oriented", "imagen",
+              lambda: face_server.decode_request_image_bgr_auto_oriented(jpeg_bytes)),
+        Bench("build_detection_variants[full]", "imagen", lambda: face_server.build_detection_variants(rgb, full)),
+        Bench("detect[hog]", "imagen",
+              lambda: models.face_locations(rgb, number_of_times_to_upsample=upsample, model="hog")),
+        Bench("detect[cnn]", "imagen",
+              lambda: models.face_locations(rgb, number_of_times_to_upsample=upsample, model="cnn")),
+        Bench("detect[haar]", "imagen", lambda: face_server.detect_face_locations_haar(rgb)),
+        Bench("detect_face_locations[full]", "imagen", lambda: face_server.detect_face_locations(rgb, full.model, full)),
+        Bench("face_encodings", "imagen",
+              lambda: models.face_encodings(rgb, [location], num_jitters=1, model=face_server.FACE_ENCODING_MODEL)),
+        Bench("extract_candidate_encodings[fast]", "imagen",
+              lambda: face_server.extract_candidate_encodings(rgb, num_jitters=1, max_candidates=3, profile=fast)),
+    ]
+
+
+def embedding_benches(config: BenchConfig) -> list[Bench]:
+    embeddings, _, _ = synthetic_gallery(4, 4, config.random_seed)
+    candidates = [row for row in embeddings[:12]]
+    max_prototypes = face_server.MAX_PROTOTYPES_PER_EMPLOYEE
+    prototypes = [row for row in embeddings[: max_prototypes + 1]]
+    payload_source = [row for row in embeddings[:max_prototypes]]
+    raw_payload = pickle.dumps(face_server.build_embedding_payload(payload_source))
+
+    return [
+        Bench("select_diverse_indices[12->3]", "embeddings", lambda: face_server.select_diverse_indices(candidates, 3)),
+        Bench(f"select_prototypes[{len(prototypes)}->{max_prototypes}]", "embeddings",
+              lambda: face_server.select_prototypes(list(prototypes), max_prototypes)),
+        Bench(f"build_embedding_payload[{max_prototypes}]", "embeddings",
+              lambda: face_server.build_embedding_payload(payload_source)),
+        Bench(f"decode_embedding_payload[{max_prototypes}]", "embeddings",
+              lambda: face_server.decode_embedding_payload(raw_payload)),
+    ]
+
+
+def search_benches(config: BenchConfig, service, employees: int) -> list[Bench]:
+    embeddings, ids, centers = synthetic_gallery(employees, config.prototypes, config.random_seed)
+    with service._cache_lock:
+        service.known_embeddings = embeddings
+        service.known_ids = ids
+    queries = synthetic_queries(centers, 64, config.random_seed + employees)
+    rows = len(ids)
+    cursor = {"next": 0}
+
+    def next_query():
+        cursor["next"] = (cursor["next"] + 1) % len(queries)
+        return queries[cursor["next"] : cursor["next"] + 1]
+
+    def with_backend(backend: str, func: Callable[[], object]) -> Callable[[], object]:
+        def prepared():
+            if service._faiss_index_type != backend or (backend != "exact") != service._faiss_enabled:
+                use_search_backend(service, backend)
+            return func()
+
+        return prepared
+
+    benches = [
+        Bench(f"cache_snapshot[n={rows}]", "busqueda", service._cache_snapshot),
+        Bench(f"pairwise_face_distances[3x{rows}]", "busqueda",
+              lambda: face_server.pairwise_face_distances(queries[:3], embeddings)),
+        Bench(f"search_matches[exact,n={rows}]", "busqueda",
+              with_backend("exact", lambda: service._search_matches(next_query(), embeddings, ids))),
+        Bench(f"search_ranked[top3,n={rows}]", "busqueda",
+              with_backend("exact", lambda: service._search_ranked(next_query(), embeddings, ids, 3))),
+    ]
+    if face_server.FAISS_AVAILABLE:
+        for backend in ("flat", "hnsw"):
+            benches.append(
+                Bench(f"search_matches[faiss_{backend},n={rows}]", "busqueda",
+                      with_backend(backend, lambda: service._search_matches(next_query(), embeddings, ids)))
+            )
+            benches.append(
+                Bench(f"search_ranked[faiss_{backend},top3,n={rows}]", "busqueda",
+                      with_backend(backend, lambda: service._search_ranked(next_query(), embeddings, ids, 3)))
+            )
+    return benches
+
+
+# --- Medicion ---------------------------------------------------------------------------------------------------
+
+
+def measure(func: Callable[[], object], min_time: float, repeat: int) -> dict:
+    started = time.perf_counter()
+    func()
+    single = max(time.perf_counter() - started, 1e-7)
+    number = max(1, int(min_time / single))
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - started) / number)
+    return {
+        "median_us": round(statistics.median(rounds) * 1e6, 3),
+        "min_us": round(min(rounds) * 1e6, 3),
+        "max_us": round(max(rounds) * 1e6, 3),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run_benches(config: BenchConfig) -> dict:
+    results: dict[str, dict] = {}
+
+    def run(bench: Bench) -> None:
+        if config.filter is not None and not config.filter.search(bench.name):
+            return
+        result = measure(bench.func, config.min_time, config.repeat)
+        result["group"] = bench.group
+        results[bench.name] = result
+        print(f"{bench.name:<48} {result['median_us']:>14.1f} us  (min {result['min_us']:.1f}, x{result['number']})")
+
+    for bench in image_benches(config) + embedding_benches(config):
+        run(bench)
+
+    face_server.load_server_dependencies()
+    service = build_search_service(np.zeros((0, EMBEDDING_DIMS)), [])
+    for employees in config.gallery_sizes:
+        for bench in search_benches(config, service, employees):
+            # Antes de medir, preparar el indice del backend fuera del tiempo cronometrado.
+            bench.func()
+            run(bench)
+    return results
+
+
+def environment() -> dict:
+    import cv2
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "faiss": face_server.FAISS_AVAILABLE,
+        "machine": platform.machine(),
+        "node": platform.node(),
+        "cpus": os.cpu_count(),
+        "thread_layout": face_server.THREAD_LAYOUT,
+    }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[dict]:
+    rows = []
+    for name, current in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None or reference.get("median_us", 0) <= 0:
+            continue
+        change = (current["median_us"] / reference["median_us"] - 1.0) * 100.0
+        rows.append(
+            {
+                "name": name,
+                "baseline_us": reference["median_us"],
+                "current_us": current["median_us"],
+                "change_pct": round(change, 2),
+                "regression": change > max_regression,
+            }
+        )
+    return rows
+
+
+def main() -> int:
+    config = parse_args()
+    face_server.configure_thread_layout()
+    results = run_benches(config)
+    payload = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "settings": {
+            "gallery_sizes": config.gallery_sizes,
+            "prototypes": config.prototypes,
+            "image_size": config.image_size,
+            "photo": str(config.photo) if config.photo else None,
+            "min_time": config.min_time,
+            "repeat": config.repeat,
+        },
+        "results": results,
+    }
+
+    config.output_dir.mkdir(parents=True, exist_ok=True)
+    json_path = config.output_dir / f"microbench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    json_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Resultados: {json_path}")
+
+    if config.save_baseline is not None:
+        config.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        config.save_baseline.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Linea base guardada: {config.save_baseline}")
+
+    if config.check is None:
+        return 0
+
+    baseline = json.loads(config.check.read_text(encoding="utf-8"))
+    if baseline.get("environment", {}).get("node") != payload["environment"]["node"]:
+        print("[WARN] La linea base se tomo en otra maquina: la comparacion puede no ser significativa")
+    rows = compare(results, baseline, config.max_regression)
+    regressions = [row for row in rows if row["regression"]]
+    for row in rows:
+        flag = "REGRESION" if row["regression"] else "ok"
+        print(
+            f"{row['name']:<48} {row['baseline_us']:>14.1f} -> {row['current_us']:>14.1f} us  "
+            f"{row['change_pct']:+7.1f}%  {flag}"
+        )
+    missing = sorted(set(baseline.get("results", {})) - set(results))
+    if missing and config.filter is None:
+        print(f"[WARN] Casos de la linea base sin medir: {', '.join(missing)}")
+    print(f"{len(regressions)} regresiones sobre {len(rows)} casos (umbral {config.max_regression:.1f}%)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Reproduce un corpus capturado por face_server.py contra un servidor local.
+
+El corpus se genera con BMPI_CAPTURE_DIR + BMPI_CAPTURE_CONSENT en el servicio: cada muestra es un par
+`<id>.pb` (request serializado) + `<id>.json` (metodo y resultado observado en produccion).
+
+El replay:
+- envia las muestras en orden de captura con la concurrencia y el ritmo (req/s) indicados
+- reporta throughput y latencia p50/p95/p99 por RPC
+- compara el resultado de cada muestra (outcome + employee_id) con el capturado
+
+Genera un reporte JSON y uno Markdown en --output.
+
+Por defecto solo se reproduce RecognizeFace. RegisterEmployee vuelve a registrar empleados en la base del servidor
+destino: incluirlo en --methods es una decision explicita.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent import futures
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Sequence
+
+import grpc
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR / "ml-model"))
+
+from pb import face_recognition_pb2 as pb2  # noqa: E402
+from pb import face_recognition_pb2_grpc as pb2_grpc  # noqa: E402
+
+SERVICE_NAME = "FaceRecognitionService"
+MAX_DIFFS_IN_REPORT = 50
+
+
+@dataclass
+class ReplayConfig:
+    corpus_dir: Path
+    output_dir: Path
+    target: str
+    concurrency: int
+    rate: float
+    methods: list[str]
+    limit: int
+    timeout: float
+    ca_cert: Path | None
+    server_name: str
+
+
+@dataclass
+class CapturedRequest:
+    item_id: str
+    method: str
+    payload: bytes
+    captured: dict
+
+
+@dataclass
+class ReplayResult:
+    item: CapturedRequest
+    latency_ms: float
+    scheduled_latency_ms: float
+    outcome: str
+    employee_id: str
+
+
+def parse_args() -> ReplayConfig:
+    parser = argparse.ArgumentParser(description="Replay de un corpus capturado contra face_server.py.")
+    parser.add_argument("--corpus", required=True, help="Directorio del corpus (BMPI_CAPTURE_DIR).")
+    parser.add_argument("--output", default="reports/replay", help="Directorio de salida de reportes.")
+    parser.add_argument("--target", default="localhost:50051", help="host:puerto del servidor gRPC.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Peticiones en vuelo simultaneas.")
+    parser.add_argument("--rate", type=float, default=0.0, help="Ritmo objetivo en req/s (0 = sin limite).")
+    parser.add_argument(
+        "--methods",
+        default="RecognizeFace",
+        help="RPC a reproducir, separadas por coma (RegisterEmployee escribe en la base destino).",
+    )
+    parser.add_argument("--limit", type=int, default=0, help="Maximo de muestras (0 = todas).")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Deadline por peticion en segundos.")
+    parser.add_argument("--ca-cert", default="", help="CA para conectar por TLS (vacio = canal inseguro).")
+    parser.add_argument("--server-name", default="", help="Override del nombre TLS esperado.")
+    args = parser.parse_args()
+
+    return ReplayConfig(
+        corpus_dir=Path(args.corpus),
+        output_dir=Path(args.output),
+        target=args.target,
+        concurrency=max(1, args.concurrency),
+        rate=max(0.0, args.rate),
+        methods=[name.strip() for name in args.methods.split(",") if name.strip()],
+        limit=max(0, args.limit),
+        timeout=max(0.1, args.timeout),
+        ca_cert=Path(args.ca_cert) if args.ca_cert else None,
+        server_name=args.server_name,
+    )
+
+
+def load_corpus(config: ReplayConfig) -> list[CapturedRequest]:
+    items: list[CapturedRequest] = []
+    for meta_path in config.corpus_dir.glob("*.json"):
+        payload_path = meta_path.with_suffix(".pb")
+        try:
+            captured = json.loads(meta_path.read_text(encoding="utf-8"))
+            payload = payload_path.read_bytes()
+        except (OSError, ValueError):
+            continue
+        if captured.get("method") not in config.methods:
+            continue
+        items.append(CapturedRequest(meta_path.stem, captured["method"], payload, captured))
+
+    # El id empieza con la fecha de captura: ordenar por (ts, id) hace el replay determinista.
+    items.sort(key=lambda item: (item.captured.get("ts", ""), item.item_id))
+    if config.limit:
+        items = items[: config.limit]
+    return items
+
+
+def build_channel(config: ReplayConfig) -> grpc.Channel:
+    options = [("grpc.max_send_message_length", 32 * 1024 * 1024), ("grpc.max_receive_message_length", 32 * 1024 * 1024)]
+    if config.ca_cert is None:
+        return grpc.insecure_channel(config.target, options=options)
+    if config.server_name:
+        options.append(("grpc.ssl_target_name_override", config.server_name))
+    credentials = grpc.ssl_channel_credentials(root_certificates=config.ca_cert.read_bytes())
+    return grpc.secure_channel(config.target, credentials, options=options)
+
+
+def request_class(method: str):
+    descriptor = pb2.DESCRIPTOR.services_by_name[SERVICE_NAME].methods_by_name[method]
+    return getattr(pb2, descriptor.input_type.name)
+
+
+RESPONSE_OUTCOMES = ("recognized", "not_recognized", "ok", "failed")
+
+
+def classify_outcome(response) -> str:
+    # Mismo criterio que classify_rpc_outcome en face_server.py.
+    if hasattr(response, "recognized"):
+        return "recognized" if response.recognized else "not_recognized"
+    if hasattr(response, "success"):
+        return "ok" if response.success else "failed"
+    return "ok"
+
+
+def replay_one(stub, item: CapturedRequest, timeout: float, scheduled: float | None = None) -> ReplayResult:
+    request = request_class(item.method).FromString(item.payload)
+    started = time.perf_counter()
+    try:
+        response = getattr(stub, item.method)(request, timeout=timeout)
+        outcome = classify_outcome(response)
+        employee_id = getattr(response, "employee_id", "")
+    except grpc.RpcError as exc:
+        outcome = exc.code().name.lower()
+        employee_id = ""
+    finished = time.perf_counter()
+    latency_ms = (finished - started) * 1000.0
+    # Con --rate, desde el envio programado: incluye la cola del cliente cuando el servidor no da abasto.
+    scheduled_latency_ms = (finished - scheduled) * 1000.0 if scheduled is not None else latency_ms
+    return ReplayResult(item, latency_ms, scheduled_latency_ms, outcome, employee_id)
+
+
+def run_replay(config: ReplayConfig, items: Sequence[CapturedRequest]) -> tuple[list[ReplayResult], float]:
+    channel = build_channel(config)
+    stub = pb2_grpc.FaceRecognitionServiceStub(channel)
+    slots = threading.BoundedSemaphore(config.concurrency)
+    pending = []
+    started = time.perf_counter()
+
+    with futures.ThreadPoolExecutor(max_workers=config.concurrency) as executor:
+        for index, item in enumerate(items):
+            scheduled = None
+            if config.rate > 0:
+                scheduled = started + index / config.rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            slots.acquire()
+            future = executor.submit(replay_one, stub, item, config.timeout, scheduled)
+            future.add_done_callback(lambda _: slots.release())
+            pending.append(future)
+        results = [future.result() for future in pending]
+
+    elapsed = time.perf_counter() - started
+    channel.close()
+    return results, elapsed
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    idx = max(0, min(len(values) - 1, int(round((q / 100.0) * (len(values) - 1)))))
+    sorted_values = sorted(values)
+    return float(sorted_values[idx])
+
+
+def summarize_latency(values: Sequence[float]) -> dict:
+    if not values:
+        return {"count": 0, "avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "count": len(values),
+        "avg_ms": round(float(statistics.fmean(values)), 2),
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(float(max(values)), 2),
+    }
+
+
+def diff_result(result: ReplayResult) -> dict | None:
+    captured = result.item.captured
+    expected_outcome = captured.get("outcome", "")
+    expected_employee = captured.get("employee_id", "")
+    # Corpus anteriores guardaban "error" para cualquier RPC terminada con excepcion; ahora es el codigo gRPC.
+    legacy_error = expected_outcome == "error" and result.outcome not in RESPONSE_OUTCOMES
+    if (result.outcome == expected_outcome or legacy_error) and result.employee_id == expected_employee:
+        return None
+    return {
+        "id": result.item.item_id,
+        "method": result.item.method,
+        "captured_outcome": expected_outcome,
+        "replay_outcome": result.outcome,
+        "captured_employee_id": expected_employee,
+        "replay_employee_id": result.employee_id,
+    }
+
+
+def build_payload(config: ReplayConfig, results: Sequence[ReplayResult], elapsed: float) -> dict:
+    per_method: dict[str, dict] = {}
+    diffs: list[dict] = []
+    for method in sorted({result.item.method for result in results}):
+        method_results = [result for result in results if result.item.method == method]
+        outcomes: dict[str, int] = {}
+        for result in method_results:
+            outcomes[result.outcome] = outcomes.get(result.outcome, 0) + 1
+        method_diffs = [diff for diff in (diff_result(result) for result in method_results) if diff is not None]
+        diffs.extend(method_diffs)
+        captured_latency = [float(result.item.captured.get("duration_ms", 0.0)) for result in method_results]
+        per_method[method] = {
+            "requests": len(method_results),
+            "throughput_rps": round(len(method_results) / elapsed, 2) if elapsed > 0 else 0.0,
+            "latency": summarize_latency([result.latency_ms for result in method_results]),
+            "scheduled_latency": summarize_latency([result.scheduled_latency_ms for result in method_results]),
+            "captured_latency": summarize_latency(captured_latency),
+            "outcomes": outcomes,
+            "mismatches": len(method_diffs),
+            "match_rate": round(1.0 - len(method_diffs) / len(method_results), 6) if method_results else 1.0,
+        }
+
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "corpus": str(config.corpus_dir),
+        "target": config.target,
+        "settings": {
+            "concurrency": config.concurrency,
+            "rate": config.rate,
+            "methods": config.methods,
+            "timeout": config.timeout,
+        },
+        "requests": len(results),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed > 0 else 0.0,
+        "methods": per_method,
+        "mismatches": len(diffs),
+        "diffs": diffs[:MAX_DIFFS_IN_REPORT],
+    }
+
+
+def write_reports(config: ReplayConfig, payload: dict) -> tuple[Path, Path]:
+    config.output_dir.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_path = config.output_dir / f"replay_{ts}.json"
+    md_path = config.output_dir / f"replay_{ts}.md"
+
+    json_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    lines = [
+        "# Replay de captura",
+        "",
+        f"- Fecha: {payload['generated_at']}",
+        f"- Corpus: {payload['corpus']}",
+        f"- Servidor: {payload['target']}",
+        f"- Concurrencia: {payload['settings']['concurrency']}",
+        f"- Ritmo objetivo: {payload['settings']['rate'] or 'sin limite'} req/s",
+        f"- Peticiones: {payload['requests']} en {payload['elapsed_s']} s ({payload['throughput_rps']} req/s)",
+        f"- Diferencias con la captura: **{payload['mismatches']}**",
+        "",
+        "## Latencia por RPC",
+        "",
+        "| RPC | req | req/s | p50_ms | p95_ms | p99_ms | p95 programado | p95 captura | coincidencia |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for method, row in payload["methods"].items():
+        latency = row["latency"]
+        lines.append(
+            f"| {method} | {row['requests']} | {row['throughput_rps']:.2f} | {latency['p50_ms']:.2f} | "
+            f"{latency['p95_ms']:.2f} | {latency['p99_ms']:.2f} | {row['scheduled_latency']['p95_ms']:.2f} | "
+            f"{row['captured_latency']['p95_ms']:.2f} | {row['match_rate']:.4f} |"
+        )
+    lines.extend(
+        [
+            "",
+            "Las columnas p50/p95/p99 miden desde el envio real; `p95 programado`, desde el instante que fijaba `--rate`"
+            " (incluye la espera del cliente cuando el servidor se atrasa). Sin `--rate` coinciden.",
+        ]
+    )
+    if payload["diffs"]:
+        lines.extend(
+            [
+                "",
+                "## Diferencias",
+                "",
+                "| muestra | RPC | captura | replay |",
+                "|---|---|---|---|",
+            ]
+        )
+        for diff in payload["diffs"]:
+            lines.append(
+                f"| {diff['id']} | {diff['method']} | {diff['captured_outcome']} {diff['captured_employee_id']} | "
+                f"{diff['replay_outcome']} {diff['replay_employee_id']} |"
+            )
+
+    md_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return json_path, md_path
+
+
+def main() -> int:
+    config = parse_args()
+    if not config.corpus_dir.is_dir():
+        print(f"No existe el corpus: {config.corpus_dir}")
+        return 2
+
+    items = load_corpus(config)
+    if not items:
+        print(f"El corpus no tiene muestras para {','.join(config.methods)}")
+        return 2
+
+    results, elapsed = run_replay(config, items)
+    payload = build_payload(config, results, elapsed)
+    json_path, md_path = write_reports(config, payload)
+    for method, row in payload["methods"].items():
+        latency = row["latency"]
+        print(
+            f"{method}: {row['requests']} req, {row['throughput_rps']} req/s, "
+            f"p50={latency['p50_ms']}ms p95={latency['p95_ms']}ms p99={latency['p99_ms']}ms "
+            f"(p95 programado={row['scheduled_latency']['p95_ms']}ms), "
+            f"diferencias={row['mismatches']}"
+        )
+    print(f"Reporte JSON: {json_path}")
+    print(f"Reporte MD: {md_path}")
+    return 1 if payload["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())